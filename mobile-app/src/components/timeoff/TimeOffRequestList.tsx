@@ -23,6 +23,10 @@ import DeleteIcon from '@mui/icons-material/Delete';
 import VisibilityIcon from '@mui/icons-material/Visibility';
 import VisibilityOffIcon from '@mui/icons-material/VisibilityOff';
 import { getTimeOffRequests, TimeOffRequest, deleteTimeOffRequest } from '../../services/timeoff';
+import {
+  applyChanges, clearSyncToken, fetchChanges, getSyncToken, getSyncedList, setSyncedList, SyncScope,
+} from '../../services/sync';
+import { useAuth } from '../../contexts/AuthContext';
 import { TimeOffRequestForm } from './TimeOffRequestForm';
 import { LoadingOverlay } from '../common/LoadingOverlay';
 import { LoadingSpinner } from '../common/LoadingSpinner';
@@ -40,12 +44,51 @@ const TimeOffRequestList = forwardRef<TimeOffRequestListRef>((_, ref) => {
   const [showPreviousRequests, setShowPreviousRequests] = useState(false);
 
   const isMobile = useMediaQuery('(max-width:600px)');
+  const { user } = useAuth();
+  // Admins list everyone's requests, so they sync the admin scope
+  const syncScope: SyncScope = user?.is_staff ? 'admin' : 'employee';
+
+  const sortRequests = (list: TimeOffRequest[]) =>
+    [...list].sort((a, b) => b.start_date.localeCompare(a.start_date));
+
+  const storeRequests = (list: TimeOffRequest[]) => {
+    const sorted = sortRequests(list);
+    setRequests(sorted);
+    setSyncedList(syncScope, 'time_off_requests', sorted);
+  };
+
+  // Full load. Without a sync token one is taken first, so a change made
+  // during the load is fetched again by the next sync rather than missed.
+  // An existing token is kept: replaying changes already in the list is
+  // harmless, and the server holds back the last couple of seconds of
+  // changes, so the user's own edits are picked up here and not by a sync.
+  const loadRequests = async () => {
+    if (getSyncToken(syncScope) === null) {
+      // Without a token the next visit loads in full again
+      await fetchChanges(syncScope).catch(() => clearSyncToken(syncScope));
+    }
+    const data = await getTimeOffRequests();
+    storeRequests(Array.isArray(data) ? data : []);
+  };
+
+  // Apply what changed since the last visit to the saved list
+  const syncRequests = async (saved: TimeOffRequest[]) => {
+    const changes = await fetchChanges(syncScope).catch(() => null);
+    if (changes === null) {
+      clearSyncToken(syncScope);
+      return loadRequests();
+    }
+    if (changes.reset) {
+      // The old token expired; the reset response carries a fresh one
+      return loadRequests();
+    }
+    storeRequests(applyChanges(saved, changes.time_off_requests, changes.deleted.time_off_requests));
+  };
 
   const fetchRequests = async () => {
     setLoading(true);
     try {
-      const data = await getTimeOffRequests();
-      setRequests(Array.isArray(data) ? data : []);
+      await loadRequests();
     } catch (err: any) {
       console.error('Error fetching time-off requests:', err);
       setError(err.response?.data?.error || 'Failed to load time-off requests');
@@ -60,7 +103,17 @@ const TimeOffRequestList = forwardRef<TimeOffRequestListRef>((_, ref) => {
   }));
 
   useEffect(() => {
-    fetchRequests();
+    const saved = getSyncedList<TimeOffRequest>(syncScope, 'time_off_requests');
+    if (saved === null) {
+      fetchRequests();
+      return;
+    }
+    // Show the list from the last visit straight away, then bring it up to date
+    setRequests(saved);
+    syncRequests(saved).catch(err => {
+      console.error('Error syncing time-off requests:', err);
+      setError(err.response?.data?.error || 'Failed to load time-off requests');
+    });
   }, []);
 
   const filterRequests = (requests: TimeOffRequest[]) => {
@@ -93,6 +93,7 @@ export const API_ENDPOINTS = {
         SCHEDULE: '/api/employee/schedule/',
         INFO: '/api/employee/info/',
         TIME_ENTRIES: '/api/employee/time-entries/',
+        BOOTSTRAP: '/api/bootstrap/',
     },
     TIME_OFF: {
         LIST: '/api/time-off-requests/',
@@ -100,6 +101,7 @@ export const API_ENDPOINTS = {
         DETAIL: (id: string) => `/api/time-off-requests/${id}/`,
         REVIEW: (id: string) => `/api/time-off-requests/${id}/review/`
     },
+    SYNC: '/api/sync/',
     ADMIN: {
         BASE_URL: '/api/admin',
         EMPLOYEES: '/api/admin/employees/',
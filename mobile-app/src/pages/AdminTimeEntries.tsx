@@ -67,6 +67,16 @@ const sortTimeEntries = (entries: TimeEntry[]): TimeEntry[] => {
     });
 };
 
+const TIME_ENTRIES_PAGE_SIZE = 100;
+
+interface PaginatedTimeEntries {
+    next: string | null;
+    previous: string | null;
+    count: number | null;
+    count_is_estimate: boolean;
+    results: TimeEntry[];
+}
+
 const MemoizedTimeEntryDialog = React.memo(TimeEntryDialog);
 const MemoizedTimeEntriesFilter = React.memo(TimeEntriesFilter);
 
@@ -100,6 +110,8 @@ export const AdminTimeEntries: React.FC = () => {
     const [error, setError] = useState<string | null>(null);
     const [submitting, setSubmitting] = useState(false);
     const [loading, setLoading] = useState(true);
+    const [nextPageUrl, setNextPageUrl] = useState<string | null>(null);
+    const [loadingMore, setLoadingMore] = useState(false);
 
     const [formData, setFormData] = useState<FormData>({
         employee_id: '',
@@ -153,15 +165,21 @@ export const AdminTimeEntries: React.FC = () => {
                 params.append('end_date', appliedFilters.end_date);
             }
 
-            const response = await adminAxios.get(`${API_ENDPOINTS.ADMIN.TIME_ENTRIES}?${params}`);
-            
+            params.append('page_size', String(TIME_ENTRIES_PAGE_SIZE));
+
+            // The list is cursor-paginated; show the first page and fetch
+            // the rest only when asked to
+            const response: { data: PaginatedTimeEntries } = await adminAxios.get(
+                `${API_ENDPOINTS.ADMIN.TIME_ENTRIES}?${params}`
+            );
+
             // Validate response data
-            if (!Array.isArray(response.data)) {
+            if (!Array.isArray(response.data?.results)) {
                 throw new Error('Invalid response format');
             }
-            
-            const sortedEntries = sortTimeEntries(response.data);
-            setTimeEntries(sortedEntries);
+
+            setTimeEntries(sortTimeEntries(response.data.results));
+            setNextPageUrl(response.data.next);
         } catch (err) {
             const errorMessage = err instanceof Error ? err.message : 'Failed to fetch time entries';
             setError(errorMessage);
@@ -169,6 +187,27 @@ export const AdminTimeEntries: React.FC = () => {
         }
     }, [appliedFilters, adminAxios]);
 
+    const handleLoadMore = async () => {
+        if (!nextPageUrl) {
+            return;
+        }
+        setLoadingMore(true);
+        try {
+            const response: { data: PaginatedTimeEntries } = await adminAxios.get(nextPageUrl);
+            if (!Array.isArray(response.data?.results)) {
+                throw new Error('Invalid response format');
+            }
+            setTimeEntries(prev => sortTimeEntries([...prev, ...response.data.results]));
+            setNextPageUrl(response.data.next);
+        } catch (err) {
+            const errorMessage = err instanceof Error ? err.message : 'Failed to fetch time entries';
+            setError(errorMessage);
+            console.error(err);
+        } finally {
+            setLoadingMore(false);
+        }
+    };
+
     // Memoize the debounced filter change function
     const debouncedFilterChange = React.useMemo(
         () => debounce((field: keyof FilterData, value: any) => {
@@ -243,12 +282,6 @@ export const AdminTimeEntries: React.FC = () => {
                 );
             }
 
-            // Update employee status if needed
-            const currentStatus = await fetchEmployeeStatus(formData.employee_id);
-            if (currentStatus !== formData.is_clocked_in) {
-                await updateEmployeeStatus(formData.employee_id, formData.is_clocked_in || false);
-            }
-
             // Reset form state
             setOpenDialog(false);
             setSelectedEntry(null);
@@ -299,41 +332,6 @@ export const AdminTimeEntries: React.FC = () => {
         loadData();
     }, [fetchTimeEntries, refreshTimeEntries, setAdminRefreshTimeEntries]);
 
-    const fetchEmployeeStatus = async (employeeId: string): Promise<boolean> => {
-        try {
-            // Find the employee to get their numeric ID
-            const employee = employees.find(emp => emp.employee_id === employeeId);
-            if (!employee) {
-                console.error('Could not find employee with ID:', employeeId);
-                return false;
-            }
-
-            const response = await adminAxios.get(`${API_ENDPOINTS.ADMIN.EMPLOYEES}${employee.id}/`);
-            return response.data.clocked_in;
-        } catch (err) {
-            console.error('Error fetching employee status:', err);
-            return false;
-        }
-    };
-
-    const updateEmployeeStatus = async (employeeId: string, isClocked: boolean) => {
-        try {
-            // Find the employee to get their numeric ID
-            const employee = employees.find(emp => emp.employee_id === employeeId);
-            if (!employee) {
-                console.error('Could not find employee with ID:', employeeId);
-                return;
-            }
-
-            await adminAxios.patch(
-                `${API_ENDPOINTS.ADMIN.EMPLOYEES}${employee.id}/`,
-                { clocked_in: isClocked },
-            );
-        } catch (err) {
-            console.error('Error updating employee status:', err);
-        }
-    };
-
     const handleEdit = (entry: TimeEntry) => {
         // Find the employee by matching the name
         const employee = employees.find(emp => 
@@ -421,6 +419,18 @@ export const AdminTimeEntries: React.FC = () => {
                     onDelete={handleDelete}
                 />
 
+                {nextPageUrl && (
+                    <Box sx={{ mt: 2, display: 'flex', justifyContent: 'center' }}>
+                        <Button
+                            variant="outlined"
+                            onClick={handleLoadMore}
+                            disabled={loadingMore}
+                        >
+                            {loadingMore ? 'Loading...' : 'Load more'}
+                        </Button>
+                    </Box>
+                )}
+
                 <MemoizedTimeEntryDialog
                     open={openDialog}
                     onClose={handleCloseDialog}
@@ -2,6 +2,7 @@ import { axiosInstance } from '../utils/axios';
 import { API_ENDPOINTS } from '../config';
 import { handleAPIError } from '../utils/apiErrors';
 import { getUserData } from './auth';
+import { TimeOffRequest } from './timeoff';
 
 export interface EmployeeInfo {
     id: string;
@@ -101,22 +102,73 @@ export const getTimeEntries = async (date?: string): Promise<TimeEntriesResponse
     }
 };
 
-export const clockIn = async (): Promise<void> => {
+export interface BootstrapResponse {
+    // null for admins without an employee record
+    employee: EmployeeInfo | null;
+    time_entries: TimeEntriesResponse | null;
+    background_image: string | null;
+    theme: string | null;
+    time_off_requests: TimeOffRequest[] | null;
+    // Parts that failed to load, keyed like the fields above
+    errors: { [key: string]: string };
+}
+
+// Everything the app needs at startup in one request; also primes the
+// employee info cache so getEmployeeInfo does not fetch it again
+export const getBootstrap = async (date?: string): Promise<BootstrapResponse> => {
     try {
-        await axiosInstance.post(API_ENDPOINTS.EMPLOYEE.CLOCK);
+        const response = await axiosInstance.get<BootstrapResponse>(API_ENDPOINTS.EMPLOYEE.BOOTSTRAP, {
+            params: date ? { date } : undefined
+        });
+        if (response.data.employee) {
+            cachedEmployeeInfo = response.data.employee;
+            lastFetchTime = Date.now();
+        }
+        return response.data;
     } catch (error) {
         return handleAPIError(error);
     }
 };
 
-export const clockOut = async (): Promise<void> => {
-    try {
-        await axiosInstance.post(`${API_ENDPOINTS.EMPLOYEE.CLOCK}out/`);
-    } catch (error) {
-        return handleAPIError(error);
+const PUNCH_RETRY_LIMIT = 4;
+
+const newPunchId = (): string => {
+    if (typeof crypto !== 'undefined' && typeof crypto.randomUUID === 'function') {
+        return crypto.randomUUID();
     }
+    return `${Date.now().toString(36)}-${Math.random().toString(36).slice(2, 12)}`;
 };
 
+const isRetryablePunchError = (error: any): boolean => {
+    const status = error?.response?.status;
+    // No response at all, a server error, or the same punch still being processed
+    return status === undefined || status === 409 || status >= 500;
+};
+
+// Punches carry a client-generated punch_id so retries over a flaky
+// connection are replayed by the server instead of recorded twice
+const sendPunch = async (action: 'clock_in' | 'clock_out'): Promise<void> => {
+    const punchId = newPunchId();
+    for (let attempt = 0; ; attempt++) {
+        try {
+            await axiosInstance.post(API_ENDPOINTS.EMPLOYEE.TIME_ENTRIES, {
+                action,
+                punch_id: punchId
+            });
+            return;
+        } catch (error) {
+            if (attempt >= PUNCH_RETRY_LIMIT || !isRetryablePunchError(error)) {
+                return handleAPIError(error);
+            }
+            await new Promise(resolve => setTimeout(resolve, 500 * 2 ** attempt));
+        }
+    }
+};
+
+export const clockIn = async (): Promise<void> => sendPunch('clock_in');
+
+export const clockOut = async (): Promise<void> => sendPunch('clock_out');
+
 export const updateBackgroundImage = async (backgroundImage: string): Promise<void> => {
     try {
         await axiosInstance.post(API_ENDPOINTS.EMPLOYEE.BACKGROUND_IMAGE, { 
@@ -0,0 +1,114 @@
+import { axiosInstance } from '../utils/axios';
+import { API_ENDPOINTS } from '../config';
+import { handleAPIError } from '../utils/apiErrors';
+import { EmployeeInfo, TimeEntry } from './employee';
+import { TimeOffRequest } from './timeoff';
+
+export type SyncScope = 'employee' | 'admin';
+
+export interface SyncChanges {
+    token: number;
+    more: boolean;
+    // The token was too old (or there was none): reload in full, then sync from token
+    reset: boolean;
+    time_entries: TimeEntry[];
+    time_off_requests: TimeOffRequest[];
+    employees: EmployeeInfo[];
+    deleted: {
+        time_entries: number[];
+        time_off_requests: number[];
+        employees: number[];
+    };
+}
+
+const tokenKey = (scope: SyncScope) => `sync_token_${scope}`;
+
+export const getSyncToken = (scope: SyncScope = 'employee'): string | null =>
+    sessionStorage.getItem(tokenKey(scope));
+
+export const clearSyncToken = (scope: SyncScope = 'employee') => {
+    sessionStorage.removeItem(tokenKey(scope));
+};
+
+const listKey = (scope: SyncScope, name: string) => `sync_list_${scope}_${name}`;
+
+/**
+ * A list saved with setSyncedList, or null when there is none or no sync
+ * token to apply changes from. Only the time-off request list is kept this
+ * way; other screens load in full.
+ */
+export const getSyncedList = <T>(scope: SyncScope, name: string): T[] | null => {
+    if (getSyncToken(scope) === null) {
+        return null;
+    }
+    try {
+        const list = JSON.parse(sessionStorage.getItem(listKey(scope, name)) || 'null');
+        return Array.isArray(list) ? list : null;
+    } catch (error) {
+        return null;
+    }
+};
+
+/** Save a list next to the scope's sync token, so the next visit only fetches what changed. */
+export const setSyncedList = <T>(scope: SyncScope, name: string, list: T[]) => {
+    try {
+        sessionStorage.setItem(listKey(scope, name), JSON.stringify(list));
+    } catch (error) {
+        // Out of storage; the next visit loads in full
+        sessionStorage.removeItem(listKey(scope, name));
+    }
+};
+
+/**
+ * Fetch what changed since the stored token and store the new one.
+ * Follows `more` until the server has nothing left, merging the batches.
+ * Logout clears sessionStorage, so the next user starts with a full load.
+ */
+export const fetchChanges = async (scope: SyncScope = 'employee'): Promise<SyncChanges> => {
+    try {
+        let since = getSyncToken(scope);
+        let merged: SyncChanges | null = null;
+        for (;;) {
+            const params: Record<string, string> = { scope };
+            if (since !== null) {
+                params.since = since;
+            }
+            const response = await axiosInstance.get<SyncChanges>(API_ENDPOINTS.SYNC, { params });
+            const batch = response.data;
+            merged = merged && !batch.reset ? mergeChanges(merged, batch) : batch;
+            since = String(batch.token);
+            sessionStorage.setItem(tokenKey(scope), since);
+            if (!batch.more || batch.reset) {
+                return merged;
+            }
+        }
+    } catch (error) {
+        return handleAPIError(error);
+    }
+};
+
+/**
+ * Apply one kind of object from a sync response to a loaded list:
+ * replace changed items by id, add new ones and drop the deleted ones.
+ */
+export const applyChanges = <T extends { id: number | string }>(older: T[], newer: T[], deleted: number[]): T[] => {
+    const newerIds = new Set(newer.map(item => String(item.id)));
+    const deletedIds = new Set(deleted.map(String));
+    return older
+        .filter(item => !newerIds.has(String(item.id)) && !deletedIds.has(String(item.id)))
+        .concat(newer);
+};
+
+const mergeChanges = (older: SyncChanges, newer: SyncChanges): SyncChanges => {
+    const keys = ['time_entries', 'time_off_requests', 'employees'] as const;
+    const merged = { ...newer, deleted: { ...newer.deleted } };
+    for (const key of keys) {
+        const upsertedIds = new Set(newer[key].map(item => Number(item.id)));
+        (merged as any)[key] = applyChanges(older[key] as any[], newer[key] as any[], newer.deleted[key]);
+        merged.deleted[key] = Array.from(new Set([
+            ...older.deleted[key].filter(id => !upsertedIds.has(id)),
+            ...newer.deleted[key],
+        ]));
+    }
+    return merged;
+};
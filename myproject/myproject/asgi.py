@@ -3,6 +3,20 @@ ASGI config for myproject project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Serve through this entry point (e.g. with uvicorn or daphne) for the live
+"who is in" board at /who-is-in/stream/; under WSGI that stream only sends
+a snapshot per connection. The kiosk can stay on its WSGI server
+(runserver, as started by rotate_jwt_key.bat): run the ASGI server next to
+it on another port, e.g.
+
+    uvicorn myproject.asgi:application --host 127.0.0.1 --port 8001
+
+and have the reverse proxy in front of both send /who-is-in/stream/ to it
+and everything else to the kiosk server. The stream follows punches from
+any process through the change log table, so the two servers only need to
+share the database. Restart it along with the kiosk server after
+rotate_jwt_key, which kills every python process.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.1/howto/deployment/asgi/
 """
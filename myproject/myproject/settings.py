@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 
+import importlib.util
 import os
 from pathlib import Path
 from dotenv import load_dotenv
@@ -229,10 +230,20 @@ CORS_ALLOW_HEADERS = [
 # Rest Framework settings
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        # JWTAuthentication that joins the user's employee and admin profile
+        'timeclock.api.authentication.ProfileJWTAuthentication',
     ),
+    # orjson-backed JSON first; it falls back to DRF's encoder without orjson
+    'DEFAULT_RENDERER_CLASSES': [
+        'timeclock.api.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
 }
 
+# MessagePack is offered (Accept: application/msgpack) when msgpack is installed
+if importlib.util.find_spec('msgpack'):
+    REST_FRAMEWORK['DEFAULT_RENDERER_CLASSES'].append('timeclock.api.renderers.MessagePackRenderer')
+
 # JWT settings
 from datetime import timedelta
 SIMPLE_JWT = {
@@ -1,7 +1,8 @@
 from django import forms
 from django.contrib import admin
-from .models import Employee, TimeEntry, Note, PasswordResetToken, BiometricCredential
+from .models import Employee, TimeEntry, Note, PasswordResetToken, BiometricCredential, LeaveLedgerEntry, ReportJob
 from django.utils import timezone
+from django.db.models import Case, When, Value, BooleanField
 from django.contrib.auth.models import User
 from django.contrib.auth.admin import UserAdmin
 from .models import AdminProfile, TimeOffRequest
@@ -24,13 +25,10 @@ admin.site.unregister(User)
 admin.site.register(User, CustomUserAdmin)
 
 # Define the custom actions
-@admin.action(description='Mark selected employees as Clocked In')
-def mark_as_clocked_in(modeladmin, request, queryset):
-    queryset.update(clocked_in=True)
-
-@admin.action(description='Mark selected employees as Clocked Out')
-def mark_as_clocked_out(modeladmin, request, queryset):
-    queryset.update(clocked_in=False)
+@admin.action(description='Repair clocked-in status from open time entries')
+def reconcile_open_entries(modeladmin, request, queryset):
+    changes = Employee.reconcile_open_entries(queryset)
+    modeladmin.message_user(request, f"Repaired clocked-in status for {len(changes)} employee(s).")
 
 @admin.action(description='Mark selected employees as NOT having Vacation allocated')
 def vacation_not_allocated(modeladmin, request, queryset):
@@ -52,20 +50,51 @@ def sick_allocated(modeladmin, request, queryset):
 def password_changes(modeladmin, request, queryset):
     queryset.update(force_password_change=True)
 	
+class ClockedInFilter(admin.SimpleListFilter):
+    title = 'clocked in'
+    parameter_name = 'clocked_in'
+
+    def lookups(self, request, model_admin):
+        return (('yes', 'Yes'), ('no', 'No'))
+
+    def queryset(self, request, queryset):
+        if self.value() == 'yes':
+            return queryset.filter(open_entry__isnull=False)
+        if self.value() == 'no':
+            return queryset.filter(open_entry__isnull=True)
+        return queryset
+
 # Customize the EmployeeAdmin
 class EmployeeAdmin(admin.ModelAdmin):
     list_display = ('first_name', 'last_name', 'employee_id', 'clocked_in', 'theme_id')
-    list_filter = ('clocked_in', 'last_name', 'theme_id')
+    list_filter = (ClockedInFilter, 'last_name', 'theme_id')
     search_fields = ('first_name', 'last_name', 'employee_id')
+    readonly_fields = ('open_entry',)
 
     # Register the custom actions
-    actions = [mark_as_clocked_in, mark_as_clocked_out, vacation_not_allocated, vacation_allocated, sick_not_allocated, sick_allocated, password_changes]
+    actions = [reconcile_open_entries, vacation_not_allocated, vacation_allocated, sick_not_allocated, sick_allocated, password_changes]
 	
     def get_queryset(self, request):
         # Get the default queryset
         qs = super().get_queryset(request)
-        # Order by clocked_in (True first), then last_name alphabetically
-        return qs.order_by('-clocked_in', 'last_name', 'first_name')
+        # Order by clocked in (True first), then last_name alphabetically
+        return qs.annotate(
+            is_clocked_in=Case(
+                When(open_entry__isnull=False, then=Value(True)),
+                default=Value(False),
+                output_field=BooleanField()
+            )
+        ).order_by('-is_clocked_in', 'last_name', 'first_name')
+
+    @admin.display(boolean=True, ordering='is_clocked_in', description='Clocked in')
+    def clocked_in(self, obj):
+        return obj.clocked_in
+
+    def save_model(self, request, obj, form, change):
+        # Hour balances edited here are recorded in the leave ledger
+        original = Employee.objects.get(pk=obj.pk) if change else Employee()
+        super().save_model(request, obj, form, change)
+        LeaveLedgerEntry.record_edits(obj, original, created_by=request.user)
 
 class NoteInlineForm(forms.ModelForm):
     class Meta:
@@ -208,6 +237,36 @@ class BiometricCredentialAdmin(admin.ModelAdmin):
         return super().get_queryset(request)
 
 admin.site.register(BiometricCredential, BiometricCredentialAdmin)
+
+class LeaveLedgerEntryAdmin(admin.ModelAdmin):
+    list_display = ('employee', 'leave_type', 'kind', 'hours', 'created_by', 'created_at', 'note')
+    list_filter = ('leave_type', 'kind', 'created_at')
+    search_fields = ('employee__first_name', 'employee__last_name', 'note')
+    readonly_fields = [field.name for field in LeaveLedgerEntry._meta.fields]
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('employee', 'created_by')
+
+    # The ledger is append-only
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+class ReportJobAdmin(admin.ModelAdmin):
+    list_display = ('kind', 'status', 'progress', 'created_by', 'created_at', 'finished_at')
+    list_filter = ('kind', 'status')
+    readonly_fields = [field.name for field in ReportJob._meta.fields]
+
+    def has_add_permission(self, request):
+        return False
+
+admin.site.register(ReportJob, ReportJobAdmin)
+admin.site.register(LeaveLedgerEntry, LeaveLedgerEntryAdmin)
 admin.site.register(Note, NoteAdmin)
 admin.site.register(Employee, EmployeeAdmin)
 admin.site.register(TimeEntry, TimeEntryAdmin)
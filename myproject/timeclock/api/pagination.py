@@ -0,0 +1,87 @@
+import json
+import logging
+from django.db import connection
+from rest_framework.pagination import CursorPagination
+from rest_framework.response import Response
+
+logger = logging.getLogger(__name__)
+
+# Result sets up to this size are counted exactly; beyond it the count is
+# estimated rather than paid for with a full COUNT(*).
+EXACT_COUNT_LIMIT = 10000
+
+
+def estimate_count(queryset, limit=EXACT_COUNT_LIMIT):
+    """Return (count, is_estimate) for the queryset.
+
+    Counts at most limit + 1 rows, which stays cheap however large the table
+    gets. Past that, MySQL's planner estimate is used; other databases report
+    the rows counted so far as a lower bound.
+    """
+    rows = queryset.order_by().values('pk')
+    exact = rows[:limit + 1].count()
+    if exact <= limit:
+        return exact, False
+
+    if connection.vendor == 'mysql':
+        try:
+            plan = json.loads(rows.explain(format='json'))
+            estimate = _planned_rows(plan, queryset.model._meta.db_table)
+            if estimate:
+                return max(int(estimate), exact), True
+        except Exception:
+            logger.warning('Could not estimate row count from the query plan', exc_info=True)
+    return exact, True
+
+
+def _planned_rows(node, table):
+    """Find the planner's output row estimate for table in a MySQL JSON plan."""
+    if isinstance(node, dict):
+        if node.get('table_name') == table and 'rows_produced_per_join' in node:
+            return node['rows_produced_per_join']
+        children = node.values()
+    elif isinstance(node, list):
+        children = node
+    else:
+        return None
+    for child in children:
+        found = _planned_rows(child, table)
+        if found is not None:
+            return found
+    return None
+
+
+class TimeEntryCursorPagination(CursorPagination):
+    """Keyset pagination over time entries, newest first.
+
+    Pages are positioned on clock_in_time (backed by its index) with id as
+    the tie-breaker, so every page costs the same however deep the client
+    goes. The first page also carries a total from estimate_count; later
+    pages return null to skip the work.
+    """
+    ordering = ('-clock_in_time', '-id')
+    page_size = 100
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.count = None
+        self.count_is_estimate = False
+        if not request.query_params.get(self.cursor_query_param):
+            self.count, self.count_is_estimate = estimate_count(queryset)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'count': self.count,
+            'count_is_estimate': self.count_is_estimate,
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        schema = super().get_paginated_response_schema(schema)
+        schema['properties']['count'] = {'type': 'integer', 'nullable': True}
+        schema['properties']['count_is_estimate'] = {'type': 'boolean'}
+        return schema
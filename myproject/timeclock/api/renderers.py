@@ -0,0 +1,52 @@
+"""Faster response renderers for the API.
+
+FastJSONRenderer encodes with orjson when it is installed and produces the
+same JSON as DRF's JSONRenderer: compact, UTF-8, with datetimes, Decimals
+and the other types DRF handles converted by DRF's own encoder. Without
+orjson, or when a client asks for indented output, it is DRF's renderer.
+
+MessagePackRenderer is offered to clients that send
+Accept: application/msgpack. It needs the msgpack package, and settings
+only list it when that package is installed.
+"""
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+_encoder = JSONEncoder()
+
+
+def _default(obj):
+    # orjson and msgpack hand over anything they do not encode themselves;
+    # DRF's encoder gives the same result the stock renderer would
+    return _encoder.default(obj)
+
+
+class FastJSONRenderer(JSONRenderer):
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None or self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # Datetimes go through _default so they keep DRF's millisecond, 'Z' form
+        ret = orjson.dumps(data, default=_default, option=orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS)
+        # Match JSONRenderer, which escapes these for use inside <script> tags
+        return ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+
+
+class MessagePackRenderer(BaseRenderer):
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        import msgpack
+
+        if data is None:
+            return b''
+        return msgpack.packb(data, default=_default, use_bin_type=True, datetime=False)
@@ -1,12 +1,15 @@
 from rest_framework import serializers
+from django.db import models
+from django.utils.functional import cached_property
 from django.contrib.auth.models import User
-from ...models import Employee, TimeEntry, AdminProfile
-from datetime import date, timedelta
+from ...models import Employee, TimeEntry, AdminProfile, LeaveLedgerEntry
+from datetime import date
 from decimal import Decimal
 from django.utils import timezone
 from ..utils import format_hours
+from .sparse import SparseFieldsetMixin
 
-class AdminEmployeeSerializer(serializers.ModelSerializer):
+class AdminEmployeeSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     years_employed = serializers.SerializerMethodField()
     vacation_hours_remaining = serializers.SerializerMethodField()
     sick_hours_remaining = serializers.SerializerMethodField()
@@ -74,22 +77,14 @@ class AdminEmployeeSerializer(serializers.ModelSerializer):
         return format_hours(obj.sick_hours_used)
 
     def get_clocked_status(self, obj):
-        # Get the current time in the system's timezone
-        current_time = timezone.localtime()
-        start_of_day = current_time.replace(hour=0, minute=0, second=0, microsecond=0)
-        end_of_day = start_of_day + timedelta(days=1)
-
-        # Get the latest entry for today only
-        latest_entry = obj.timeentry_set.filter(
-            clock_in_time__gte=start_of_day,
-            clock_in_time__lt=end_of_day
-        ).order_by('-clock_in_time').first()
-
-        if not latest_entry:
-            return "Not Clocked In"
-        if latest_entry.clock_out_time:
-            return "Not Clocked In"
-        return "Clocked In"
+        # AdminEmployeeViewSet annotates clocked_in_today; other callers fall back to the open entry
+        clocked_in_today = getattr(obj, 'clocked_in_today', None)
+        if clocked_in_today is None:
+            clocked_in_today = (
+                obj.open_entry is not None
+                and timezone.localtime(obj.open_entry.clock_in_time).date() == timezone.localdate()
+            )
+        return "Clocked In" if clocked_in_today else "Not Clocked In"
 
     def create(self, validated_data):
         raise NotImplementedError("User creation is not allowed from this serializer.")
@@ -101,15 +96,43 @@ class AdminEmployeeSerializer(serializers.ModelSerializer):
             user.first_name = validated_data.get('first_name', user.first_name)
             user.last_name = validated_data.get('last_name', user.last_name)
             user.save()
-        
-        return super().update(instance, validated_data)
+
+        # Record edited hour balances in the leave ledger before they are saved
+        original = Employee(**{
+            field: getattr(instance, field) for field in (
+                'vacation_hours_allocated', 'vacation_hours_used',
+                'sick_hours_allocated', 'sick_hours_used'
+            )
+        })
+        updated_instance = super().update(instance, validated_data)
+        request = self.context.get('request')
+        LeaveLedgerEntry.record_edits(updated_instance, original, created_by=request.user if request else None)
+
+        return updated_instance
 
 class AdminProfileSerializer(serializers.ModelSerializer):
     class Meta:
         model = AdminProfile
         fields = ['background_image', 'theme_id']
 
-class AdminTimeEntrySerializer(serializers.ModelSerializer):
+def _iso_datetime(local_time):
+    # Same output as DRF's DateTimeField with the default ISO 8601 format
+    value = local_time.isoformat()
+    if value.endswith('+00:00'):
+        value = value[:-6] + 'Z'
+    return value
+
+class AdminTimeEntryListSerializer(serializers.ListSerializer):
+    """Builds each row with AdminTimeEntrySerializer.row, skipping the per-field pass."""
+
+    def to_representation(self, data):
+        iterable = data.all() if isinstance(data, models.Manager) else data
+        row = self.child.row
+        return [row(entry) for entry in iterable]
+
+class AdminTimeEntrySerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    # The read-only fields below are produced by row(), which formats
+    # each entry in one pass instead of a method call per field
     employee_id = serializers.CharField(write_only=True)
     employee_name = serializers.SerializerMethodField()
     total_hours = serializers.SerializerMethodField()
@@ -120,10 +143,13 @@ class AdminTimeEntrySerializer(serializers.ModelSerializer):
     hours_worked_display = serializers.SerializerMethodField()
     notes = serializers.ListField(child=serializers.DictField(), write_only=True, required=False)
     notes_display = serializers.SerializerMethodField()
+    # Same content as notes_display, kept on single-entry responses for
+    # older clients; lists leave it out rather than send every note twice
     notes_data = serializers.SerializerMethodField()
 
     class Meta:
         model = TimeEntry
+        list_serializer_class = AdminTimeEntryListSerializer
         fields = (
             'id',
             'employee_id',
@@ -144,62 +170,61 @@ class AdminTimeEntrySerializer(serializers.ModelSerializer):
             'entry_type'
         )
 
-    def get_employee_name(self, obj):
-        return f"{obj.employee.first_name} {obj.employee.last_name}"
-
-    def get_creator_name(self, user):
-        if not user:
-            return "Unknown"
-        # Check if the username is numeric, indicating that it's an employee ID
-        if user.username.isdigit():
-            # Find the employee associated with this user and return their first name
-            employee = Employee.objects.filter(user=user).first()
-            if employee:
-                return employee.first_name
-        # If not an employee or employee not found, return the username
-        return user.username
+    def to_representation(self, instance):
+        return self.row(instance, notes_data=True)
 
-    def get_notes_display(self, obj):
-        return [{
-            'id': note.id,
-            'note_text': note.note_text,
-            'created_by': self.get_creator_name(note.created_by),
-            'created_at': timezone.localtime(note.created_at).strftime('%Y-%m-%d %H:%M')
-        } for note in obj.notes.all()]
+    @cached_property
+    def _output_fields(self):
+        # Fields left after ?fields=/?omit= (see SparseFieldsetMixin)
+        return frozenset(name for name, field in self.fields.items() if not field.write_only)
 
-    def get_notes_data(self, obj):
-        return [{
-            'id': note.id,
-            'note_text': note.note_text,
-            'created_by': self.get_creator_name(note.created_by),
-            'created_at': timezone.localtime(note.created_at).strftime('%Y-%m-%d %H:%M')
-        } for note in obj.notes.all()]
+    def row(self, obj, notes_data=False):
+        """Return the read representation of one time entry.
 
-    def get_total_hours(self, obj):
-        if obj.clock_out_time:
-            return format_hours(obj.hours_worked)
-        return None
+        Only the requested fields are computed; each timestamp is converted
+        to local time once and reused.
+        """
+        fields = self._output_fields
+        clock_in = timezone.localtime(obj.clock_in_time) if obj.clock_in_time else None
+        clock_out = timezone.localtime(obj.clock_out_time) if obj.clock_out_time else None
 
-    def get_entry_date(self, obj):
-        if obj.clock_in_time:
-            local_time = timezone.localtime(obj.clock_in_time)
-            return local_time.strftime('%Y-%m-%d')
-        return None
+        data = {}
+        if 'id' in fields:
+            data['id'] = obj.id
+        if 'employee_name' in fields:
+            data['employee_name'] = f"{obj.employee.first_name} {obj.employee.last_name}"
+        if 'clock_in_time' in fields:
+            data['clock_in_time'] = _iso_datetime(clock_in) if clock_in else None
+        if 'clock_out_time' in fields:
+            data['clock_out_time'] = _iso_datetime(clock_out) if clock_out else None
+        if 'entry_date' in fields:
+            data['entry_date'] = clock_in.strftime('%Y-%m-%d') if clock_in else None
+        if 'clock_in_time_formatted' in fields:
+            data['clock_in_time_formatted'] = clock_in.strftime('%I:%M %p') if clock_in else None
+        if 'clock_out_time_formatted' in fields:
+            data['clock_out_time_formatted'] = clock_out.strftime('%I:%M %p') if clock_out else None
+        if 'hours_worked_display' in fields:
+            data['hours_worked_display'] = obj.hours_worked_admin_view()
+        if 'total_hours' in fields:
+            data['total_hours'] = format_hours(obj.hours_worked) if clock_out else None
 
-    def get_clock_in_time_formatted(self, obj):
-        if obj.clock_in_time:
-            local_time = timezone.localtime(obj.clock_in_time)
-            return local_time.strftime('%I:%M %p')
-        return None
+        notes_data = notes_data and 'notes_data' in fields
+        if 'notes_display' in fields or notes_data:
+            notes = [{
+                'id': note.id,
+                'note_text': note.note_text,
+                'created_by': note.creator_name,
+                'created_at': timezone.localtime(note.created_at).strftime('%Y-%m-%d %H:%M')
+            } for note in obj.notes.all()]
+            if 'notes_display' in fields:
+                data['notes_display'] = notes
+            if notes_data:
+                data['notes_data'] = notes
 
-    def get_clock_out_time_formatted(self, obj):
-        if obj.clock_out_time:
-            local_time = timezone.localtime(obj.clock_out_time)
-            return local_time.strftime('%I:%M %p')
-        return None
-
-    def get_hours_worked_display(self, obj):
-        return obj.hours_worked_admin_view()
+        for name in ('is_vacation', 'is_sick', 'is_holiday', 'entry_type'):
+            if name in fields:
+                data[name] = getattr(obj, name)
+        return data
 
     def create(self, validated_data):
         employee_id = validated_data.pop('employee_id')
@@ -220,11 +245,6 @@ class AdminTimeEntrySerializer(serializers.ModelSerializer):
                         created_by=request.user if request else None
                     )
             
-            # Update employee clocked-in status
-            if instance.clock_in_time.date() == timezone.localtime(timezone.now()).date():
-                employee.clocked_in = not bool(instance.clock_out_time)
-                employee.save(update_fields=['clocked_in'])
-            
             return instance
         except Employee.DoesNotExist:
             raise serializers.ValidationError({'employee_id': 'Employee not found'})
@@ -252,11 +272,7 @@ class AdminTimeEntrySerializer(serializers.ModelSerializer):
                         created_by=request.user if request else None
                     )
         
+        # TimeEntry.save keeps the employee's open_entry pointer in step with the entry
         updated_instance = super().update(instance, validated_data)
         
-        # Update employee clocked-in status
-        if updated_instance.clock_in_time.date() == timezone.localtime(timezone.now()).date():
-            updated_instance.employee.clocked_in = not bool(updated_instance.clock_out_time)
-            updated_instance.employee.save(update_fields=['clocked_in'])
-        
         return updated_instance
@@ -2,13 +2,14 @@ from rest_framework import serializers
 from django.contrib.auth.models import User
 from ...models import Employee, TimeEntry, Note
 from ..utils import format_hours
+from .sparse import SparseFieldsetMixin
 
 class UserSerializer(serializers.ModelSerializer):
     class Meta:
         model = User
         fields = ('username', 'first_name', 'last_name')
 
-class EmployeeSerializer(serializers.ModelSerializer):
+class EmployeeSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     user = UserSerializer(read_only=True)
     vacation_hours_remaining = serializers.SerializerMethodField()
     sick_hours_remaining = serializers.SerializerMethodField()
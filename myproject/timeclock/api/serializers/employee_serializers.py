@@ -3,8 +3,9 @@ from timeclock.models import Employee
 from timeclock.api.utils import format_hours
 from dateutil.relativedelta import relativedelta
 from datetime import date
+from .sparse import SparseFieldsetMixin
 
-class EmployeeSerializer(serializers.ModelSerializer):
+class EmployeeSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     vacation_hours_allocated_display = serializers.SerializerMethodField()
     vacation_hours_used_display = serializers.SerializerMethodField()
     vacation_hours_remaining_display = serializers.SerializerMethodField()
@@ -78,11 +79,14 @@ class EmployeeSerializer(serializers.ModelSerializer):
         user_data = validated_data.pop('user', None)
         if user_data and 'email' in user_data:
             instance.user.email = user_data['email']
-            instance.user.save()
+            instance.user.save(update_fields=['email'])
 
-        # Update other fields on the Employee instance if necessary
+        # Update other fields on the Employee instance if necessary. Only the
+        # edited columns are written, so hours and the clocked-in state
+        # changed since the instance was loaded are left alone.
         for attr, value in validated_data.items():
             setattr(instance, attr, value)
-        instance.save()
+        if validated_data:
+            instance.save(update_fields=list(validated_data))
 
         return instance
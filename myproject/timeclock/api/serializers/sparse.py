@@ -0,0 +1,29 @@
+from rest_framework.permissions import SAFE_METHODS
+
+class SparseFieldsetMixin:
+    """Let read requests pick response fields with ?fields=a,b or ?omit=a,b.
+
+    Dropped fields are removed from the serializer before anything is
+    serialized, so their SerializerMethodFields are never called. Unknown
+    names are ignored. Needs the request in the serializer context; writes
+    always see the full field set so validation is unchanged.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get('request')
+        if request is None or request.method not in SAFE_METHODS:
+            return
+
+        params = getattr(request, 'query_params', request.GET)
+        only = _names(params.get('fields'))
+        omit = _names(params.get('omit'))
+        if not only and not omit:
+            return
+
+        for name in list(self.fields):
+            if (only and name not in only) or name in omit:
+                self.fields.pop(name)
+
+def _names(value):
+    return {name.strip() for name in value.split(',') if name.strip()} if value else set()
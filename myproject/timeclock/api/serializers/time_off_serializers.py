@@ -1,10 +1,11 @@
 from rest_framework import serializers
 from ...models import TimeOffRequest
+from .sparse import SparseFieldsetMixin
 import logging
 
 logger = logging.getLogger(__name__)
 
-class TimeOffRequestSerializer(serializers.ModelSerializer):
+class TimeOffRequestSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     employee_name = serializers.SerializerMethodField()
     request_type_display = serializers.SerializerMethodField()
     status_display = serializers.SerializerMethodField()
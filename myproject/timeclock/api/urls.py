@@ -18,6 +18,9 @@ from .views.base_views import (
 from .views.auth_views import logout_view, change_password
 from .views import theme_views
 from .views.email_update_view import EmailUpdateView
+from .views.export_views import columnar_export
+from .views.sync_views import sync_changes
+from .views.bootstrap_views import bootstrap
 from .views.password_reset import request_password_reset, reset_password
 from .views.biometric_views import BiometricLoginView, BiometricRegistrationView, BiometricVerifyView
 
@@ -33,10 +36,14 @@ urlpatterns = [
     path('employee/info/', employee_info, name='api_employee_info'),
     path('employee/time-entries/', time_entries, name='api_time_entries'),
     path('employee/background-image/', background_image, name='api_background_image'),
+    path('bootstrap/', bootstrap, name='api_bootstrap'),
     # Admin time entry type-specific endpoints
     path('admin/time-entries/vacation/', add_vacation_entry, name='api_add_vacation_entry'),
     path('admin/time-entries/sick/', add_sick_time_entry, name='api_add_sick_time_entry'),
     path('admin/time-entries/holiday/', add_holiday_entry, name='api_add_holiday_entry'),
+    # Columnar (Parquet / Arrow) exports for analytics
+    path('admin/exports/<str:dataset>/', columnar_export, name='api_columnar_export'),
+    path('sync/', sync_changes, name='api_sync_changes'),
     # Theme preferences endpoints
     path('user/preferences/theme/', theme_views.get_theme_preference, name='get_theme_preference'),
     path('user/preferences/theme/update/', theme_views.update_theme_preference, name='update_theme_preference'),
@@ -8,7 +8,7 @@ from datetime import time, timedelta
 from decimal import Decimal
 from ...models import Employee, TimeEntry, Note
 from ..serializers.admin_serializers import AdminTimeEntrySerializer
-from ...views.time_entry_views import handle_notes, update_employee_clocked_in_status, parse_and_validate_time
+from ...views.time_entry_views import handle_notes, parse_and_validate_time
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
@@ -1,43 +1,50 @@
 from rest_framework import viewsets, permissions
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from datetime import timedelta
+from django.db.models import Exists, OuterRef
 from django.shortcuts import get_object_or_404
+from django.utils import timezone
 from ..serializers import AdminEmployeeSerializer
-from ...models import Employee
+from ...models import Employee, TimeEntry
 
 class IsAdminUser(permissions.BasePermission):
     def has_permission(self, request, view):
         return bool(request.user and request.user.is_staff)
 
+def with_clocked_in_today(employees):
+    """Annotate what AdminEmployeeSerializer reads for clocked_in."""
+    # Clocked in means the open entry was started today; checked against
+    # open_entry's primary key in the same query as the employees
+    start_of_day = timezone.localtime().replace(hour=0, minute=0, second=0, microsecond=0)
+    end_of_day = start_of_day + timedelta(days=1)
+    return employees.annotate(
+        clocked_in_today=Exists(TimeEntry.objects.filter(
+            pk=OuterRef('open_entry_id'),
+            clock_in_time__gte=start_of_day,
+            clock_in_time__lt=end_of_day,
+        ))
+    )
+
 class AdminEmployeeViewSet(viewsets.ModelViewSet):
     serializer_class = AdminEmployeeSerializer
     permission_classes = [permissions.IsAuthenticated, IsAdminUser]
     
     def get_queryset(self):
-        return Employee.objects.all().order_by('last_name', 'first_name')
+        return with_clocked_in_today(Employee.objects.all()).order_by('last_name', 'first_name')
 
     def perform_create(self, serializer):
         serializer.save()
 
     def perform_update(self, serializer):
-        try:
-            clocked_in = self.request.data.get('clocked_in')
-            if clocked_in is not None:
-                serializer.instance.clocked_in = clocked_in
-            serializer.save()
-        except Exception as e:
-            raise serializers.ValidationError({'detail': str(e)})
+        # clocked_in is derived from the employee's open time entry, so a
+        # 'clocked_in' value in the request is ignored; edit the entries instead.
+        serializer.save()
 
     @action(detail=True, methods=['get', 'patch'])
     def status(self, request, pk=None):
+        # PATCH is still accepted for older clients but status follows the open entry
         employee = self.get_object()
-        
-        if request.method == 'PATCH':
-            clocked_in = request.data.get('clocked_in')
-            if clocked_in is not None:
-                employee.clocked_in = clocked_in
-                employee.save()
-            
         return Response({
             'clocked_in': employee.clocked_in
         })
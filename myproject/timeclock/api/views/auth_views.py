@@ -41,8 +41,8 @@ def change_password(request):
         employee.force_password_change = False
         
         # Save both objects
-        user.save()
-        employee.save()
+        user.save(update_fields=['password'])
+        employee.save(update_fields=['force_password_change'])
 
         # Generate new tokens
         refresh = RefreshToken.for_user(user)
@@ -92,13 +92,13 @@ def reset_password(request, token):
 
         # Set the new password
         user.set_password(new_password)
-        user.save()
+        user.save(update_fields=['password'])
 
         # If user has an employee profile, update force_password_change
         try:
             if hasattr(user, 'employee'):
                 user.employee.force_password_change = False
-                user.employee.save()
+                user.employee.save(update_fields=['force_password_change'])
         except:
             pass  # Not all users have employee profiles
 
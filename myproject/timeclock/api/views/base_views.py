@@ -5,11 +5,13 @@ from rest_framework.permissions import IsAuthenticated
 from django.contrib.auth import authenticate
 from rest_framework_simplejwt.tokens import RefreshToken
 from django.core.exceptions import ObjectDoesNotExist
-from ...models import Employee, TimeEntry, AdminProfile, Note
+from ...models import Employee, TimeEntry, AdminProfile, Note, DailyTotal, PayWeekTotal
+from ...utils import pay_week_start
+from ... import punches
+from ...data_version import conditional_employee_get
 from ..serializers.employee_serializers import EmployeeSerializer
 from ..serializers.time_entry_serializers import TimeEntrySerializer
 from django.utils import timezone
-from collections import defaultdict
 from datetime import timedelta
 from django.utils.timezone import localtime
 import pytz
@@ -120,212 +122,200 @@ def login_view(request):
     except Exception as e:
         return Response({'error': 'Authentication failed'}, status=401)
 
+def employee_info_data(request, employee):
+    """Return the employee/info body."""
+    return EmployeeSerializer(employee, context={'request': request}).data
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@conditional_employee_get
 def employee_info(request):
     try:
         employee = request.user.employee
-        serializer = EmployeeSerializer(employee)
-        return Response(serializer.data)
+        return Response(employee_info_data(request, employee))
     except Employee.DoesNotExist:
         return Response({'error': 'Employee not found'}, status=404)
     except Exception as e:
         return Response({'error': str(e)}, status=500)
 
+def parse_month_param(request):
+    """Return the date in the ?date= parameter (YYYY-MM-DD), default today; raises ValueError."""
+    date_param = request.GET.get('date', timezone.now().date().isoformat())
+    return timezone.datetime.strptime(date_param, '%Y-%m-%d').date()
+
+def empty_time_entries_data():
+    return {
+        'entries': [],
+        'total_hours': format_hours(0),
+        'weekly_totals': {},
+        'clocked_in': False,
+        'clock_in_time': None
+    }
+
+def time_entries_data(employee, target_date):
+    """Return the employee/time-entries GET body for the month containing target_date."""
+    # Get the first day of the month
+    start_of_month = target_date.replace(day=1)
+    
+    # Widen the range back to the Thursday that starts the first pay week
+    adjusted_start_of_month = pay_week_start(start_of_month)
+    
+    # Get the end of the month
+    if start_of_month.month == 12:
+        end_of_month = start_of_month.replace(year=start_of_month.year + 1, month=1, day=1) - timedelta(days=1)
+    else:
+        end_of_month = start_of_month.replace(month=start_of_month.month + 1, day=1) - timedelta(days=1)
+    
+    # Convert to datetime in America/New_York timezone
+    eastern = pytz.timezone('America/New_York')
+    start_datetime = eastern.localize(timezone.datetime.combine(adjusted_start_of_month, timezone.datetime.min.time()))
+    end_datetime = eastern.localize(timezone.datetime.combine(end_of_month, timezone.datetime.max.time()))
+    
+    # Prefetch related notes
+    notes_prefetch = Prefetch(
+        'notes',
+        queryset=Note.objects.select_related('created_by__employee').order_by('-created_at')
+    )
+    
+    # Query time entries for the entire month
+    entries = TimeEntry.objects.filter(
+        employee=employee,
+        clock_in_time__gte=start_datetime,
+        clock_in_time__lte=end_datetime
+    ).prefetch_related(notes_prefetch).order_by('clock_in_time')
+    
+    # Weekly totals (Thursday to Wednesday) are maintained on write
+    week_seconds = PayWeekTotal.seconds_by_week(employee, adjusted_start_of_month, end_of_month)
+    weekly_totals = {
+        start_of_week.isoformat(): seconds / 3600
+        for start_of_week, seconds in sorted(week_seconds.items())
+        if seconds
+    }
+    
+    # Calculate total hours for the month
+    total_hours = DailyTotal.total_seconds(employee, adjusted_start_of_month, end_of_month) / 3600
+    
+    # Get the current clock-in status
+    current_entry = employee.open_entry
+    
+    clocked_in = bool(current_entry)
+    clock_in_time = localtime(current_entry.clock_in_time).strftime('%I:%M %p') if current_entry else None
+    
+    # Format weekly totals using format_hours
+    formatted_weekly_totals = {
+        week: format_hours(hours) for week, hours in weekly_totals.items()
+    }
+    
+    try:
+        # Serialize the entries with total_hours context
+        serializer = TimeEntrySerializer(entries, many=True, context={'total_hours': total_hours})
+        
+        return {
+            'entries': serializer.data,
+            'total_hours': format_hours(total_hours),
+            'weekly_totals': formatted_weekly_totals,
+            'clocked_in': clocked_in,
+            'clock_in_time': clock_in_time
+        }
+    except Exception as e:
+        # Return a basic response without notes if there's a serialization error
+        basic_entries = [{
+            'id': entry.id,
+            'clock_in_time': entry.clock_in_time.isoformat(),
+            'clock_out_time': entry.clock_out_time.isoformat() if entry.clock_out_time else None,
+            'hours_worked': entry.hours_worked,
+            'hours_worked_display': format_hours(entry.hours_worked) if entry.hours_worked else '0H 0M',
+            'is_vacation': entry.is_vacation,
+            'is_sick': entry.is_sick,
+            'notes': []
+        } for entry in entries]
+        
+        return {
+            'entries': basic_entries,
+            'total_hours': format_hours(total_hours),
+            'weekly_totals': formatted_weekly_totals,
+            'clocked_in': clocked_in,
+            'clock_in_time': clock_in_time
+        }
+
 @api_view(['GET', 'POST'])
 @permission_classes([IsAuthenticated])
+@conditional_employee_get
 def time_entries(request):
     if request.method == 'GET':
         try:
             employee = request.user.employee
             
             # Get the date parameter, default to today
-            date_param = request.GET.get('date', timezone.now().date().isoformat())
-            target_date = timezone.datetime.strptime(date_param, '%Y-%m-%d').date()
-            
-            # Get the first day of the month
-            start_of_month = target_date.replace(day=1)
-            
-            # Determine the day of the week for the start_of_month (Monday=0, Tuesday=1, ..., Sunday=6)
-            weekday_of_start_of_month = start_of_month.weekday()
-            
-            # Adjust the start_of_month to the previous Thursday if necessary
-            if weekday_of_start_of_month >= 3:
-                adjusted_days = weekday_of_start_of_month - 3
-            else:
-                adjusted_days = weekday_of_start_of_month + 4
-
-            adjusted_start_of_month = start_of_month - timedelta(days=adjusted_days)
-            
-            # Get the end of the month
-            if start_of_month.month == 12:
-                end_of_month = start_of_month.replace(year=start_of_month.year + 1, month=1, day=1) - timedelta(days=1)
-            else:
-                end_of_month = start_of_month.replace(month=start_of_month.month + 1, day=1) - timedelta(days=1)
-            
-            # Convert to datetime in America/New_York timezone
-            eastern = pytz.timezone('America/New_York')
-            start_datetime = eastern.localize(timezone.datetime.combine(adjusted_start_of_month, timezone.datetime.min.time()))
-            end_datetime = eastern.localize(timezone.datetime.combine(end_of_month, timezone.datetime.max.time()))
-            
-            # Prefetch related notes
-            notes_prefetch = Prefetch(
-                'notes',
-                queryset=Note.objects.select_related('created_by').order_by('-created_at')
-            )
-            
-            # Query time entries for the entire month
-            entries = TimeEntry.objects.filter(
-                employee=employee,
-                clock_in_time__gte=start_datetime,
-                clock_in_time__lte=end_datetime
-            ).prefetch_related(notes_prefetch).order_by('clock_in_time')
-            
-            # Group entries by week (Thursday to Wednesday) and calculate weekly totals
-            weekly_totals = defaultdict(float)
-            for entry in entries:
-                if entry.clock_out_time:
-                    clock_in_time_local = localtime(entry.clock_in_time)
-                    weekday = clock_in_time_local.weekday()
-                    # Calculate start of work week (Thursday)
-                    start_of_week = clock_in_time_local.date() - timedelta(days=(weekday - 3 if weekday >= 3 else weekday + 4))
-                    
-                    # Calculate hours worked
-                    duration = localtime(entry.clock_out_time) - clock_in_time_local
-                    hours_worked = duration.total_seconds() / 3600
-                    weekly_totals[start_of_week.isoformat()] += hours_worked
-            
-            # Calculate total hours for the month
-            total_hours = sum(weekly_totals.values())
-            
-            # Get the current clock-in status
-            current_entry = TimeEntry.objects.filter(
-                employee=employee,
-                clock_out_time__isnull=True
-            ).first()
+            target_date = parse_month_param(request)
             
-            clocked_in = bool(current_entry)
-            clock_in_time = localtime(current_entry.clock_in_time).strftime('%I:%M %p') if current_entry else None
-            
-            try:
-                # Serialize the entries with total_hours context
-                serializer = TimeEntrySerializer(entries, many=True, context={'total_hours': total_hours})
-                
-                # Format weekly totals using format_hours
-                formatted_weekly_totals = {
-                    week: format_hours(hours) for week, hours in weekly_totals.items()
-                }
-                
-                response_data = {
-                    'entries': serializer.data,
-                    'total_hours': format_hours(total_hours),
-                    'weekly_totals': formatted_weekly_totals,
-                    'clocked_in': clocked_in,
-                    'clock_in_time': clock_in_time
-                }
-                
-                return Response(response_data)
-            except Exception as e:
-                # Return a basic response without notes if there's a serialization error
-                basic_entries = [{
-                    'id': entry.id,
-                    'clock_in_time': entry.clock_in_time.isoformat(),
-                    'clock_out_time': entry.clock_out_time.isoformat() if entry.clock_out_time else None,
-                    'hours_worked': entry.hours_worked,
-                    'hours_worked_display': format_hours(entry.hours_worked) if entry.hours_worked else '0H 0M',
-                    'is_vacation': entry.is_vacation,
-                    'is_sick': entry.is_sick,
-                    'notes': []
-                } for entry in entries]
-                
-                response_data = {
-                    'entries': basic_entries,
-                    'total_hours': format_hours(total_hours),
-                    'weekly_totals': formatted_weekly_totals,
-                    'clocked_in': clocked_in,
-                    'clock_in_time': clock_in_time
-                }
-                return Response(response_data)
+            return Response(time_entries_data(employee, target_date))
             
         except Employee.DoesNotExist:
             return Response({'error': 'Employee not found'}, status=404)
         except Exception as e:
-            return Response({
-                'entries': [],
-                'total_hours': format_hours(0),
-                'weekly_totals': {},
-                'clocked_in': False,
-                'clock_in_time': None
-            })
+            return Response(empty_time_entries_data())
             
     elif request.method == 'POST':
-        try:
-            employee = request.user.employee
-            action = request.data.get('action')
-            
+        action = request.data.get('action')
+        punch_id = request.data.get('punch_id')
+
+        def punch():
+            try:
+                employee = Employee.objects.select_related('open_entry').get(user=request.user)
+            except Employee.DoesNotExist:
+                return {'error': 'Employee not found'}, 404
+
             if action == 'clock_in':
-                if employee.clocked_in:
-                    return Response({'error': 'Already clocked in'}, status=400)
-                    
-                # Create new time entry
-                entry = TimeEntry.objects.create(
-                    employee=employee,
-                    clock_in_time=timezone.now()
-                )
-                employee.clocked_in = True
-                employee.save()
-                
-                return Response({
+                result = punches.clock_in(employee)
+                if not result.changed:
+                    return {'error': 'Already clocked in'}, 400
+
+                return {
                     'message': 'Clocked in successfully',
-                    'clock_in_time': localtime(entry.clock_in_time).strftime('%I:%M %p')
-                })
-                
+                    'clock_in_time': localtime(result.entry.clock_in_time).strftime('%I:%M %p')
+                }, 200
+
             elif action == 'clock_out':
-                if not employee.clocked_in:
-                    return Response({'error': 'Not clocked in'}, status=400)
-                    
-                # Find the open time entry and close it
-                entry = TimeEntry.objects.filter(
-                    employee=employee,
-                    clock_out_time__isnull=True
-                ).first()
-                
-                if entry:
-                    entry.clock_out_time = timezone.now()
-                    entry.save()
-                    
-                employee.clocked_in = False
-                employee.save()
-                
-                return Response({'message': 'Clocked out successfully'})
-                
+                result = punches.clock_out(employee)
+                if not result.changed:
+                    return {'error': 'Not clocked in'}, 400
+
+                return {'message': 'Clocked out successfully'}, 200
+
             else:
-                return Response({'error': 'Invalid action'}, status=400)
-                
-        except Employee.DoesNotExist:
-            return Response({'error': 'Employee not found'}, status=404)
+                return {'error': 'Invalid action'}, 400
+
+        # Retries carrying the same punch_id get the first response back
+        try:
+            data, status = punches.idempotent_punch(f'user:{request.user.pk}', punch_id, punch)
+        except punches.InvalidPunchId:
+            return Response({'error': 'Invalid punch_id'}, status=400)
+        except punches.PunchInProgress:
+            return Response({'error': 'Punch in progress'}, status=409)
+        return Response(data, status=status)
+
+def background_image_data(user):
+    """Return the employee/background-image GET body."""
+    logger.info(f"Getting background image for user: {user.username} (is_staff: {user.is_staff})")
+    
+    if user.is_staff:
+        # Get admin background
+        admin_profile = user.adminprofile
+        logger.info(f"Admin profile found, background: {admin_profile.background_image or 'None'}")
+        return {'background_image': admin_profile.background_image or None}
+    else:
+        # Get employee background
+        employee = user.employee
+        logger.info(f"Employee profile found, background: {employee.background_image or 'None'}")
+        return {'background_image': employee.background_image or None}
 
 @api_view(['GET', 'POST'])
 @permission_classes([IsAuthenticated])
 def background_image(request):
     if request.method == 'GET':
         try:
-            logger.info(f"Getting background image for user: {request.user.username} (is_staff: {request.user.is_staff})")
-            
-            if request.user.is_staff:
-                # Get admin background
-                admin_profile = request.user.adminprofile
-                logger.info(f"Admin profile found, background: {admin_profile.background_image or 'None'}")
-                if not admin_profile.background_image:
-                    return Response({'background_image': None})
-                return Response({'background_image': admin_profile.background_image})
-            else:
-                # Get employee background
-                employee = request.user.employee
-                logger.info(f"Employee profile found, background: {employee.background_image or 'None'}")
-                if not employee.background_image:
-                    return Response({'background_image': None})
-                return Response({'background_image': employee.background_image})
+            return Response(background_image_data(request.user))
         except (Employee.DoesNotExist, AdminProfile.DoesNotExist) as e:
             logger.error(f"Profile not found for user {request.user.username}: {str(e)}")
             return Response({'error': 'Profile not found'}, status=404)
@@ -344,12 +334,12 @@ def background_image(request):
             if request.user.is_staff:
                 admin_profile = request.user.adminprofile
                 admin_profile.background_image = background_image
-                admin_profile.save()
+                admin_profile.save(update_fields=['background_image'])
                 logger.info("Successfully updated admin background image")
             else:
                 employee = request.user.employee
                 employee.background_image = background_image
-                employee.save()
+                employee.save(update_fields=['background_image'])
                 logger.info("Successfully updated employee background image")
             return Response({'message': 'Background image updated successfully'})
         except (Employee.DoesNotExist, AdminProfile.DoesNotExist) as e:
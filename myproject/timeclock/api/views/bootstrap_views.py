@@ -0,0 +1,74 @@
+from django.core.exceptions import ObjectDoesNotExist
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from ...models import Employee
+from ..serializers import TimeOffRequestSerializer
+from .base_views import (
+    logger,
+    employee_info_data,
+    parse_month_param,
+    empty_time_entries_data,
+    time_entries_data,
+    background_image_data,
+)
+from .theme_views import theme_preference_data
+from .time_off_views import time_off_requests_for
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def bootstrap(request):
+    """Everything the app loads at startup, in one response.
+
+    The keys hold what employee/info, employee/time-entries (for ?date=,
+    default this month), employee/background-image,
+    user/preferences/theme and time-off-requests return. The employee and
+    its open entry are loaded once and shared by all of them. employee
+    and time_entries are null for users without an employee record; a
+    part that fails is null with its error under errors, and the rest is
+    still returned.
+    """
+    user = request.user
+    try:
+        # Cached on the user, so every part below reuses this one query
+        user.employee = Employee.objects.select_related('open_entry').get(user=user)
+    except Employee.DoesNotExist:
+        employee = None
+    else:
+        employee = user.employee
+
+    try:
+        target_date = parse_month_param(request)
+    except ValueError:
+        return Response({'error': 'date must be in YYYY-MM-DD format'}, status=400)
+
+    data = {}
+    errors = {}
+
+    def part(key, load):
+        try:
+            data[key] = load()
+        except ObjectDoesNotExist:
+            data[key] = None
+            errors[key] = 'Profile not found'
+        except Exception as e:
+            logger.error(f"Bootstrap failed to load {key} for user {user.username}: {str(e)}")
+            data[key] = None
+            errors[key] = str(e)
+
+    if employee is not None:
+        part('employee', lambda: employee_info_data(request, employee))
+        part('time_entries', lambda: time_entries_data(employee, target_date))
+        if data['time_entries'] is None:
+            data['time_entries'] = empty_time_entries_data()
+    else:
+        data['employee'] = None
+        data['time_entries'] = None
+    part('background_image', lambda: background_image_data(user)['background_image'])
+    part('theme', lambda: theme_preference_data(user)['themeId'])
+    part('time_off_requests', lambda: TimeOffRequestSerializer(
+        time_off_requests_for(user), many=True, context={'request': request}
+    ).data)
+
+    data['errors'] = errors
+    return Response(data)
@@ -0,0 +1,64 @@
+import tempfile
+from datetime import datetime
+from django.core.exceptions import ImproperlyConfigured
+from django.http import FileResponse
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from ... import exports
+from .admin_views import IsAdminUser
+
+MAX_EXPORT_DAYS = 366
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated, IsAdminUser])
+def columnar_export(request, dataset):
+    """Download a dataset as Parquet or Arrow IPC.
+
+    Query parameters: file_format (parquet or arrow), start_date and
+    end_date (YYYY-MM-DD, inclusive, both required, at most
+    MAX_EXPORT_DAYS apart). The file is built inside the request, so
+    longer ranges go through the export_columnar command instead.
+    """
+    if dataset not in exports.DATASETS:
+        return Response({'detail': f'Unknown dataset. Choose one of: {", ".join(sorted(exports.DATASETS))}'}, status=404)
+
+    file_format = request.query_params.get('file_format', 'parquet')
+    if file_format not in exports.FORMATS:
+        return Response({'detail': 'file_format must be parquet or arrow'}, status=400)
+
+    start_date = request.query_params.get('start_date')
+    end_date = request.query_params.get('end_date')
+    if not start_date or not end_date:
+        return Response({'detail': 'start_date and end_date are required'}, status=400)
+    try:
+        start = datetime.strptime(start_date, '%Y-%m-%d').date()
+        end = datetime.strptime(end_date, '%Y-%m-%d').date()
+    except ValueError:
+        return Response({'detail': 'Dates must be in YYYY-MM-DD format'}, status=400)
+    if end < start:
+        return Response({'detail': 'end_date must not be before start_date'}, status=400)
+    if (end - start).days >= MAX_EXPORT_DAYS:
+        return Response({
+            'detail': f'At most {MAX_EXPORT_DAYS} days per download; use the export_columnar command for longer ranges'
+        }, status=400)
+
+    # Spool to a temporary file: Parquet writes its footer last, and the
+    # file keeps memory flat for large exports
+    output = tempfile.TemporaryFile()
+    try:
+        exports.write_dataset(dataset, output, file_format=file_format, start=start, end=end)
+    except ImproperlyConfigured as e:
+        output.close()
+        return Response({'detail': str(e)}, status=501)
+    except Exception:
+        output.close()
+        raise
+    output.seek(0)
+
+    return FileResponse(
+        output,
+        as_attachment=True,
+        filename=dataset + exports.FORMATS[file_format],
+        content_type='application/vnd.apache.parquet' if file_format == 'parquet' else 'application/vnd.apache.arrow.file',
+    )
@@ -0,0 +1,99 @@
+from django.db.models import Prefetch
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from ... import changes as change_log
+from ...models import Employee, TimeEntry, TimeOffRequest, Note
+from ..serializers import AdminEmployeeSerializer, AdminTimeEntrySerializer, TimeOffRequestSerializer
+from ..serializers.employee_serializers import EmployeeSerializer
+from ..serializers.time_entry_serializers import TimeEntrySerializer
+from .admin_views import with_clocked_in_today
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def sync_changes(request):
+    """Return the time entries, time off requests and employees changed since a sync token.
+
+    Query parameters: since (the token from the previous response; leave it
+    out to get a starting token) and scope (employee, the default, for the
+    user's own data; admin for everyone's, staff only). A client loads the
+    full endpoints once and then applies each response: replace the listed
+    objects by id and drop the ones under deleted. Objects are serialized
+    as the full endpoints serialize them, but are not limited to the
+    month or filters the client loaded. When reset is true the token is too old and
+    the client has to reload in full before syncing from the new token.
+    When more is true, ask again straight away with the new token.
+    """
+    scope = request.query_params.get('scope', 'employee')
+    if scope == 'admin':
+        if not request.user.is_staff:
+            return Response({'detail': 'Admin access required'}, status=403)
+        employee_pk = None
+    elif scope == 'employee':
+        try:
+            employee_pk = request.user.employee.pk
+        except Employee.DoesNotExist:
+            return Response({'detail': 'Employee not found'}, status=404)
+    else:
+        return Response({'detail': 'scope must be employee or admin'}, status=400)
+
+    since = request.query_params.get('since')
+    if since is None:
+        return Response(_payload(change_log.latest_token(), reset=True))
+    try:
+        since = int(since)
+    except ValueError:
+        return Response({'detail': 'since must be a sync token'}, status=400)
+    if since < 0:
+        return Response({'detail': 'since must be a sync token'}, status=400)
+
+    changed, token, more, reset = change_log.changes(since, employee_pk=employee_pk)
+    if reset:
+        return Response(_payload(token, reset=True))
+
+    context = {'request': request}
+    payload = _payload(token, more=more)
+    for model, key, queryset, serializer_class in _sources(scope, employee_pk):
+        # The logged action only says what happened from one employee's side:
+        # an entry moved to another employee is logged as deleted for the
+        # old one. So look every id up in this scope, and report as deleted
+        # exactly the ones that are not there now.
+        object_ids = list(changed.get(model, {}))
+        objects = list(queryset.filter(pk__in=object_ids)) if object_ids else []
+        payload[key] = serializer_class(objects, many=True, context=context).data
+        found = {obj.pk for obj in objects}
+        payload['deleted'][key] = sorted(object_id for object_id in object_ids if object_id not in found)
+    return Response(payload)
+
+def _payload(token, more=False, reset=False):
+    return {
+        'token': token,
+        'more': more,
+        'reset': reset,
+        'time_entries': [],
+        'time_off_requests': [],
+        'employees': [],
+        'deleted': {'time_entries': [], 'time_off_requests': [], 'employees': []},
+    }
+
+def _sources(scope, employee_pk):
+    """Return (log model, response key, queryset, serializer) for each synced model."""
+    notes = Prefetch('notes', queryset=Note.objects.select_related('created_by__employee').order_by('-created_at'))
+    time_off_requests = TimeOffRequest.objects.select_related('employee')
+    if scope == 'admin':
+        return [
+            ('time_entry', 'time_entries',
+             TimeEntry.objects.select_related('employee', 'employee__user').prefetch_related(notes),
+             AdminTimeEntrySerializer),
+            ('time_off_request', 'time_off_requests', time_off_requests, TimeOffRequestSerializer),
+            ('employee', 'employees', with_clocked_in_today(Employee.objects.all()), AdminEmployeeSerializer),
+        ]
+    return [
+        ('time_entry', 'time_entries',
+         TimeEntry.objects.filter(employee_id=employee_pk).prefetch_related(notes),
+         TimeEntrySerializer),
+        ('time_off_request', 'time_off_requests', time_off_requests.filter(employee_id=employee_pk), TimeOffRequestSerializer),
+        ('employee', 'employees',
+         Employee.objects.filter(pk=employee_pk).select_related('user', 'open_entry'),
+         EmployeeSerializer),
+    ]
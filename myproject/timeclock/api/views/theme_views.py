@@ -8,19 +8,18 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+def theme_preference_data(user):
+    """Return the user/preferences/theme body; reuses an employee or admin profile already loaded on user."""
+    try:
+        profile = user.adminprofile if user.is_staff else user.employee
+        return {'themeId': profile.theme_id or 'light'}
+    except ObjectDoesNotExist:
+        return {'themeId': 'light'}
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def get_theme_preference(request):
-    try:
-        if request.user.is_staff:
-            profile = AdminProfile.objects.get(user=request.user)
-        else:
-            profile = Employee.objects.get(user=request.user)
-        
-        theme_id = profile.theme_id or 'light'
-        return Response({'themeId': theme_id}, status=status.HTTP_200_OK)
-    except ObjectDoesNotExist:
-        return Response({'themeId': 'light'}, status=status.HTTP_200_OK)
+    return Response(theme_preference_data(request.user), status=status.HTTP_200_OK)
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
@@ -2,54 +2,44 @@ from rest_framework import viewsets, permissions
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from django.shortcuts import get_object_or_404
-from django.http import HttpResponse
+from django.http import StreamingHttpResponse
 from django.utils import timezone
 from datetime import datetime, timedelta
-import csv
 from ..serializers import AdminTimeEntrySerializer
-from ...models import TimeEntry, Employee
+from ...models import TimeEntry, Employee, Note
+from ...reports import filter_time_entries, time_entry_csv_lines
 from .admin_views import IsAdminUser
+from ..pagination import TimeEntryCursorPagination
 from rest_framework import serializers
-from django.db.models import Q
+from django.db.models import Q, Prefetch
 from django.contrib.auth.models import User
 
 class AdminTimeEntryViewSet(viewsets.ModelViewSet):
     serializer_class = AdminTimeEntrySerializer
     permission_classes = [permissions.IsAuthenticated, IsAdminUser]
+    pagination_class = TimeEntryCursorPagination
     
     def get_queryset(self):
         try:
             queryset = TimeEntry.objects.all().order_by('-clock_in_time')
             
-            # Filter by employee if specified
-            employee_id = self.request.query_params.get('employee_id', None)
-            if employee_id:
-                queryset = queryset.filter(employee__employee_id=employee_id)
-            
-            # Filter by date range if specified
-            start_date = self.request.query_params.get('start_date', None)
-            end_date = self.request.query_params.get('end_date', None)
-            
-            if start_date and end_date:
-                try:
-                    # Convert to server's timezone
-                    start_datetime = timezone.make_aware(datetime.strptime(start_date, '%Y-%m-%d').replace(hour=0, minute=0, second=0))
-                    end_datetime = timezone.make_aware(datetime.strptime(end_date, '%Y-%m-%d').replace(hour=23, minute=59, second=59))
-                    
-                    queryset = queryset.filter(
-                        Q(clock_in_time__range=(start_datetime, end_datetime)) |
-                        Q(clock_out_time__range=(start_datetime, end_datetime))
-                    )
-                    
-                except ValueError:
-                    return TimeEntry.objects.none()
+            try:
+                queryset = filter_time_entries(
+                    queryset,
+                    employee_id=self.request.query_params.get('employee_id', None),
+                    start_date=self.request.query_params.get('start_date', None),
+                    end_date=self.request.query_params.get('end_date', None),
+                )
+            except ValueError:
+                return TimeEntry.objects.none()
             
             # Select related fields to avoid N+1 queries
             final_queryset = queryset.select_related(
                 'employee',
                 'employee__user'
             ).prefetch_related(
-                'notes'
+                # created_by__employee lets Note.creator_name resolve without a query
+                Prefetch('notes', queryset=Note.objects.select_related('created_by__employee'))
             )
             
             return final_queryset
@@ -129,48 +119,11 @@ class AdminTimeEntryViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'])
     def report(self, request):
         try:
-            # Get filtered queryset
-            queryset = self.get_queryset()
-            
-            # Create the HttpResponse object with CSV header
-            response = HttpResponse(content_type='text/csv')
+            response = StreamingHttpResponse(
+                time_entry_csv_lines(self.get_queryset()),
+                content_type='text/csv'
+            )
             response['Content-Disposition'] = 'attachment; filename="time_entries_report.csv"'
-            
-            # Create CSV writer
-            writer = csv.writer(response)
-            
-            # Write header row
-            writer.writerow([
-                'Employee ID',
-                'Employee Name',
-                'Clock In Time',
-                'Clock Out Time',
-                'Total Hours',
-                'Entry Type',
-                'Notes'
-            ])
-            
-            # Write data rows
-            for entry in queryset:
-                try:
-                    total_hours = 0
-                    if entry.clock_out_time:
-                        time_diff = entry.clock_out_time - entry.clock_in_time
-                        total_hours = round(time_diff.total_seconds() / 3600, 2)
-                    
-                    writer.writerow([
-                        entry.employee.employee_id,
-                        f"{entry.employee.first_name} {entry.employee.last_name}",
-                        entry.clock_in_time.strftime('%Y-%m-%d %H:%M:%S'),
-                        entry.clock_out_time.strftime('%Y-%m-%d %H:%M:%S') if entry.clock_out_time else 'Not Clocked Out',
-                        total_hours,
-                        entry.get_entry_type_display(),
-                        entry.notes.first().note_text if entry.notes.exists() else ''
-                    ])
-                except Exception as e:
-                    print(f"Error processing entry {entry.id}: {str(e)}")
-                    continue
-            
             return response
         except Exception as e:
             print(f"Error generating report: {str(e)}")
@@ -215,20 +168,7 @@ class AdminTimeEntryViewSet(viewsets.ModelViewSet):
         elif request.method == 'DELETE':
             try:
                 time_entry = get_object_or_404(TimeEntry, id=pk)
-                employee = time_entry.employee
-
-                # Check if this is a "clocked in" entry from today
-                current_time = timezone.localtime()
-                start_of_day = current_time.replace(hour=0, minute=0, second=0, microsecond=0)
-                end_of_day = start_of_day + timedelta(days=1)
-
-                # If this is today's entry and has no clock out time, update employee status
-                if (time_entry.clock_in_time >= start_of_day and 
-                    time_entry.clock_in_time < end_of_day and 
-                    not time_entry.clock_out_time):
-                    employee.clocked_in = False
-                    employee.save()
-
+                # Deleting an open entry clears the employee's open_entry pointer
                 time_entry.delete()
                 return Response(status=204)
             except Exception as e:
@@ -28,25 +28,29 @@ from asgiref.sync import async_to_sync, sync_to_async
 
 logger = logging.getLogger(__name__)
 
+def time_off_requests_for(user):
+    """Return the time off requests the user may list, newest first."""
+    try:
+        if user.is_staff:
+            # Admins see all requests
+            return TimeOffRequest.objects.select_related('employee').order_by('-start_date')
+        else:
+            # Regular users see all their own requests
+            try:
+                employee = user.employee
+                return TimeOffRequest.objects.filter(employee=employee).select_related('employee').order_by('-start_date')
+            except Employee.DoesNotExist:
+                return TimeOffRequest.objects.none()
+    except Exception:
+        return TimeOffRequest.objects.none()
+
 class TimeOffRequestViewSet(viewsets.ModelViewSet):
     serializer_class = TimeOffRequestSerializer
     permission_classes = [permissions.IsAuthenticated]
     queryset = TimeOffRequest.objects.all()
 
     def get_queryset(self):
-        try:
-            if self.request.user.is_staff:
-                # Admins see all requests
-                return self.queryset.order_by('-start_date')
-            else:
-                # Regular users see all their own requests
-                try:
-                    employee = self.request.user.employee
-                    return self.queryset.filter(employee=employee).order_by('-start_date')
-                except Employee.DoesNotExist:
-                    return TimeOffRequest.objects.none()
-        except Exception:
-            return TimeOffRequest.objects.none()
+        return time_off_requests_for(self.request.user)
 
     def check_object_permissions(self, request, obj):
         super().check_object_permissions(request, obj)
@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class TimeclockConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'timeclock'
+
+    def ready(self):
+        from . import roster, data_version, changes
+        roster.connect_signals()
+        data_version.connect_signals()
+        changes.connect_signals()
@@ -0,0 +1,137 @@
+"""Change log behind the api/sync/ endpoint.
+
+Every write to a synced object adds a ChangeLogEntry once the transaction
+commits, so a client holding the last id it saw (its sync token) can ask
+for just what changed since. Notes are synced as part of their time entry.
+Anything that changes an employee's balances or clocked-in state also logs
+the employee.
+
+Rows are written by post_save/post_delete handlers (connected in
+TimeclockConfig.ready) and by record() from code that writes with
+queryset.update(). Rows are inserted after commit rather than with the
+change so ids are handed out close to commit order; changes() also holds
+back rows younger than SETTLE so a slower commit with a lower id is not
+skipped.
+"""
+from datetime import timedelta
+from functools import partial
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.utils import timezone
+from .models import (
+    ChangeLogEntry, Employee, TimeEntry, Note, TimeOffRequest, LeaveLedgerEntry,
+)
+
+SETTLE = timedelta(seconds=2)
+MAX_CHANGES = 1000
+# Rows older than this are removed by prune_change_log; clients with an
+# older token are told to reload
+RETENTION = timedelta(days=30)
+
+
+def record(model, object_id, employee_pk, action='upsert'):
+    """Log a change to one object once the current transaction commits."""
+    record_many([(model, object_id, employee_pk, action)])
+
+
+def record_many(rows):
+    """Log (model, object_id, employee_pk, action) changes in one INSERT once the current transaction commits."""
+    transaction.on_commit(partial(ChangeLogEntry.objects.bulk_create, [
+        ChangeLogEntry(model=model, object_id=object_id, employee_pk=employee_pk, action=action)
+        for model, object_id, employee_pk, action in rows
+    ]))
+
+
+def latest_token():
+    """Return the newest token a client can safely be given."""
+    cutoff = timezone.now() - SETTLE
+    return ChangeLogEntry.objects.filter(created_at__lte=cutoff).order_by('-id').values_list('id', flat=True).first() or 0
+
+
+def changes(since, employee_pk=None, limit=MAX_CHANGES):
+    """Return (changes, token, more, reset) for the rows logged after since.
+
+    changes maps each model name to {object_id: action}, keeping the last
+    action per object. token is what the client sends next time; more is
+    True when limit cut the batch short. reset is True when since is older
+    than the retained log, and the client must reload from scratch.
+    employee_pk limits the rows to one employee's objects.
+    """
+    latest = latest_token()
+    oldest = ChangeLogEntry.objects.order_by('id').values_list('id', flat=True).first()
+    if oldest is not None and since < oldest - 1:
+        return {}, latest, False, True
+
+    rows = ChangeLogEntry.objects.filter(id__gt=since, id__lte=latest)
+    if employee_pk is not None:
+        rows = rows.filter(employee_pk=employee_pk)
+    rows = list(rows.order_by('id').values_list('id', 'model', 'object_id', 'action')[:limit + 1])
+    more = len(rows) > limit
+    if more:
+        rows = rows[:limit]
+        latest = rows[-1][0]
+
+    collected = {}
+    for _, model, object_id, action in rows:
+        collected.setdefault(model, {})[object_id] = action
+    return collected, max(latest, since), more, False
+
+
+def prune(older_than=RETENTION):
+    """Delete log rows older than older_than; returns the number deleted."""
+    deleted, _ = ChangeLogEntry.objects.filter(created_at__lt=timezone.now() - older_than).delete()
+    return deleted
+
+
+def _time_entry_changed(sender, instance, **kwargs):
+    deleted = kwargs.get('signal') is post_delete
+    record_many([
+        ('time_entry', instance.pk, instance.employee_id, 'delete' if deleted else 'upsert'),
+        # Clocked-in state and leave balances move with the entries
+        ('employee', instance.employee_id, instance.employee_id, 'upsert'),
+    ])
+
+
+def _note_changed(sender, instance, **kwargs):
+    employee_pk = TimeEntry.objects.filter(pk=instance.time_entry_id).values_list('employee_id', flat=True).first()
+    if employee_pk is not None:
+        record('time_entry', instance.time_entry_id, employee_pk)
+
+
+def _time_off_request_changed(sender, instance, **kwargs):
+    deleted = kwargs.get('signal') is post_delete
+    record_many([
+        ('time_off_request', instance.pk, instance.employee_id, 'delete' if deleted else 'upsert'),
+        ('employee', instance.employee_id, instance.employee_id, 'upsert'),
+    ])
+
+
+def _leave_changed(sender, instance, **kwargs):
+    record('employee', instance.employee_id, instance.employee_id)
+
+
+def _employee_changed(sender, instance, **kwargs):
+    deleted = kwargs.get('signal') is post_delete
+    record('employee', instance.pk, instance.pk, 'delete' if deleted else 'upsert')
+
+
+def _user_changed(sender, instance, **kwargs):
+    # The employee API shows the user's email
+    employee_pk = Employee.objects.filter(user=instance).values_list('pk', flat=True).first()
+    if employee_pk is not None:
+        record('employee', employee_pk, employee_pk)
+
+
+def connect_signals():
+    handlers = [
+        (TimeEntry, _time_entry_changed),
+        (Note, _note_changed),
+        (TimeOffRequest, _time_off_request_changed),
+        (LeaveLedgerEntry, _leave_changed),
+        (Employee, _employee_changed),
+    ]
+    for model, handler in handlers:
+        post_save.connect(handler, sender=model, dispatch_uid=f'changes_save_{model.__name__}')
+        post_delete.connect(handler, sender=model, dispatch_uid=f'changes_delete_{model.__name__}')
+    post_save.connect(_user_changed, sender=User, dispatch_uid='changes_save_User')
@@ -0,0 +1,113 @@
+"""Per-employee data version for conditional GETs on the employee API.
+
+Employee.data_version is a random token that changes whenever anything
+shown by employee/info or employee/time-entries changes. ETags are derived
+from it, so an unchanged poll is answered with 304 Not Modified after
+reading only the employee's data version, without querying entries or
+serializing.
+
+The token changes:
+- on every Employee save (pre_save, connected in TimeclockConfig.ready);
+- after a TimeEntry, Note or TimeOffRequest is saved or deleted, or the
+  employee's User is saved (post_save/post_delete); and
+- in the same UPDATE wherever code changes an employee with
+  queryset.update(), by setting data_version=new_data_version(). This
+  includes LeaveLedgerEntry.record(), so ledger rows need no signal.
+
+A fresh random token rather than a counter means a stale in-memory
+Employee being saved can never bring back a token an old ETag was built
+from.
+"""
+import hashlib
+from functools import wraps
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.utils import timezone
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.http import parse_etags, quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+from .models import Employee, TimeEntry, Note, TimeOffRequest, new_data_version
+
+
+def bump(employees):
+    """Give a new data version to the employees matched by the queryset, once the transaction commits."""
+    transaction.on_commit(lambda: employees.update(data_version=new_data_version()))
+
+
+def etag(request, employee_pk, version):
+    """Return the ETag for this request's view of the employee's data at data_version version."""
+    key = '|'.join(str(part) for part in (
+        employee_pk,
+        version,
+        request.get_full_path(),
+        getattr(request, 'accepted_media_type', ''),
+        # Some values are relative to today (the default month, years employed)
+        timezone.localdate(),
+    ))
+    return quote_etag(hashlib.sha1(key.encode()).hexdigest())
+
+
+def conditional_employee_get(view):
+    """Answer GETs for request.user.employee's data with 304 when the ETag matches.
+
+    Wrap a DRF function view (inside @api_view). Other methods, and users
+    without an employee, go straight to the view. The data version is read
+    from the database, never from request.user.employee, which may have
+    been loaded before a change committed.
+    """
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if request.method != 'GET':
+            return view(request, *args, **kwargs)
+        current = Employee.objects.filter(user_id=request.user.pk).values_list('pk', 'data_version').first()
+        if current is None:
+            return view(request, *args, **kwargs)
+
+        tag = etag(request, *current)
+        if tag in parse_etags(request.headers.get('If-None-Match', '')):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = view(request, *args, **kwargs)
+            if response.status_code != status.HTTP_200_OK:
+                return response
+        response['ETag'] = tag
+        # Let browser and WebView caches keep the body but revalidate every time
+        patch_cache_control(response, private=True, no_cache=True)
+        patch_vary_headers(response, ('Accept', 'Authorization'))
+        return response
+    return wrapper
+
+
+def _touch_employee(sender, instance, update_fields=None, **kwargs):
+    if update_fields is None or 'data_version' in update_fields:
+        instance.data_version = new_data_version()
+    else:
+        bump(Employee.objects.filter(pk=instance.pk))
+
+
+def _bump_for_employee(sender, instance, created=False, **kwargs):
+    if created and sender is TimeEntry and instance.clock_out_time is None:
+        # Opening an entry sets Employee.open_entry, and that UPDATE already
+        # changes the data version (punches.clock_in, TimeEntry.save)
+        return
+    bump(Employee.objects.filter(pk=instance.employee_id))
+
+
+def _bump_for_note(sender, instance, **kwargs):
+    bump(Employee.objects.filter(pk__in=TimeEntry.objects.filter(pk=instance.time_entry_id).values('employee_id')))
+
+
+def _bump_for_user(sender, instance, **kwargs):
+    bump(Employee.objects.filter(user=instance))
+
+
+def connect_signals():
+    pre_save.connect(_touch_employee, sender=Employee, dispatch_uid='data_version_employee')
+    for model in (TimeEntry, TimeOffRequest):
+        post_save.connect(_bump_for_employee, sender=model, dispatch_uid=f'data_version_save_{model.__name__}')
+        post_delete.connect(_bump_for_employee, sender=model, dispatch_uid=f'data_version_delete_{model.__name__}')
+    post_save.connect(_bump_for_note, sender=Note, dispatch_uid='data_version_save_Note')
+    post_delete.connect(_bump_for_note, sender=Note, dispatch_uid='data_version_delete_Note')
+    post_save.connect(_bump_for_user, sender=User, dispatch_uid='data_version_save_User')
@@ -0,0 +1,169 @@
+"""Columnar (Parquet / Arrow IPC) exports for payroll analytics.
+
+Each dataset is read in chunks, one keyset query per chunk, and written
+as one record batch per chunk, so memory use depends on the batch size
+rather than on how much history is exported. Timestamps are written
+as UTC microsecond timestamps, hours as whole minutes.
+
+pyarrow is an optional dependency and is only imported when an export
+runs.
+"""
+from collections import namedtuple
+from datetime import datetime, timedelta
+from django.core.exceptions import ImproperlyConfigured
+from django.utils import timezone
+from .models import TimeEntry, DailyTotal, LeaveLedgerEntry
+from .utils import keyset_chunks
+
+FORMATS = {'parquet': '.parquet', 'arrow': '.arrow'}
+BATCH_SIZE = 10000
+
+Column = namedtuple('Column', ['name', 'type', 'source', 'convert'])
+
+
+def _minutes(hours):
+    return round(hours * 60)
+
+
+def _seconds_to_minutes(value):
+    return round(value / 60)
+
+
+def _local_date(value):
+    return timezone.localtime(value).date()
+
+
+def _time_entries(start, end):
+    rows = TimeEntry.objects.order_by('clock_in_time', 'id')
+    if start:
+        rows = rows.filter(clock_in_time__gte=_day_start(start))
+    if end:
+        rows = rows.filter(clock_in_time__lt=_day_start(end + timedelta(days=1)))
+    return rows
+
+
+def _daily_totals(start, end):
+    rows = DailyTotal.objects.order_by('local_date', 'employee_id')
+    if start:
+        rows = rows.filter(local_date__gte=start)
+    if end:
+        rows = rows.filter(local_date__lte=end)
+    return rows
+
+
+def _leave_usage(start, end):
+    rows = LeaveLedgerEntry.objects.order_by('id')
+    if start:
+        rows = rows.filter(created_at__gte=_day_start(start))
+    if end:
+        rows = rows.filter(created_at__lt=_day_start(end + timedelta(days=1)))
+    return rows
+
+
+def _day_start(day):
+    return timezone.make_aware(datetime.combine(day, datetime.min.time()))
+
+
+# Dataset name -> (queryset factory taking (start, end) local dates, columns)
+DATASETS = {
+    'time_entries': (_time_entries, [
+        Column('id', 'int64', 'id', None),
+        Column('employee_pk', 'int64', 'employee_id', None),
+        Column('employee_id', 'int32', 'employee__employee_id', None),
+        Column('clock_in_time', 'timestamp', 'clock_in_time', None),
+        Column('clock_out_time', 'timestamp', 'clock_out_time', None),
+        Column('local_date', 'date', 'clock_in_time', _local_date),
+        Column('minutes_worked', 'int32', 'hours_worked', _minutes),
+        Column('entry_type', 'string', 'entry_type', None),
+        Column('is_vacation', 'bool', 'is_vacation', None),
+        Column('is_sick', 'bool', 'is_sick', None),
+        Column('is_holiday', 'bool', 'is_holiday', None),
+        Column('full_day', 'bool', 'full_day', None),
+    ]),
+    'daily_totals': (_daily_totals, [
+        Column('employee_pk', 'int64', 'employee_id', None),
+        Column('employee_id', 'int32', 'employee__employee_id', None),
+        Column('local_date', 'date', 'local_date', None),
+        Column('worked_minutes', 'int32', 'worked_seconds', _seconds_to_minutes),
+        Column('sick_minutes', 'int32', 'sick_seconds', _seconds_to_minutes),
+        Column('entry_count', 'int32', 'entry_count', None),
+    ]),
+    'leave_usage': (_leave_usage, [
+        Column('id', 'int64', 'id', None),
+        Column('employee_pk', 'int64', 'employee_id', None),
+        Column('employee_id', 'int32', 'employee__employee_id', None),
+        Column('leave_type', 'string', 'leave_type', None),
+        Column('kind', 'string', 'kind', None),
+        Column('minutes', 'int32', 'hours', _minutes),
+        Column('time_entry_id', 'int64', 'time_entry_id', None),
+        Column('created_at', 'timestamp', 'created_at', None),
+    ]),
+}
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.ipc
+        import pyarrow.parquet
+    except ImportError as exc:
+        raise ImproperlyConfigured('Columnar exports need pyarrow; install it with "pip install pyarrow".') from exc
+    return pyarrow
+
+
+def _arrow_type(pa, name):
+    return {
+        'int32': pa.int32(),
+        'int64': pa.int64(),
+        'bool': pa.bool_(),
+        'string': pa.string(),
+        'date': pa.date32(),
+        'timestamp': pa.timestamp('us', tz='UTC'),
+    }[name]
+
+
+def write_dataset(name, sink, file_format='parquet', start=None, end=None, batch_size=BATCH_SIZE):
+    """Write one dataset to sink (a path or binary file object).
+
+    start and end are optional local dates bounding the export, inclusive.
+    Returns the number of rows written. Raises ImproperlyConfigured when
+    pyarrow is not installed.
+    """
+    if name not in DATASETS:
+        raise ValueError(f'Unknown dataset {name!r}')
+    if file_format not in FORMATS:
+        raise ValueError(f'Unknown format {file_format!r}')
+
+    pa = _pyarrow()
+    queryset_for, columns = DATASETS[name]
+    schema = pa.schema([pa.field(column.name, _arrow_type(pa, column.type)) for column in columns])
+    sources = list(dict.fromkeys(column.source for column in columns))
+    positions = [sources.index(column.source) for column in columns]
+    chunks = keyset_chunks(queryset_for(start, end), sources, batch_size)
+
+    if file_format == 'parquet':
+        writer = pa.parquet.ParquetWriter(sink, schema, compression='zstd')
+        write = lambda batch: writer.write_table(pa.Table.from_batches([batch]))
+    else:
+        writer = pa.ipc.new_file(sink, schema)
+        write = writer.write_batch
+
+    written = 0
+    try:
+        for chunk in chunks:
+            write(_record_batch(pa, schema, columns, positions, chunk))
+            written += len(chunk)
+    finally:
+        writer.close()
+    return written
+
+
+def _record_batch(pa, schema, columns, positions, chunk):
+    values = list(zip(*chunk))
+    arrays = []
+    for column, position, field in zip(columns, positions, schema):
+        data = values[position]
+        if column.convert:
+            data = [None if value is None else column.convert(value) for value in data]
+        arrays.append(pa.array(data, type=field.type))
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
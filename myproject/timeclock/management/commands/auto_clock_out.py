@@ -1,9 +1,8 @@
 from django.core.management.base import BaseCommand
 from django.utils import timezone
-from datetime import time
-from timeclock.models import Employee, TimeEntry, Note
+from timeclock.models import Employee, Note
+from timeclock import punches
 from django.contrib.auth.models import User
-from decimal import Decimal
 
 class Command(BaseCommand):
     help = "Automatically clock out employees at 7 p.m. if they are still clocked in."
@@ -12,28 +11,24 @@ class Command(BaseCommand):
         # Set the target clock-out time to 7 p.m. in the local timezone
         target_clock_out_time = timezone.localtime(timezone.now()).replace(hour=19, minute=0, second=0, microsecond=0)
 
-        # Fetch the specific employee for testing
-        clocked_in_employees = Employee.objects.filter(clocked_in=True)
-        
-        for employee in clocked_in_employees:
-            # Find the most recent time entry with a missing clock-out time
-            time_entry = TimeEntry.objects.filter(employee=employee, clock_out_time__isnull=True).order_by('-clock_in_time').first()
-            system_user = User.objects.get(username="System")
-
-            if time_entry:
-                # Calculate hours worked based on the target clock-out time
-                duration = (target_clock_out_time - time_entry.clock_in_time).total_seconds() / 3600.0
-                time_entry.clock_out_time = target_clock_out_time
-                time_entry.hours_worked = Decimal(round(duration, 2))
-                time_entry.save()
+        # Employees with an open entry, fetched together with that entry.
+        # Entries opened at or after 7 p.m. are left for tomorrow's run,
+        # since closing them at 7 p.m. would give negative hours.
+        clocked_in_employees = Employee.objects.filter(
+            open_entry__isnull=False,
+            open_entry__clock_in_time__lt=target_clock_out_time
+        ).select_related('open_entry')
+        system_user = User.objects.get(username="System")
 
-                # Mark employee as clocked out
-                employee.clocked_in = False
-                employee.save()
+        for employee in clocked_in_employees:
+            # Close the entry at the target clock-out time
+            result = punches.clock_out(employee, when=target_clock_out_time)
 
-                # Add a note to indicate the auto clock-out
+            # Add a note to indicate the auto clock-out, unless the employee
+            # clocked out themselves in the meantime
+            if result.changed:
                 Note.objects.create(
-                    time_entry=time_entry,
+                    time_entry=result.entry,
                     created_by=system_user,
                     note_text="Forgot to Clock Out"
                 )
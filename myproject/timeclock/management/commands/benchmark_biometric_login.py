@@ -0,0 +1,79 @@
+import base64
+import hashlib
+import json
+import time
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec, padding, rsa
+from django.core.management.base import BaseCommand
+from timeclock import webauthn
+
+class Command(BaseCommand):
+    help = 'Time biometric login signature checks with and without the parsed-key cache (no database access)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--logins',
+            type=int,
+            default=2000,
+            help='Assertions to verify per run (default: 2000)',
+        )
+        parser.add_argument(
+            '--key-type',
+            choices=['ec', 'rsa'],
+            default='ec',
+            help='Credential key type: ec (P-256, what platform authenticators use) or rsa (default: ec)',
+        )
+
+    def handle(self, *args, **kwargs):
+        logins = max(kwargs.get('logins', 2000), 1)
+        public_key, client_data, authenticator_data, signature = self.build_assertion(kwargs.get('key_type', 'ec'))
+        if not webauthn.verify_assertion(public_key, client_data, authenticator_data, signature):
+            self.stdout.write(self.style.ERROR('Generated assertion did not verify'))
+            return
+
+        # Logins decode the request fields too
+        client_data_b64 = base64.b64encode(client_data)
+        authenticator_data_b64 = base64.b64encode(authenticator_data)
+        signature_b64 = base64.b64encode(signature)
+
+        def run(cached):
+            webauthn.load_public_key.cache_clear()
+            started = time.perf_counter()
+            for _ in range(logins):
+                if not cached:
+                    webauthn.load_public_key.cache_clear()
+                webauthn.verify_assertion(
+                    public_key,
+                    base64.b64decode(client_data_b64),
+                    base64.b64decode(authenticator_data_b64),
+                    base64.b64decode(signature_b64),
+                )
+            return (time.perf_counter() - started) / logins
+
+        for label, cached in (('key parsed every login', False), ('key cache', True)):
+            elapsed = run(cached)
+            self.stdout.write(f'{label:<24} {elapsed * 1e6:8.1f} µs per login  {1 / elapsed:10.0f} logins/s')
+
+    def build_assertion(self, key_type):
+        # A registered credential and one signed assertion, as a browser would send them
+        if key_type == 'rsa':
+            private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        else:
+            private_key = ec.generate_private_key(ec.SECP256R1())
+        der = private_key.public_key().public_bytes(
+            serialization.Encoding.DER, serialization.PublicFormat.SubjectPublicKeyInfo
+        )
+        public_key = webauthn.canonical_public_key(base64.b64encode(der).decode())
+
+        client_data = json.dumps({
+            'type': 'webauthn.get',
+            'challenge': base64.urlsafe_b64encode(b'benchmark-challenge').decode(),
+            'origin': 'https://localhost',
+        }).encode()
+        authenticator_data = hashlib.sha256(b'localhost').digest() + b'\x05' + (1).to_bytes(4, 'big')
+        message = authenticator_data + hashlib.sha256(client_data).digest()
+        if key_type == 'rsa':
+            signature = private_key.sign(message, padding.PKCS1v15(), hashes.SHA256())
+        else:
+            signature = private_key.sign(message, ec.ECDSA(hashes.SHA256()))
+        return public_key, client_data, authenticator_data, signature
@@ -0,0 +1,93 @@
+import time
+from datetime import timedelta
+from decimal import Decimal
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from django.utils.module_loading import import_string
+from rest_framework.renderers import JSONRenderer
+from ...api.serializers import TimeEntrySerializer
+from ...api.utils import format_hours
+from ...models import Employee, TimeEntry, Note
+
+class Command(BaseCommand):
+    help = 'Compare encode time and size of API renderers on a monthly employee/time-entries response'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--entries',
+            type=int,
+            default=35,
+            help='Time entries in the month (default: 35, a month widened to its first pay week)',
+        )
+        parser.add_argument(
+            '--notes',
+            type=int,
+            default=1,
+            help='Notes per time entry (default: 1)',
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=500,
+            help='Encodes per renderer; the average is reported (default: 500)',
+        )
+
+    def handle(self, *args, **kwargs):
+        repeat = max(kwargs.get('repeat', 500), 1)
+        data = self.build_response(kwargs.get('entries', 35), kwargs.get('notes', 1))
+
+        renderers = [JSONRenderer] + [
+            import_string(path) for path in settings.REST_FRAMEWORK.get('DEFAULT_RENDERER_CLASSES', [])
+            if 'Browsable' not in path
+        ]
+        for renderer_class in renderers:
+            renderer = renderer_class()
+            try:
+                body = renderer.render(data, renderer.media_type, {})
+            except ImportError as exc:
+                self.stdout.write(self.style.ERROR(f'{renderer_class.__name__}: {exc}'))
+                continue
+
+            started = time.perf_counter()
+            for _ in range(repeat):
+                renderer.render(data, renderer.media_type, {})
+            elapsed = (time.perf_counter() - started) / repeat
+            self.stdout.write(
+                f'{renderer_class.__name__:<22} {renderer.media_type:<20} '
+                f'{elapsed * 1e6:8.1f} µs {len(body):8d} bytes'
+            )
+
+    def build_response(self, entry_count, notes_per_entry):
+        # The same shape employee/time-entries returns, from unsaved objects
+        now = timezone.now()
+        user = User(id=1, username='1001')
+        employee = Employee(id=1, employee_id=1001, first_name='Alex', last_name='Smith', user=user)
+        user.employee = employee
+
+        entries = []
+        for i in range(entry_count):
+            clock_in_time = now - timedelta(days=entry_count - i, hours=1)
+            entry = TimeEntry(
+                id=i + 1,
+                employee=employee,
+                clock_in_time=clock_in_time,
+                clock_out_time=clock_in_time + timedelta(hours=8, minutes=15),
+                hours_worked=Decimal('8.2500'),
+            )
+            entry._prefetched_objects_cache = {'notes': [
+                Note(id=i * notes_per_entry + n + 1, time_entry=entry, created_by=user,
+                     note_text='Left early for an appointment', created_at=clock_in_time)
+                for n in range(notes_per_entry)
+            ]}
+            entries.append(entry)
+
+        total_hours = 8.25 * entry_count
+        return {
+            'entries': TimeEntrySerializer(entries, many=True, context={'total_hours': total_hours}).data,
+            'total_hours': format_hours(total_hours),
+            'weekly_totals': {},
+            'clocked_in': False,
+            'clock_in_time': None,
+        }
@@ -0,0 +1,75 @@
+import time
+from datetime import timedelta
+from decimal import Decimal
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from ...api.serializers import AdminTimeEntrySerializer
+from ...models import Employee, TimeEntry, Note
+
+class Command(BaseCommand):
+    help = 'Time AdminTimeEntrySerializer list output on in-memory entries (no database access)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rows',
+            type=int,
+            default=10000,
+            help='Number of time entries to serialize (default: 10000)',
+        )
+        parser.add_argument(
+            '--notes',
+            type=int,
+            default=1,
+            help='Notes per time entry (default: 1)',
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=3,
+            help='Runs to time; the fastest is reported (default: 3)',
+        )
+
+    def handle(self, *args, **kwargs):
+        rows = kwargs.get('rows', 10000)
+        notes = kwargs.get('notes', 1)
+        repeat = max(kwargs.get('repeat', 3), 1)
+        entries = self.build_entries(rows, notes)
+
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            AdminTimeEntrySerializer(entries, many=True).data
+            timings.append(time.perf_counter() - started)
+
+        best = min(timings)
+        self.stdout.write(self.style.SUCCESS(
+            f'{rows} entries with {notes} note(s) each: {best:.3f}s, '
+            f'{best / max(rows, 1) * 1e6:.1f} µs per entry'
+        ))
+
+    def build_entries(self, rows, notes_per_entry):
+        # Unsaved objects with their notes preloaded, as the viewset's
+        # select_related/prefetch_related would leave them
+        now = timezone.now()
+        author = User(id=1, username='1001')
+        author.employee = Employee(id=1, employee_id=1001, first_name='Alex', last_name='Smith', user=author)
+        employees = [Employee(id=i, employee_id=1000 + i, first_name=f'First{i}', last_name=f'Last{i}') for i in range(1, 51)]
+
+        entries = []
+        for i in range(rows):
+            clock_in_time = now - timedelta(hours=9 * (i + 1))
+            entry = TimeEntry(
+                id=i + 1,
+                employee=employees[i % len(employees)],
+                clock_in_time=clock_in_time,
+                clock_out_time=clock_in_time + timedelta(hours=8, minutes=15),
+                hours_worked=Decimal('8.25'),
+            )
+            entry._prefetched_objects_cache = {'notes': [
+                Note(id=i * notes_per_entry + n + 1, time_entry=entry, created_by=author,
+                     note_text='Left early for an appointment', created_at=clock_in_time)
+                for n in range(notes_per_entry)
+            ]}
+            entries.append(entry)
+        return entries
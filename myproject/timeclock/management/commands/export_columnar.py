@@ -0,0 +1,62 @@
+import os
+from datetime import datetime
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management.base import BaseCommand
+from timeclock import exports
+
+class Command(BaseCommand):
+    help = 'Export time entries, daily totals and leave usage to Parquet or Arrow IPC files for analytics'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'datasets',
+            nargs='*',
+            help=f'Datasets to export: {", ".join(sorted(exports.DATASETS))} (default: all of them)',
+        )
+        parser.add_argument(
+            '--format',
+            dest='file_format',
+            choices=sorted(exports.FORMATS),
+            default='parquet',
+            help='File format to write (default: parquet)',
+        )
+        parser.add_argument(
+            '--output-dir',
+            default='.',
+            help='Directory to write <dataset>.parquet / <dataset>.arrow into',
+        )
+        parser.add_argument(
+            '--start-date',
+            help='First local date to export, in YYYY-MM-DD format',
+        )
+        parser.add_argument(
+            '--end-date',
+            help='Last local date to export, in YYYY-MM-DD format',
+        )
+
+    def handle(self, *args, **kwargs):
+        file_format = kwargs['file_format']
+        output_dir = kwargs['output_dir']
+
+        try:
+            start = datetime.strptime(kwargs['start_date'], '%Y-%m-%d').date() if kwargs.get('start_date') else None
+            end = datetime.strptime(kwargs['end_date'], '%Y-%m-%d').date() if kwargs.get('end_date') else None
+        except ValueError:
+            self.stdout.write(self.style.ERROR('Invalid date format. Use YYYY-MM-DD'))
+            return
+
+        datasets = kwargs['datasets'] or sorted(exports.DATASETS)
+        unknown = [name for name in datasets if name not in exports.DATASETS]
+        if unknown:
+            self.stdout.write(self.style.ERROR(f'Unknown dataset(s): {", ".join(unknown)}'))
+            return
+
+        os.makedirs(output_dir, exist_ok=True)
+        for name in datasets:
+            path = os.path.join(output_dir, name + exports.FORMATS[file_format])
+            try:
+                rows = exports.write_dataset(name, path, file_format=file_format, start=start, end=end)
+            except ImproperlyConfigured as e:
+                self.stdout.write(self.style.ERROR(str(e)))
+                return
+            self.stdout.write(self.style.SUCCESS(f'Wrote {rows} rows to {path}'))
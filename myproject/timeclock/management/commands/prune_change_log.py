@@ -0,0 +1,22 @@
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from timeclock import changes
+
+class Command(BaseCommand):
+    help = 'Delete old change log rows behind the sync endpoint; clients with older tokens reload in full'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=changes.RETENTION.days,
+            help=f'Keep this many days of changes (default: {changes.RETENTION.days})',
+        )
+
+    def handle(self, *args, **kwargs):
+        days = kwargs.get('days', changes.RETENTION.days)
+        if days < 1:
+            self.stdout.write(self.style.ERROR('--days must be at least 1'))
+            return
+        deleted = changes.prune(timedelta(days=days))
+        self.stdout.write(self.style.SUCCESS(f'Deleted {deleted} change log rows older than {days} days'))
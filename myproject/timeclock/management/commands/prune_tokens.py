@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+from timeclock import token_store
+
+class Command(BaseCommand):
+    help = 'Delete expired refresh tokens and their blacklist entries; run daily'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=token_store.BATCH_SIZE,
+            help=f'Tokens deleted per transaction (default: {token_store.BATCH_SIZE})',
+        )
+        parser.add_argument(
+            '--stats',
+            action='store_true',
+            help='Only report the size of the token tables',
+        )
+
+    def handle(self, *args, **kwargs):
+        if kwargs.get('stats'):
+            for name, value in token_store.stats().items():
+                self.stdout.write(f'{name:<22} {value}')
+            return
+
+        batch_size = kwargs.get('batch_size', token_store.BATCH_SIZE)
+        if batch_size < 1:
+            self.stdout.write(self.style.ERROR('--batch-size must be at least 1'))
+            return
+        outstanding, blacklisted = token_store.purge_expired(batch_size=batch_size)
+        self.stdout.write(self.style.SUCCESS(
+            f'Deleted {outstanding} expired outstanding tokens and {blacklisted} blacklist entries'
+        ))
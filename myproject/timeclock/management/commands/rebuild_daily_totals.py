@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+from timeclock.models import Employee, DailyTotal, PayWeekTotal
+
+class Command(BaseCommand):
+    help = 'Rebuild the DailyTotal and PayWeekTotal rollups from the raw time entries'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--employee-id',
+            type=int,
+            help='Only rebuild totals for this employee ID',
+        )
+
+    def handle(self, *args, **kwargs):
+        employee_id = kwargs.get('employee_id')
+
+        employee_ids = None
+        if employee_id:
+            employee_ids = list(Employee.objects.filter(employee_id=employee_id).values_list('pk', flat=True))
+            if not employee_ids:
+                self.stdout.write(self.style.ERROR(f'No employee found with ID {employee_id}'))
+                return
+
+        # Pay-week totals are summed from the daily rows, so rebuild those first
+        days = DailyTotal.rebuild(employee_ids)
+        weeks = PayWeekTotal.rebuild(employee_ids)
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {days} daily and {weeks} pay-week total rows'))
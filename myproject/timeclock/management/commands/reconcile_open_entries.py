@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+from timeclock.models import Employee
+
+class Command(BaseCommand):
+    help = "Repair each employee's open_entry pointer from their open time entries"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--employee-id',
+            type=int,
+            help='Only reconcile this employee ID',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report drift without changing anything',
+        )
+
+    def handle(self, *args, **kwargs):
+        employee_id = kwargs.get('employee_id')
+        dry_run = kwargs.get('dry_run', False)
+
+        employees = Employee.objects.all()
+        if employee_id:
+            employees = employees.filter(employee_id=employee_id)
+            if not employees.exists():
+                self.stdout.write(self.style.ERROR(f'No employee found with ID {employee_id}'))
+                return
+
+        changes = Employee.reconcile_open_entries(employees, dry_run=dry_run)
+        for employee, old_entry_id, new_entry_id in changes:
+            self.stdout.write(
+                f"{employee}: open entry {old_entry_id or 'none'} -> {new_entry_id or 'none'}"
+            )
+
+        verb = 'Would repair' if dry_run else 'Repaired'
+        self.stdout.write(self.style.SUCCESS(f'{verb} {len(changes)} employee(s)'))
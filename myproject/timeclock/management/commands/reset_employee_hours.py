@@ -1,6 +1,7 @@
 from django.core.management.base import BaseCommand
 from django.db import transaction
-from timeclock.models import Employee
+from timeclock.models import Employee, LeaveLedgerEntry, new_data_version
+from timeclock import changes as change_log
 from datetime import date, datetime
 from decimal import Decimal
 
@@ -22,11 +23,20 @@ class Command(BaseCommand):
             action='store_true',
             help='Force reset regardless of last reset date (for testing purposes)',
         )
+        parser.add_argument(
+            '--replay',
+            action='store_true',
+            help='Rebuild cached vacation/sick totals from the leave ledger instead of resetting',
+        )
 
     def handle(self, *args, **kwargs):
         test_date = kwargs.get('test_date')
         employee_id = kwargs.get('employee_id')
         force_reset = kwargs.get('force_reset', False)
+
+        if kwargs.get('replay'):
+            self.replay_ledger(employee_id)
+            return
         
         if test_date:
             try:
@@ -64,6 +74,12 @@ class Command(BaseCommand):
 
                 # Allocate sick time for new employees immediately if it hasn't been allocated before
                 if not employee.initial_sick_hours_allocated:
+                    if employee.sick_hours_allocated != Decimal('18.00'):
+                        delta = Decimal('18.00') - employee.sick_hours_allocated
+                        LeaveLedgerEntry.record(
+                            employee, 'sick', 'accrual' if delta > 0 else 'adjustment', delta,
+                            update_balance=False, note='Initial sick hours allocation'
+                        )
                     employee.sick_hours_allocated = Decimal('18.00')
                     employee.initial_sick_hours_allocated = True
                     employee.save()
@@ -121,6 +137,19 @@ class Command(BaseCommand):
         employee.last_reset_date = today
         employee.save()
 
+        # Record the new year in the ledger so the totals can be replayed
+        for leave_type in ('vacation', 'sick'):
+            LeaveLedgerEntry.record(
+                employee, leave_type, 'reset', getattr(employee, f'{leave_type}_hours_allocated'),
+                update_balance=False, note=f'Year-end reset {today.year}'
+            )
+            carried_over = getattr(employee, f'{leave_type}_hours_used')
+            if carried_over:
+                LeaveLedgerEntry.record(
+                    employee, leave_type, 'usage', carried_over,
+                    update_balance=False, note='Pre-approved time off carried into the new year'
+                )
+
         # Only show a reset message if it was not the initial setting
         if not is_initial_reset:
             self.stdout.write(f"Vacation and sick hours reset for {employee.first_name} {employee.last_name}")
@@ -130,6 +159,7 @@ class Command(BaseCommand):
     def allocate_vacation_on_90_days(self, employee):
         # Allocate vacation time after 90 days, consistent with yearly reset rules
         years_employed = employee.years_employed
+        previously_allocated = employee.vacation_hours_allocated
 
         if 0 <= years_employed < 5:  # 0 - 4 Years = 1 week
             employee.vacation_hours_allocated = Decimal('40.00')
@@ -141,4 +171,36 @@ class Command(BaseCommand):
         employee.vacation_allocated_on_90_days = True
         employee.save()
 
+        if employee.vacation_hours_allocated != previously_allocated:
+            delta = employee.vacation_hours_allocated - previously_allocated
+            LeaveLedgerEntry.record(
+                employee, 'vacation', 'accrual' if delta > 0 else 'adjustment', delta,
+                update_balance=False, note='Vacation allocated after 90 days'
+            )
+
         self.stdout.write(f"Employee {employee.first_name} {employee.last_name} has now worked 90 days and has been granted Vacation Time")
+
+    def replay_ledger(self, employee_id=None):
+        # Recompute the cached hour columns from the leave ledger and report any drift
+        employees = Employee.objects.all()
+        if employee_id:
+            employees = employees.filter(employee_id=employee_id)
+
+        for employee in employees:
+            changes = {}
+            for leave_type in ('vacation', 'sick'):
+                allocated, used = LeaveLedgerEntry.replay_balance(employee, leave_type)
+                if allocated != getattr(employee, f'{leave_type}_hours_allocated'):
+                    changes[f'{leave_type}_hours_allocated'] = allocated
+                if used != getattr(employee, f'{leave_type}_hours_used'):
+                    changes[f'{leave_type}_hours_used'] = used
+
+            if changes:
+                Employee.objects.filter(pk=employee.pk).update(**changes, data_version=new_data_version())
+                change_log.record('employee', employee.pk, employee.pk)
+                self.stdout.write(self.style.WARNING(
+                    f"Corrected {employee.first_name} {employee.last_name} (ID: {employee.employee_id}): "
+                    + ", ".join(f"{field} {getattr(employee, field)} -> {value}" for field, value in changes.items())
+                ))
+
+        self.stdout.write(self.style.SUCCESS('Leave ledger replay completed.'))
@@ -4,8 +4,7 @@ from datetime import datetime
 from django.core.management.base import BaseCommand
 from django.conf import settings
 from dotenv import load_dotenv
-from rest_framework_simplejwt.token_blacklist.models import OutstandingToken, BlacklistedToken
-from django.contrib.auth import get_user_model
+from timeclock import token_store
 
 class Command(BaseCommand):
     help = 'Rotates the JWT signing key and updates the .env file'
@@ -47,17 +46,19 @@ class Command(BaseCommand):
                 self.style.SUCCESS('Successfully rotated JWT signing key')
             )
             
-            # Invalidate all existing tokens
-            OutstandingToken.objects.all().delete()
+            # Force all refresh tokens to be blacklisted, in batches; deleting
+            # them would not stop processes still holding the old key from
+            # accepting them
+            blacklisted = token_store.blacklist_all()
             
-            # Force all refresh tokens to be blacklisted
-            User = get_user_model()
-            users = User.objects.all()
-            for user in users:
-                OutstandingToken.objects.filter(user=user).delete()
+            # Expired tokens are no longer needed at all
+            purged, _ = token_store.purge_expired()
             
             self.stdout.write(
-                self.style.SUCCESS('Cleared all tokens - all users will need to log in again')
+                self.style.SUCCESS(
+                    f'Blacklisted {blacklisted} tokens and removed {purged} expired ones - '
+                    'all users will need to log in again'
+                )
             )
             
         except Exception as e:
@@ -0,0 +1,45 @@
+import time
+from django.core.management.base import BaseCommand
+from timeclock import reports
+
+# Seconds between sweeps for stale jobs and expired report files
+PURGE_INTERVAL = 3600
+
+class Command(BaseCommand):
+    help = 'Render queued report jobs (payroll PDFs, CSV exports) outside the web workers'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Run the jobs that are queued now, then exit',
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=5,
+            help='Seconds to wait between checks for new jobs (default: 5)',
+        )
+
+    def handle(self, *args, **kwargs):
+        once = kwargs.get('once', False)
+        poll_interval = kwargs['poll_interval']
+
+        last_purge = None
+        while True:
+            if last_purge is None or time.monotonic() - last_purge > PURGE_INTERVAL:
+                reports.purge_expired()
+                last_purge = time.monotonic()
+
+            job = reports.claim_next()
+            if job is None:
+                if once:
+                    return
+                time.sleep(poll_interval)
+                continue
+
+            self.stdout.write(f'Running {job}')
+            if reports.run_job(job):
+                self.stdout.write(self.style.SUCCESS(f'Finished report job {job.pk}'))
+            else:
+                self.stdout.write(self.style.ERROR(f'Report job {job.pk} failed'))
@@ -0,0 +1,60 @@
+# Generated by Django 5.1 on 2026-10-17 03:02
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def record_opening_balances(apps, schema_editor):
+    Employee = apps.get_model('timeclock', 'Employee')
+    LeaveLedgerEntry = apps.get_model('timeclock', 'LeaveLedgerEntry')
+
+    entries = []
+    for employee in Employee.objects.all():
+        for leave_type in ('vacation', 'sick'):
+            allocated = getattr(employee, f'{leave_type}_hours_allocated')
+            used = getattr(employee, f'{leave_type}_hours_used')
+            entries.append(LeaveLedgerEntry(
+                employee=employee, leave_type=leave_type, kind='reset',
+                hours=allocated, note='Opening balance'
+            ))
+            if used:
+                entries.append(LeaveLedgerEntry(
+                    employee=employee, leave_type=leave_type,
+                    kind='usage' if used > 0 else 'reversal', hours=abs(used),
+                    note='Opening balance'
+                ))
+    LeaveLedgerEntry.objects.bulk_create(entries)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('timeclock', '0055_delete_loginattempt_delete_passwordresetattempt'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LeaveLedgerEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('leave_type', models.CharField(choices=[('vacation', 'Vacation'), ('sick', 'Sick Leave')], max_length=10)),
+                ('kind', models.CharField(choices=[('accrual', 'Accrual'), ('adjustment', 'Adjustment'), ('usage', 'Usage'), ('reversal', 'Reversal'), ('reset', 'Reset')], max_length=10)),
+                ('hours', models.DecimalField(decimal_places=4, max_digits=8)),
+                ('note', models.CharField(blank=True, max_length=255)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+                ('employee', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='leave_ledger', to='timeclock.employee')),
+                ('time_entry', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='leave_ledger_entries', to='timeclock.timeentry')),
+                ('time_off_request', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='leave_ledger_entries', to='timeclock.timeoffrequest')),
+            ],
+            options={
+                'verbose_name': 'Leave Ledger Entry',
+                'verbose_name_plural': 'Leave Ledger Entries',
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['employee', 'leave_type', 'kind'], name='timeclock_l_employe_fa8089_idx')],
+            },
+        ),
+        migrations.RunPython(record_opening_balances, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 5.1 on 2026-10-17 03:06
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+
+def build_daily_totals(apps, schema_editor):
+    TimeEntry = apps.get_model('timeclock', 'TimeEntry')
+    DailyTotal = apps.get_model('timeclock', 'DailyTotal')
+
+    totals = TimeEntry.objects.annotate(
+        local_date=TruncDate('clock_in_time', tzinfo=timezone.get_current_timezone())
+    ).values('employee_id', 'local_date').annotate(
+        worked_hours=Sum('hours_worked'),
+        sick_hours=Sum('hours_worked', filter=Q(is_sick=True)),
+        entries=Count('id', filter=Q(clock_out_time__isnull=False)),
+    ).order_by()
+    DailyTotal.objects.bulk_create([
+        DailyTotal(
+            employee_id=total['employee_id'],
+            local_date=total['local_date'],
+            worked_seconds=int((total['worked_hours'] or 0) * 3600),
+            sick_seconds=int((total['sick_hours'] or 0) * 3600),
+            entry_count=total['entries'],
+        )
+        for total in totals.iterator()
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('timeclock', '0056_leaveledgerentry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyTotal',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('local_date', models.DateField()),
+                ('worked_seconds', models.IntegerField(default=0)),
+                ('sick_seconds', models.IntegerField(default=0)),
+                ('entry_count', models.IntegerField(default=0)),
+                ('employee', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_totals', to='timeclock.employee')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['local_date'], name='timeclock_d_local_d_98e5f3_idx')],
+                'constraints': [models.UniqueConstraint(fields=('employee', 'local_date'), name='unique_daily_total')],
+            },
+        ),
+        migrations.RunPython(build_daily_totals, migrations.RunPython.noop),
+    ]
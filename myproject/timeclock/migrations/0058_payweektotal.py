@@ -0,0 +1,51 @@
+# Generated by Django 5.1 on 2026-10-17 03:09
+
+import django.db.models.deletion
+from datetime import timedelta
+from django.db import migrations, models
+
+
+def build_pay_week_totals(apps, schema_editor):
+    DailyTotal = apps.get_model('timeclock', 'DailyTotal')
+    PayWeekTotal = apps.get_model('timeclock', 'PayWeekTotal')
+
+    totals = {}
+    for employee_id, local_date, worked, sick, count in DailyTotal.objects.values_list(
+        'employee_id', 'local_date', 'worked_seconds', 'sick_seconds', 'entry_count'
+    ).iterator():
+        weekday = local_date.weekday()
+        week_start = local_date - timedelta(days=(weekday - 3 if weekday >= 3 else weekday + 4))
+        total = totals.setdefault(
+            (employee_id, week_start),
+            PayWeekTotal(employee_id=employee_id, week_start=week_start)
+        )
+        total.worked_seconds += worked
+        total.sick_seconds += sick
+        total.entry_count += count
+    PayWeekTotal.objects.bulk_create(totals.values(), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('timeclock', '0057_dailytotal'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PayWeekTotal',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('worked_seconds', models.IntegerField(default=0)),
+                ('sick_seconds', models.IntegerField(default=0)),
+                ('entry_count', models.IntegerField(default=0)),
+                ('week_start', models.DateField()),
+                ('employee', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='pay_week_totals', to='timeclock.employee')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['week_start'], name='timeclock_p_week_st_0ad597_idx')],
+                'constraints': [models.UniqueConstraint(fields=('employee', 'week_start'), name='unique_pay_week_total')],
+            },
+        ),
+        migrations.RunPython(build_pay_week_totals, migrations.RunPython.noop),
+    ]
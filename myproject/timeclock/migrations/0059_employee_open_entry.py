@@ -0,0 +1,47 @@
+# Generated by Django 5.1 on 2026-10-17 03:12
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def set_open_entries(apps, schema_editor):
+    Employee = apps.get_model('timeclock', 'Employee')
+    TimeEntry = apps.get_model('timeclock', 'TimeEntry')
+
+    # Point each employee at their latest open entry; clocked_in flags
+    # without an open entry behind them are dropped.
+    for employee in Employee.objects.all():
+        open_entry = TimeEntry.objects.filter(
+            employee=employee, clock_out_time__isnull=True
+        ).order_by('-clock_in_time').first()
+        if open_entry:
+            Employee.objects.filter(pk=employee.pk).update(open_entry=open_entry)
+
+
+def set_clocked_in_flags(apps, schema_editor):
+    Employee = apps.get_model('timeclock', 'Employee')
+    Employee.objects.filter(open_entry__isnull=False).update(clocked_in=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('timeclock', '0058_payweektotal'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='employee',
+            name='open_entry',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='timeclock.timeentry'),
+        ),
+        migrations.AddIndex(
+            model_name='timeentry',
+            index=models.Index(fields=['employee', 'clock_in_time'], name='timeclock_t_employe_87586d_idx'),
+        ),
+        migrations.RunPython(set_open_entries, set_clocked_in_flags),
+        migrations.RemoveField(
+            model_name='employee',
+            name='clocked_in',
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.1 on 2026-10-17 03:36
+
+import timeclock.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('timeclock', '0060_reportjob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='employee',
+            name='data_version',
+            field=models.CharField(default=timeclock.models.new_data_version, editable=False, max_length=32),
+        ),
+    ]
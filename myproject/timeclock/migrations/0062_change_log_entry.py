@@ -0,0 +1,27 @@
+# Generated by Django 5.1 on 2026-10-17 03:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('timeclock', '0061_employee_data_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChangeLogEntry',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('model', models.CharField(choices=[('time_entry', 'Time Entry'), ('time_off_request', 'Time Off Request'), ('employee', 'Employee')], max_length=20)),
+                ('object_id', models.BigIntegerField()),
+                ('employee_pk', models.BigIntegerField(null=True)),
+                ('action', models.CharField(choices=[('upsert', 'Created or Updated'), ('delete', 'Deleted')], default='upsert', max_length=10)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['employee_pk', 'id'], name='timeclock_c_employe_741e01_idx'), models.Index(fields=['created_at'], name='timeclock_c_created_66032d_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.1 on 2026-10-17 03:52
+
+import base64
+from cryptography.hazmat.primitives import serialization
+from django.db import migrations
+
+
+def canonicalize_public_keys(apps, schema_editor):
+    BiometricCredential = apps.get_model('timeclock', 'BiometricCredential')
+
+    for credential in BiometricCredential.objects.all().iterator():
+        # Registration stored PEM; logins now expect base64 of the DER key
+        try:
+            key = serialization.load_pem_public_key(credential.public_key.encode())
+        except ValueError:
+            key = None
+        if key is not None:
+            der = key.public_bytes(serialization.Encoding.DER, serialization.PublicFormat.SubjectPublicKeyInfo)
+            credential.public_key = base64.b64encode(der).decode()
+        # The old count was the server's own tally of logins, not the
+        # authenticator's counter that logins now compare against
+        credential.sign_count = 0
+        credential.save(update_fields=['public_key', 'sign_count'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('timeclock', '0062_change_log_entry'),
+    ]
+
+    operations = [
+        migrations.RunPython(canonicalize_public_keys, migrations.RunPython.noop),
+    ]
@@ -1,15 +1,19 @@
-from django.db import models, transaction
+from django.db import models, transaction, connection, IntegrityError
 from django.utils import timezone
 from datetime import datetime, timedelta
 from decimal import Decimal
-from django.db.models import Sum, F
+from django.db.models import Sum, F, Q, Count, OuterRef, Subquery
+from django.db.models.functions import TruncDate
+from django.core.exceptions import ValidationError
 import pytz
 import math
+import uuid
 from django.contrib.auth.models import User
 from datetime import date
 from dateutil.relativedelta import relativedelta
 from django.db.models.signals import post_save
 from django.dispatch import receiver
+from .utils import pay_week_start
 import logging
 logger = logging.getLogger(__name__)
 
@@ -22,7 +26,10 @@ class AdminProfile(models.Model):
 def create_admin_profile(sender, instance, created, **kwargs):
     if created and instance.is_staff:
         AdminProfile.objects.create(user=instance)
-		
+
+def new_data_version():
+    return uuid.uuid4().hex
+
 class Employee(models.Model):
     DEPARTMENT_CHOICES = [
         ('none', 'None'),
@@ -39,7 +46,9 @@ class Employee(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE, null=True, blank=True)
     first_name = models.CharField(max_length=100)
     last_name = models.CharField(max_length=100)
-    clocked_in = models.BooleanField(default=False)
+    open_entry = models.ForeignKey(
+        'TimeEntry', null=True, blank=True, on_delete=models.SET_NULL, related_name='+'
+    )  # The entry the employee is currently clocked in on, if any
     hire_date = models.DateField(null=True, blank=True)
     employee_id = models.IntegerField(unique=True)
     department = models.CharField(max_length=20, choices=DEPARTMENT_CHOICES, default='none')
@@ -55,10 +64,16 @@ class Employee(models.Model):
     future_vacation_hours_used = models.DecimalField(max_digits=6, decimal_places=2, default=0)
     future_sick_hours_used = models.DecimalField(max_digits=6, decimal_places=2, default=0)
     theme_id = models.CharField(max_length=50, default='light')
+    # Changes with anything the employee API shows; see data_version.py
+    data_version = models.CharField(max_length=32, default=new_data_version, editable=False)
 
     def __str__(self):
         return f"{self.first_name} {self.last_name} (ID: {self.employee_id})"
 
+    @property
+    def clocked_in(self):
+        return self.open_entry_id is not None
+
     @property
     def vacation_hours_remaining(self):
         return self.vacation_hours_allocated - self.vacation_hours_used
@@ -74,6 +89,34 @@ class Employee(models.Model):
         return 0
 
 
+    @classmethod
+    def reconcile_open_entries(cls, employees=None, dry_run=False):
+        """Repoint open_entry at each employee's latest open time entry.
+
+        Returns (employee, old entry id, new entry id) for every employee that drifted.
+        """
+        if employees is None:
+            employees = cls.objects.all()
+        latest_open = TimeEntry.objects.filter(
+            employee=OuterRef('pk'), clock_out_time__isnull=True
+        ).order_by('-clock_in_time').values('pk')[:1]
+
+        changes = []
+        for employee in employees.annotate(expected_entry_id=Subquery(latest_open)):
+            if employee.open_entry_id == employee.expected_entry_id:
+                continue
+            changes.append((employee, employee.open_entry_id, employee.expected_entry_id))
+            if not dry_run:
+                cls.objects.filter(pk=employee.pk).update(open_entry_id=employee.expected_entry_id, data_version=new_data_version())
+                employee.open_entry_id = employee.expected_entry_id
+        if changes and not dry_run:
+            from .roster import invalidate
+            from .changes import record
+            transaction.on_commit(invalidate)
+            for employee, _, _ in changes:
+                record('employee', employee.pk, employee.pk)
+        return changes
+
     @property
     def has_worked_90_days(self):
         if self.hire_date:
@@ -127,75 +170,134 @@ class TimeEntry(models.Model):
             self.hours_worked = Decimal(round(duration, 2))
         else:
             self.hours_worked = Decimal('0.00')
-    
-        employee = Employee.objects.select_for_update().get(pk=self.employee.pk)
-    
-        if self.pk is not None:
-            original_entry = TimeEntry.objects.get(pk=self.pk)
-    
-            if not self.skip_hours_deduction:
-                if original_entry.is_vacation and original_entry.hours_worked != self.hours_worked:
-                    employee.vacation_hours_used = F('vacation_hours_used') - original_entry.hours_worked + self.hours_worked
-                elif not original_entry.is_vacation and self.is_vacation:
-                    employee.vacation_hours_used = F('vacation_hours_used') + self.hours_worked
-    
-                if original_entry.is_sick and original_entry.hours_worked != self.hours_worked:
-                    employee.sick_hours_used = F('sick_hours_used') - original_entry.hours_worked + self.hours_worked
-                elif not original_entry.is_sick and self.is_sick:
-                    employee.sick_hours_used = F('sick_hours_used') + self.hours_worked
-        else:
+
+        original_entry = TimeEntry.objects.get(pk=self.pk) if self.pk is not None else None
+
+        if original_entry is None and not self.skip_hours_deduction and (self.is_vacation or self.is_sick):
+            # Balance check reads the cached totals without locking the employee row;
+            # the usage itself is recorded as a ledger insert after the entry is saved.
+            employee = Employee.objects.get(pk=self.employee_id)
+
             # Check if this is a future year entry
             current_year = timezone.now().year
             entry_year = self.clock_in_time.year
             is_future_year = entry_year > current_year
 
-            if not self.skip_hours_deduction:
-                if self.is_vacation:
-                    if not is_future_year and employee.vacation_hours_remaining < self.hours_worked:
-                        raise ValidationError("Not enough vacation hours available")
-                    employee.vacation_hours_used = F('vacation_hours_used') + self.hours_worked
-                if self.is_sick:
-                    if not is_future_year and employee.sick_hours_remaining < self.hours_worked:
-                        raise ValidationError("Not enough sick hours available")
-                    employee.sick_hours_used = F('sick_hours_used') + self.hours_worked
+            if not is_future_year:
+                if self.is_vacation and employee.vacation_hours_remaining < self.hours_worked:
+                    raise ValidationError("Not enough vacation hours available")
+                if self.is_sick and employee.sick_hours_remaining < self.hours_worked:
+                    raise ValidationError("Not enough sick hours available")
     
+        # Work out full_day from the running daily total instead of re-summing the day's entries
+        current = self._daily_contribution()
+        previous = original_entry._daily_contribution() if original_entry else None
+        local_date, worked_seconds, sick_seconds, _ = current
+        day_worked, day_sick = DailyTotal.objects.filter(
+            employee_id=self.employee_id, local_date=local_date
+        ).values_list('worked_seconds', 'sick_seconds').first() or (0, 0)
+        day_seconds = day_worked - day_sick + worked_seconds - sick_seconds
+        if previous and previous[0] == local_date and original_entry.employee_id == self.employee_id:
+            day_seconds -= previous[1] - previous[2]
+        self.full_day = day_seconds >= 8 * 3600
+
         super().save(*args, **kwargs)
-        employee.save()
-    
-        self.update_total_hours_for_day()
+
+        if original_entry is not None and original_entry.employee_id != self.employee_id:
+            # post_save only announces the change to the new employee
+            from .data_version import bump
+            from .changes import record
+            bump(Employee.objects.filter(pk=original_entry.employee_id))
+            record('time_entry', self.pk, original_entry.employee_id, 'delete')
+            record('employee', original_entry.employee_id, original_entry.employee_id)
+
+        if not self.skip_hours_deduction:
+            self._record_leave_usage(original_entry)
+
+        self._update_open_entry(original_entry)
+        self._apply_rollup_deltas(previous, current, original_entry.employee_id if original_entry else None)
 
     @transaction.atomic
     def delete(self, *args, **kwargs):
-        employee = Employee.objects.select_for_update().get(pk=self.employee.pk)
-    
-        # Update vacation/sick hours if applicable
-        if self.is_vacation:
-            employee.vacation_hours_used = F('vacation_hours_used') - self.hours_worked
-        if self.is_sick:
-            employee.sick_hours_used = F('sick_hours_used') - self.hours_worked
-            
-        # Only update clocked_in status if this is today's entry and has no clock_out_time
-        current_time = timezone.localtime()
-        start_of_day = current_time.replace(hour=0, minute=0, second=0, microsecond=0)
-        end_of_day = start_of_day + timedelta(days=1)
-        
-        if (self.clock_in_time >= start_of_day and 
-            self.clock_in_time < end_of_day and 
-            not self.clock_out_time):
-            employee.clocked_in = False
-    
-        employee.save()
-        super().delete(*args, **kwargs)
+        # Return vacation/sick hours to the employee's balance
+        for leave_type, flag in LeaveLedgerEntry.LEAVE_FLAGS:
+            if getattr(self, flag) and self.hours_worked:
+                LeaveLedgerEntry.record(
+                    self.employee, leave_type, 'reversal', self.hours_worked,
+                    note=f"Time entry {self.pk} deleted"
+                )
+
+        self._apply_rollup_deltas(self._daily_contribution(), None)
 
-    def update_total_hours_for_day(self):
-        total_hours = TimeEntry.objects.filter(
-            employee=self.employee,
-            clock_in_time__date=self.clock_in_time.date(),
-            is_sick=False
-        ).aggregate(total_hours=Sum('hours_worked'))['total_hours'] or 0
+        # Employee.open_entry is SET_NULL, so deleting an open entry also clocks the employee out
+        super().delete(*args, **kwargs)
 
-        self.full_day = total_hours >= 8.0
-        super().save(update_fields=['full_day'])
+    def _record_leave_usage(self, original_entry=None):
+        """Post usage/reversal ledger entries for the change in vacation and sick hours."""
+        moved = original_entry is not None and original_entry.employee_id != self.employee_id
+        for leave_type, flag in LeaveLedgerEntry.LEAVE_FLAGS:
+            before = original_entry.hours_worked if original_entry and getattr(original_entry, flag) else Decimal('0.00')
+            after = self.hours_worked if getattr(self, flag) else Decimal('0.00')
+            if moved and before:
+                # The old employee gets the hours back; the new one is charged in full below
+                LeaveLedgerEntry.record(original_entry.employee, leave_type, 'reversal', before, time_entry=self)
+                before = Decimal('0.00')
+            if after > before:
+                LeaveLedgerEntry.record(self.employee, leave_type, 'usage', after - before, time_entry=self)
+            elif after < before:
+                LeaveLedgerEntry.record(self.employee, leave_type, 'reversal', before - after, time_entry=self)
+
+    def _daily_contribution(self):
+        """Return the (local date, worked seconds, sick seconds, entry count) this entry adds to its DailyTotal.
+
+        Open entries are not counted until they are clocked out.
+        """
+        # Match the four decimal places hours_worked is stored with
+        hours = Decimal(self.hours_worked).quantize(Decimal('0.0001'))
+        worked_seconds = int(hours * 3600)
+        return (
+            timezone.localtime(self.clock_in_time).date(),
+            worked_seconds,
+            worked_seconds if self.is_sick else 0,
+            0 if self.clock_out_time is None else 1,
+        )
+
+    def _update_open_entry(self, original_entry=None):
+        """Point the employee at this entry while it is open and clear the pointer once it closes."""
+        was_open = original_entry is not None and original_entry.clock_out_time is None
+        is_open = self.clock_out_time is None
+        moved = was_open and original_entry.employee_id != self.employee_id
+
+        if was_open and (moved or not is_open):
+            Employee.objects.filter(pk=original_entry.employee_id, open_entry=self).update(
+                open_entry=None, data_version=new_data_version()
+            )
+        if is_open and (moved or not was_open):
+            Employee.objects.filter(pk=self.employee_id).update(open_entry=self, data_version=new_data_version())
+
+        if TimeEntry.employee.is_cached(self):
+            if is_open:
+                self.employee.open_entry_id = self.pk
+            elif self.employee.open_entry_id == self.pk:
+                self.employee.open_entry_id = None
+
+    def _apply_rollup_deltas(self, previous, current, previous_employee_id=None):
+        """Move this entry's contribution from `previous` to `current` in the daily and pay-week totals.
+
+        previous_employee_id is the employee `previous` was counted for, if
+        the entry has since moved to another employee.
+        """
+        previous_employee_id = previous_employee_id or self.employee_id
+        for rollup in (DailyTotal, PayWeekTotal):
+            changes = {}
+            if previous:
+                changes[previous_employee_id, rollup.period_for(previous[0])] = (-previous[1], -previous[2], -previous[3])
+            if current:
+                key = (self.employee_id, rollup.period_for(current[0]))
+                worked, sick, count = changes.get(key, (0, 0, 0))
+                changes[key] = (worked + current[1], sick + current[2], count + current[3])
+            for (employee_id, period), (worked, sick, count) in changes.items():
+                rollup.apply_delta(employee_id, period, worked, sick, count)
 
     def __str__(self):
         clock_in_date = self.clock_in_time.strftime('%Y-%m-%d %H:%M') if self.clock_in_time else 'N/A'
@@ -207,12 +309,242 @@ class TimeEntry(models.Model):
         verbose_name_plural = 'Time Entries'
         indexes = [
             models.Index(fields=['employee']),
+            models.Index(fields=['employee', 'clock_in_time']),
             models.Index(fields=['clock_in_time']),
             models.Index(fields=['is_sick']),
             models.Index(fields=['is_vacation']),
         ]
 
 
+class RunningTotal(models.Model):
+    """Per-employee totals for one period, kept in step with TimeEntry writes.
+
+    Seconds are derived from hours_worked so the totals match what payroll sums,
+    and entry_count counts clocked-out entries only.
+    Rebuild from the raw entries with the rebuild_daily_totals command.
+    """
+    PERIOD_FIELD = None
+
+    worked_seconds = models.IntegerField(default=0)
+    sick_seconds = models.IntegerField(default=0)
+    entry_count = models.IntegerField(default=0)
+
+    class Meta:
+        abstract = True
+
+    def __str__(self):
+        return f"{self.employee} {getattr(self, self.PERIOD_FIELD)}: {self.worked_seconds}s"
+
+    @property
+    def non_sick_seconds(self):
+        return self.worked_seconds - self.sick_seconds
+
+    @classmethod
+    def period_for(cls, local_date):
+        """Return the period key that the given local date is counted under."""
+        return local_date
+
+    @classmethod
+    def apply_delta(cls, employee_id, period, worked_seconds=0, sick_seconds=0, entry_count=0):
+        """Add the given deltas to a period's row, creating the row on first use."""
+        if not (worked_seconds or sick_seconds or entry_count):
+            return
+        if entry_count > 0 and connection.vendor in ('mysql', 'postgresql', 'sqlite'):
+            # A clock-out: one statement whether or not the row exists yet
+            cls._upsert(employee_id, period, worked_seconds, sick_seconds, entry_count)
+            return
+        deltas = {
+            'worked_seconds': F('worked_seconds') + worked_seconds,
+            'sick_seconds': F('sick_seconds') + sick_seconds,
+            'entry_count': F('entry_count') + entry_count,
+        }
+        rows = cls.objects.filter(employee_id=employee_id, **{cls.PERIOD_FIELD: period})
+        if rows.update(**deltas):
+            return
+        if entry_count <= 0:
+            logger.warning(
+                "No %s for employee %s on %s; run rebuild_daily_totals",
+                cls._meta.verbose_name, employee_id, period
+            )
+            return
+        try:
+            with transaction.atomic():
+                cls.objects.create(
+                    employee_id=employee_id,
+                    worked_seconds=worked_seconds,
+                    sick_seconds=sick_seconds,
+                    entry_count=entry_count,
+                    **{cls.PERIOD_FIELD: period}
+                )
+        except IntegrityError:
+            # Another punch created the row first
+            rows.update(**deltas)
+
+    @classmethod
+    def _upsert(cls, employee_id, period, worked_seconds, sick_seconds, entry_count):
+        """Insert the period's row, or add to it, in one INSERT ... ON DUPLICATE KEY / ON CONFLICT."""
+        qn = connection.ops.quote_name
+        table = qn(cls._meta.db_table)
+        key = [qn(cls._meta.get_field('employee').column), qn(cls._meta.get_field(cls.PERIOD_FIELD).column)]
+        totals = [qn(name) for name in ('worked_seconds', 'sick_seconds', 'entry_count')]
+        if connection.vendor == 'mysql':
+            conflict = 'ON DUPLICATE KEY UPDATE ' + ', '.join(
+                f'{column} = {column} + VALUES({column})' for column in totals
+            )
+        else:
+            conflict = f'ON CONFLICT ({", ".join(key)}) DO UPDATE SET ' + ', '.join(
+                f'{column} = {table}.{column} + excluded.{column}' for column in totals
+            )
+        sql = f'INSERT INTO {table} ({", ".join(key + totals)}) VALUES (%s, %s, %s, %s, %s) {conflict}'
+        params = [employee_id, connection.ops.adapt_datefield_value(period), worked_seconds, sick_seconds, entry_count]
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+
+    @classmethod
+    def seconds_by_period(cls, employee, start_date, end_date):
+        """Map each period key between the two dates to the seconds worked in it."""
+        return dict(
+            cls.objects.filter(
+                employee=employee,
+                **{f'{cls.PERIOD_FIELD}__range': (start_date, end_date)}
+            ).values_list(cls.PERIOD_FIELD, 'worked_seconds')
+        )
+
+
+class DailyTotal(RunningTotal):
+    """Totals for one employee on one local day."""
+    PERIOD_FIELD = 'local_date'
+
+    employee = models.ForeignKey(Employee, on_delete=models.CASCADE, related_name='daily_totals')
+    local_date = models.DateField()
+
+    @classmethod
+    def total_seconds(cls, employee, start_date, end_date):
+        """Seconds worked by the employee across the local dates in the range."""
+        return cls.objects.filter(
+            employee=employee,
+            local_date__range=(start_date, end_date)
+        ).aggregate(total=Sum('worked_seconds'))['total'] or 0
+
+    @classmethod
+    def rebuild(cls, employee_ids=None):
+        """Recompute rows from TimeEntry. Returns the number of rows written."""
+        entries = TimeEntry.objects.all()
+        rows = cls.objects.all()
+        if employee_ids is not None:
+            entries = entries.filter(employee_id__in=employee_ids)
+            rows = rows.filter(employee_id__in=employee_ids)
+
+        totals = entries.annotate(
+            local_date=TruncDate('clock_in_time', tzinfo=timezone.get_current_timezone())
+        ).values('employee_id', 'local_date').annotate(
+            worked_hours=Sum('hours_worked'),
+            sick_hours=Sum('hours_worked', filter=Q(is_sick=True)),
+            entries=Count('id', filter=Q(clock_out_time__isnull=False)),
+        ).order_by()
+
+        with transaction.atomic():
+            rows.delete()
+            created = cls.objects.bulk_create(
+                [
+                    cls(
+                        employee_id=total['employee_id'],
+                        local_date=total['local_date'],
+                        worked_seconds=int((total['worked_hours'] or 0) * 3600),
+                        sick_seconds=int((total['sick_hours'] or 0) * 3600),
+                        entry_count=total['entries'],
+                    )
+                    for total in totals.iterator()
+                ],
+                batch_size=1000
+            )
+        return len(created)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['employee', 'local_date'], name='unique_daily_total'),
+        ]
+        indexes = [
+            models.Index(fields=['local_date']),
+        ]
+
+
+class PayWeekTotal(RunningTotal):
+    """Totals for one employee over a Thursday-to-Wednesday pay week."""
+    PERIOD_FIELD = 'week_start'
+
+    employee = models.ForeignKey(Employee, on_delete=models.CASCADE, related_name='pay_week_totals')
+    week_start = models.DateField()
+
+    @classmethod
+    def period_for(cls, local_date):
+        return pay_week_start(local_date)
+
+    @classmethod
+    def seconds_by_week(cls, employee, start_date, end_date):
+        """Map each pay week overlapping the dates to the seconds worked on its dates in the range.
+
+        Weeks that lie wholly inside the range are read from their rows. A week
+        cut off by either end of the range is summed from DailyTotal over just
+        the dates that fall inside it, so the weeks add up to the range total.
+        """
+        first_whole = pay_week_start(start_date)
+        if first_whole < start_date:
+            first_whole += timedelta(days=7)
+        last_whole = pay_week_start(end_date - timedelta(days=6))
+
+        weeks = {}
+        if first_whole <= last_whole:
+            weeks.update(cls.seconds_by_period(employee, first_whole, last_whole))
+            clipped = (
+                Q(local_date__range=(start_date, first_whole - timedelta(days=1)))
+                | Q(local_date__range=(last_whole + timedelta(days=7), end_date))
+            )
+        else:
+            clipped = Q(local_date__range=(start_date, end_date))
+
+        for local_date, worked in DailyTotal.objects.filter(clipped, employee=employee).values_list(
+            'local_date', 'worked_seconds'
+        ):
+            week_start = pay_week_start(local_date)
+            weeks[week_start] = weeks.get(week_start, 0) + worked
+        return weeks
+
+    @classmethod
+    def rebuild(cls, employee_ids=None):
+        """Recompute rows from DailyTotal. Returns the number of rows written."""
+        days = DailyTotal.objects.all()
+        rows = cls.objects.all()
+        if employee_ids is not None:
+            days = days.filter(employee_id__in=employee_ids)
+            rows = rows.filter(employee_id__in=employee_ids)
+
+        totals = {}
+        for employee_id, local_date, worked, sick, count in days.values_list(
+            'employee_id', 'local_date', 'worked_seconds', 'sick_seconds', 'entry_count'
+        ).iterator():
+            total = totals.setdefault(
+                (employee_id, pay_week_start(local_date)),
+                cls(employee_id=employee_id, week_start=pay_week_start(local_date))
+            )
+            total.worked_seconds += worked
+            total.sick_seconds += sick
+            total.entry_count += count
+
+        with transaction.atomic():
+            rows.delete()
+            created = cls.objects.bulk_create(totals.values(), batch_size=1000)
+        return len(created)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['employee', 'week_start'], name='unique_pay_week_total'),
+        ]
+        indexes = [
+            models.Index(fields=['week_start']),
+        ]
+
+
 class Note(models.Model):
     time_entry = models.ForeignKey(TimeEntry, on_delete=models.CASCADE, related_name='notes')
     created_by = models.ForeignKey(User, null=True, blank=True, on_delete=models.SET_NULL)
@@ -224,6 +556,24 @@ class Note(models.Model):
         creator_name = self.created_by.username if self.created_by else 'Employee'
         return f"Note by {creator_name} on {self.created_at.strftime('%Y-%m-%d %H:%M')}"
 
+    @property
+    def creator_name(self):
+        """Name shown for the note's author: an employee's first name, else the username.
+
+        Load notes with select_related('created_by__employee') so this needs
+        no query of its own.
+        """
+        user = self.created_by
+        if not user:
+            return "Unknown"
+        # A numeric username is an employee ID
+        if user.username.isdigit():
+            try:
+                return user.employee.first_name
+            except Employee.DoesNotExist:
+                pass
+        return user.username
+
     class Meta:
         indexes = [
             models.Index(fields=['time_entry']),
@@ -270,37 +620,43 @@ class TimeOffRequest(models.Model):
             models.Index(fields=['end_date']),
         ]
 
+    @transaction.atomic
     def save(self, *args, **kwargs):
         # Check if this is a new request being approved
         if self.pk is None and self.status == 'approved':
-            self._handle_hours_allocation()
+            allocate_hours = True
         # Check if an existing request is being approved
         elif self.pk and self.status == 'approved':
             original = TimeOffRequest.objects.get(pk=self.pk)
-            if original.status != 'approved':
-                self._handle_hours_allocation()
+            allocate_hours = original.status != 'approved'
+        else:
+            allocate_hours = False
         
         self.clean()
         super().save(*args, **kwargs)
 
+        if allocate_hours:
+            self._handle_hours_allocation()
+
     def _handle_hours_allocation(self):
         from datetime import date
         today = date.today()
         next_year = today.year + 1
         is_future_request = self.start_date.year == next_year or self.end_date.year == next_year
 
+        if self.request_type not in ('vacation', 'sick'):
+            return
+
         if is_future_request:
-            if self.request_type == 'vacation':
-                self.employee.future_vacation_hours_used += self.hours_requested
-            elif self.request_type == 'sick':
-                self.employee.future_sick_hours_used += self.hours_requested
+            # Next year's hours are carried into the ledger by the year-end reset
+            field = f'future_{self.request_type}_hours_used'
+            Employee.objects.filter(pk=self.employee_id).update(**{field: F(field) + self.hours_requested}, data_version=new_data_version())
+            setattr(self.employee, field, getattr(self.employee, field) + self.hours_requested)
         else:
-            if self.request_type == 'vacation':
-                self.employee.vacation_hours_used += self.hours_requested
-            elif self.request_type == 'sick':
-                self.employee.sick_hours_used += self.hours_requested
-        
-        self.employee.save()
+            LeaveLedgerEntry.record(
+                self.employee, self.request_type, 'usage', self.hours_requested,
+                time_off_request=self, created_by=self.reviewed_by
+            )
 
     def clean(self):
         if self.start_date and self.end_date and self.start_date > self.end_date:
@@ -334,6 +690,118 @@ class TimeOffRequest(models.Model):
         return f"{self.employee} - {self.get_request_type_display()} ({self.start_date} to {self.end_date})"
 
 
+class LeaveLedgerEntry(models.Model):
+    """
+    Append-only record of every change to an employee's vacation and sick balances.
+
+    The hour columns on Employee are a cached running sum of this table:
+    accruals add to the allocation, adjustments correct it by a signed
+    amount, usage and reversals move the used total, and a reset starts a
+    new allocation with nothing used.
+    """
+    LEAVE_TYPE_CHOICES = [
+        ('vacation', 'Vacation'),
+        ('sick', 'Sick Leave'),
+    ]
+
+    KIND_CHOICES = [
+        ('accrual', 'Accrual'),
+        ('adjustment', 'Adjustment'),
+        ('usage', 'Usage'),
+        ('reversal', 'Reversal'),
+        ('reset', 'Reset'),
+    ]
+
+    # (leave_type, TimeEntry flag) pairs
+    LEAVE_FLAGS = (('vacation', 'is_vacation'), ('sick', 'is_sick'))
+
+    employee = models.ForeignKey(Employee, on_delete=models.CASCADE, related_name='leave_ledger')
+    leave_type = models.CharField(max_length=10, choices=LEAVE_TYPE_CHOICES)
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    hours = models.DecimalField(max_digits=8, decimal_places=4)
+    time_entry = models.ForeignKey(TimeEntry, null=True, blank=True, on_delete=models.SET_NULL, related_name='leave_ledger_entries')
+    time_off_request = models.ForeignKey(TimeOffRequest, null=True, blank=True, on_delete=models.SET_NULL, related_name='leave_ledger_entries')
+    created_by = models.ForeignKey(User, null=True, blank=True, on_delete=models.SET_NULL)
+    note = models.CharField(max_length=255, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.employee} - {self.get_kind_display()} {self.hours} {self.get_leave_type_display()} hours"
+
+    class Meta:
+        verbose_name = 'Leave Ledger Entry'
+        verbose_name_plural = 'Leave Ledger Entries'
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['employee', 'leave_type', 'kind']),
+        ]
+
+    @classmethod
+    def record(cls, employee, leave_type, kind, hours, update_balance=True, **extra):
+        """
+        Insert a ledger entry and apply it to the cached Employee totals.
+
+        The cache is moved with a single UPDATE (no select_for_update), and the
+        passed instance is kept in step so a later save() does not undo it.
+        Pass update_balance=False when the caller writes the new totals itself.
+        """
+        hours = Decimal(str(hours))
+        entry = cls.objects.create(employee=employee, leave_type=leave_type, kind=kind, hours=hours, **extra)
+
+        if update_balance:
+            allocated_field = f'{leave_type}_hours_allocated'
+            used_field = f'{leave_type}_hours_used'
+
+            if kind == 'reset':
+                Employee.objects.filter(pk=employee.pk).update(**{allocated_field: hours, used_field: Decimal('0.00')}, data_version=new_data_version())
+                setattr(employee, allocated_field, hours)
+                setattr(employee, used_field, Decimal('0.00'))
+            else:
+                field = allocated_field if kind in ('accrual', 'adjustment') else used_field
+                delta = -hours if kind == 'reversal' else hours
+                Employee.objects.filter(pk=employee.pk).update(**{field: F(field) + delta}, data_version=new_data_version())
+                setattr(employee, field, Decimal(str(getattr(employee, field) or 0)) + delta)
+
+        return entry
+
+    @classmethod
+    def record_edits(cls, employee, original, created_by=None):
+        """Record hour columns edited directly (admin forms); the caller's save() writes the totals."""
+        for leave_type in ('vacation', 'sick'):
+            allocated_field = f'{leave_type}_hours_allocated'
+            used_field = f'{leave_type}_hours_used'
+
+            allocated_delta = Decimal(str(getattr(employee, allocated_field) or 0)) - Decimal(str(getattr(original, allocated_field) or 0))
+            if allocated_delta:
+                # Signed: a lowered allocation is a negative adjustment, not an accrual
+                cls.record(employee, leave_type, 'adjustment', allocated_delta, update_balance=False,
+                           created_by=created_by, note='Manual adjustment')
+
+            used_delta = Decimal(str(getattr(employee, used_field) or 0)) - Decimal(str(getattr(original, used_field) or 0))
+            if used_delta:
+                cls.record(employee, leave_type, 'usage' if used_delta > 0 else 'reversal', abs(used_delta),
+                           update_balance=False, created_by=created_by, note='Manual adjustment')
+
+    @classmethod
+    def replay_balance(cls, employee, leave_type):
+        """Rebuild (allocated, used) for one leave type from the ledger, starting at the latest reset."""
+        entries = cls.objects.filter(employee=employee, leave_type=leave_type)
+
+        last_reset = entries.filter(kind='reset').order_by('-id').first()
+        allocated = last_reset.hours if last_reset else Decimal('0.00')
+        if last_reset:
+            entries = entries.filter(id__gt=last_reset.id)
+
+        totals = entries.aggregate(
+            accrued=Sum('hours', filter=Q(kind__in=['accrual', 'adjustment'])),
+            used=Sum('hours', filter=Q(kind='usage')),
+            reversed=Sum('hours', filter=Q(kind='reversal')),
+        )
+        allocated += totals['accrued'] or Decimal('0.00')
+        used = (totals['used'] or Decimal('0.00')) - (totals['reversed'] or Decimal('0.00'))
+        return allocated, used
+
+
 class PasswordResetToken(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     token = models.CharField(max_length=64, unique=True)
@@ -362,3 +830,80 @@ class BiometricCredential(models.Model):
 
     def __str__(self):
         return f"Biometric credential for {self.user.username}"
+
+
+class ReportJob(models.Model):
+    """
+    A report rendered in the background by the run_report_jobs command.
+
+    Jobs are submitted and run through timeclock.reports; the finished file
+    lives under reports.REPORT_JOB_DIR as result_path.
+    """
+    KIND_CHOICES = [
+        ('payroll_pdf', 'Payroll PDF'),
+        ('time_entries_csv', 'Time Entries CSV'),
+    ]
+
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
+
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    params = models.JSONField(default=dict)
+    params_key = models.CharField(max_length=64)  # Hash of kind and params, for reusing results
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='queued')
+    progress = models.PositiveSmallIntegerField(default=0)  # Percent complete
+    error = models.TextField(blank=True)
+    result_path = models.CharField(max_length=255, blank=True)
+    created_by = models.ForeignKey(User, null=True, blank=True, on_delete=models.SET_NULL)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.get_kind_display()} job {self.pk} ({self.get_status_display()})"
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['params_key', 'created_at']),
+            models.Index(fields=['status', 'created_at']),
+        ]
+
+
+class ChangeLogEntry(models.Model):
+    """
+    One row per change to a synced object, for the api/sync/ endpoint.
+
+    The id is the sync token: clients ask for rows after the last id they
+    saw. Rows are written by timeclock.changes after the change commits and
+    pruned by the prune_change_log command.
+    """
+    MODEL_CHOICES = [
+        ('time_entry', 'Time Entry'),
+        ('time_off_request', 'Time Off Request'),
+        ('employee', 'Employee'),
+    ]
+
+    ACTION_CHOICES = [
+        ('upsert', 'Created or Updated'),
+        ('delete', 'Deleted'),
+    ]
+
+    id = models.BigAutoField(primary_key=True)
+    model = models.CharField(max_length=20, choices=MODEL_CHOICES)
+    object_id = models.BigIntegerField()
+    employee_pk = models.BigIntegerField(null=True)  # Owner, for employee-scoped syncs; not a key so deletes are kept
+    action = models.CharField(max_length=10, choices=ACTION_CHOICES, default='upsert')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.get_action_display()} {self.get_model_display()} {self.object_id} (#{self.pk})"
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['employee_pk', 'id']),
+            models.Index(fields=['created_at']),
+        ]
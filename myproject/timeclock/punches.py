@@ -0,0 +1,296 @@
+"""Clock-in and clock-out for the kiosk and the employee API.
+
+A punch is one write to the time entry plus a conditional UPDATE of
+Employee.open_entry. The condition on open_entry stands in for a row lock on
+the employee: if a concurrent punch got there first the UPDATE matches no
+row, the punch is rolled back and the current state is returned instead.
+
+Clients may send a punch_id with each punch so retries are safe; see
+idempotent_punch.
+"""
+import re
+from collections import namedtuple, defaultdict
+from decimal import Decimal
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Exists, F, Q
+from django.utils import timezone
+from .models import Employee, TimeEntry, DailyTotal, new_data_version
+from . import roster, changes
+
+PunchResult = namedtuple('PunchResult', ['clocked_in', 'entry', 'changed'])
+BatchPunch = namedtuple('BatchPunch', ['punch_id', 'employee_id', 'action', 'when'])
+
+BATCH_ACTIONS = ('clock_in', 'clock_out', 'toggle')
+
+# How long a punch_id is remembered. Clients retry within seconds; this only
+# needs to outlast a slow network, not a shift.
+PUNCH_ID_TTL = 10 * 60
+PUNCH_ID_RE = re.compile(r'^[A-Za-z0-9_-]{8,64}$')
+_IN_PROGRESS = 'in-progress'
+
+
+class _LostRace(Exception):
+    pass
+
+
+class InvalidPunchId(ValueError):
+    pass
+
+
+class PunchInProgress(Exception):
+    """Another request with the same punch_id has not finished yet."""
+
+
+def _current_state(employee):
+    employee.refresh_from_db(fields=['open_entry'])
+    return PunchResult(employee.clocked_in, None, False)
+
+
+def clock_in(employee, when=None):
+    """Open a new time entry for the employee unless one is already open."""
+    if employee.clocked_in:
+        return PunchResult(True, None, False)
+
+    entry = TimeEntry(employee=employee, clock_in_time=when or timezone.now())
+    try:
+        with transaction.atomic():
+            # An open entry has no hours, leave usage or totals to record, so
+            # skip TimeEntry.save and issue the INSERT directly.
+            super(TimeEntry, entry).save(force_insert=True)
+            claimed = Employee.objects.filter(
+                pk=employee.pk, open_entry__isnull=True
+            ).update(open_entry=entry, data_version=new_data_version())
+            if not claimed:
+                raise _LostRace
+    except _LostRace:
+        return _current_state(employee)
+
+    employee.open_entry = entry
+    return PunchResult(True, entry, True)
+
+
+def clock_out(employee, when=None):
+    """Close the employee's open time entry.
+
+    Load the employee with select_related('open_entry') so no extra query is
+    needed to find the entry being closed.
+    """
+    entry = employee.open_entry
+    if entry is None:
+        return PunchResult(False, None, False)
+
+    entry.employee = employee
+    entry.clock_out_time = when or timezone.now()
+
+    if entry.is_vacation or entry.is_sick:
+        # Leave entries also post to the leave ledger
+        entry.save()
+        return PunchResult(False, entry, True)
+
+    duration = (entry.clock_out_time - entry.clock_in_time).total_seconds() / 3600.0
+    entry.hours_worked = Decimal(round(duration, 2))
+    local_date = entry._daily_contribution()[0]
+    try:
+        with transaction.atomic():
+            entry._apply_rollup_deltas(None, entry._daily_contribution())
+            closed = TimeEntry.objects.filter(pk=entry.pk, clock_out_time__isnull=True).update(
+                clock_out_time=entry.clock_out_time,
+                hours_worked=entry.hours_worked,
+                full_day=Exists(DailyTotal.objects.filter(
+                    employee_id=employee.pk,
+                    local_date=local_date,
+                    worked_seconds__gte=F('sick_seconds') + 8 * 3600,
+                )),
+            )
+            if not closed:
+                raise _LostRace
+            Employee.objects.filter(pk=employee.pk, open_entry=entry).update(
+                open_entry=None, data_version=new_data_version()
+            )
+    except _LostRace:
+        # The entry was already closed; make sure the pointer does not still reference it
+        Employee.objects.filter(pk=employee.pk, open_entry=entry).update(
+            open_entry=None, data_version=new_data_version()
+        )
+        transaction.on_commit(roster.invalidate)
+        return _current_state(employee)
+
+    # Nothing above sends post_save, so tell the roster and the change log directly
+    transaction.on_commit(roster.invalidate)
+    changes.record_many([
+        ('time_entry', entry.pk, employee.pk, 'upsert'),
+        ('employee', employee.pk, employee.pk, 'upsert'),
+    ])
+
+    employee.open_entry = None
+    return PunchResult(False, entry, True)
+
+
+def _punch_key(scope, punch_id):
+    return f'punch:{scope}:{punch_id}'
+
+
+def idempotent_punch(scope, punch_id, handler):
+    """Run handler() at most once per punch_id and replay its response.
+
+    handler returns a (data, status) pair for the view to render. The pair is
+    kept in the cache for PUNCH_ID_TTL, so a retried request gets the original
+    response back without any database access. scope keeps different
+    employees' punch ids apart. Requests without a punch_id run unguarded.
+
+    The dedup store is the default cache, so it only spans worker processes
+    when that cache is a shared backend.
+    """
+    if not punch_id:
+        return handler()
+    if not PUNCH_ID_RE.match(punch_id):
+        raise InvalidPunchId(punch_id)
+
+    key = _punch_key(scope, punch_id)
+    if not cache.add(key, _IN_PROGRESS, PUNCH_ID_TTL):
+        stored = cache.get(key)
+        if stored is None or stored == _IN_PROGRESS:
+            raise PunchInProgress(punch_id)
+        return stored
+
+    try:
+        response = handler()
+    except Exception:
+        cache.delete(key)
+        raise
+    cache.set(key, response, PUNCH_ID_TTL)
+    return response
+
+
+def apply_batch(batch, scope='kiosk'):
+    """Apply punches recorded while a kiosk was offline.
+
+    batch is a list of BatchPunch. Punches are applied in one transaction,
+    in time order per employee, with 'toggle' resolved against the state
+    left by the punches before it. A punch that would overlap an existing
+    entry, or close an entry before it started, is reported as a conflict
+    and skipped. Punch ids share the idempotent_punch store under
+    '<scope>:<employee_id>', so a punch that already reached clock-action/
+    before the connection dropped is reported as a duplicate.
+
+    Returns one dict per punch, in input order, with punch_id, employee_id,
+    action, status ('applied', 'duplicate', 'conflict', 'rejected' or
+    'in_progress') and message.
+    """
+    results = [None] * len(batch)
+    claimed = {}
+    for i, punch in enumerate(batch):
+        key = _punch_key(f'{scope}:{punch.employee_id}', punch.punch_id)
+        if key in claimed:
+            results[i] = _batch_result(punch, punch.action, 'duplicate', 'Punch already in this batch.')
+        elif cache.add(key, _IN_PROGRESS, PUNCH_ID_TTL):
+            claimed[key] = i
+        elif cache.get(key) in (None, _IN_PROGRESS):
+            results[i] = _batch_result(punch, punch.action, 'in_progress', 'Punch in progress.')
+        else:
+            results[i] = _batch_result(punch, punch.action, 'duplicate', 'Punch already recorded.')
+
+    try:
+        with transaction.atomic():
+            _apply_claimed(batch, sorted(claimed.values()), results)
+    except Exception:
+        cache.delete_many(list(claimed))
+        raise
+
+    # Remember the outcome in the same (data, status) form idempotent_punch
+    # replays, so a later retry through clock-action/ is answered too
+    cache.set_many({
+        key: (
+            {'status': 'success' if results[i]['status'] == 'applied' else 'error',
+             'message': results[i]['message']},
+            200 if results[i]['status'] == 'applied' else 409,
+        )
+        for key, i in claimed.items()
+    }, PUNCH_ID_TTL)
+    return results
+
+
+def _batch_result(punch, action, status, message, entry=None):
+    return {
+        'punch_id': punch.punch_id,
+        'employee_id': punch.employee_id,
+        'action': action,
+        'status': status,
+        'message': message,
+        'entry_id': entry.pk if entry is not None else None,
+    }
+
+
+def _apply_claimed(batch, indexes, results):
+    by_employee = defaultdict(list)
+    for i in indexes:
+        by_employee[batch[i].employee_id].append(i)
+    if not by_employee:
+        return
+
+    employees = Employee.objects.select_related('open_entry').in_bulk(
+        list(by_employee), field_name='employee_id'
+    )
+
+    # Existing entries that could collide with the batch, fetched once. A
+    # clock-out is checked back to the start of the entry it closes.
+    earliest = min(
+        [batch[i].when for i in indexes]
+        + [e.open_entry.clock_in_time for e in employees.values() if e.open_entry is not None]
+    )
+    latest = max(batch[i].when for i in indexes)
+    spans = defaultdict(list)
+    existing = TimeEntry.objects.filter(
+        employee__in=employees.values(), clock_in_time__lte=latest
+    ).filter(
+        Q(clock_out_time__gte=earliest) | Q(clock_out_time__isnull=True)
+    ).values_list('employee_id', 'clock_in_time', 'clock_out_time')
+    for employee_pk, start, end in existing:
+        spans[employee_pk].append((start, end))
+
+    for employee_id, punch_indexes in by_employee.items():
+        employee = employees.get(employee_id)
+        punch_indexes.sort(key=lambda i: batch[i].when)
+        for i in punch_indexes:
+            punch = batch[i]
+            if employee is None:
+                results[i] = _batch_result(punch, punch.action, 'rejected', 'Employee not found.')
+                continue
+            results[i] = _apply_one(employee, punch, spans[employee.pk])
+
+
+def _apply_one(employee, punch, spans):
+    action = punch.action
+    if action == 'toggle':
+        action = 'clock_out' if employee.clocked_in else 'clock_in'
+    when = punch.when
+    open_entry = employee.open_entry
+
+    if action == 'clock_in':
+        if open_entry is not None:
+            return _batch_result(punch, action, 'conflict', 'Already clocked in.')
+        if any(start <= when and end is not None and when < end for start, end in spans):
+            return _batch_result(punch, action, 'conflict', 'Overlaps an existing time entry.')
+        result = clock_in(employee, when=when)
+    else:
+        if open_entry is None:
+            return _batch_result(punch, action, 'conflict', 'Not clocked in.')
+        if when <= open_entry.clock_in_time:
+            return _batch_result(punch, action, 'conflict', 'Clock-out is before the open entry started.')
+        if any(open_entry.clock_in_time < start <= when for start, end in spans):
+            return _batch_result(punch, action, 'conflict', 'Overlaps an existing time entry.')
+        result = clock_out(employee, when=when)
+
+    if not result.changed:
+        return _batch_result(punch, action, 'conflict', 'Clocked in elsewhere.' if result.clocked_in else 'Clocked out elsewhere.')
+
+    if action == 'clock_in':
+        spans.append((when, None))
+        message = 'Clocked in.'
+    else:
+        # Replace the open span with the closed one
+        spans[:] = [span for span in spans if span[0] != open_entry.clock_in_time]
+        spans.append((open_entry.clock_in_time, when))
+        message = 'Clocked out.'
+    return _batch_result(punch, action, 'applied', message, result.entry)
@@ -0,0 +1,392 @@
+"""Report renderers and the background report job runner.
+
+The renderers write to a binary file object and are shared by the request
+views (which render small reports inline) and by ReportJob, which renders
+in the run_report_jobs worker so large date ranges never tie up a web
+worker. Finished job files are kept under REPORT_JOB_DIR, named by a hash
+of the report parameters, and reused while fresh.
+"""
+import csv
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from datetime import datetime, timedelta
+from itertools import chain, groupby
+from operator import itemgetter
+from django.conf import settings
+from django.db.models import Sum, Q, OuterRef, Subquery
+from django.utils import timezone
+from reportlab.lib.pagesizes import letter
+from reportlab.lib import colors
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, KeepTogether
+from reportlab.lib.units import inch
+from .models import TimeEntry, Note, DailyTotal, ReportJob
+from .utils import keyset_chunks
+
+logger = logging.getLogger(__name__)
+
+REPORT_JOB_DIR = getattr(settings, 'REPORT_JOB_DIR', os.path.join(settings.BASE_DIR, 'report_jobs'))
+# A finished report is handed out again for the same parameters for this long
+RESULT_TTL = timedelta(minutes=15)
+# A job still 'running' after this long is assumed to belong to a dead worker
+STALE_AFTER = timedelta(hours=1)
+# Job rows and files older than this are removed by the worker
+PURGE_AFTER = timedelta(days=7)
+CSV_CHUNK_SIZE = 2000
+
+
+def convert_minutes_to_hours_and_minutes(total_minutes):
+    """Convert total minutes to 'HHH MM' string."""
+    hours = total_minutes // 60
+    minutes = total_minutes % 60
+    return f"{int(hours)}H {int(minutes)}M"
+
+
+def _payroll_entries(start_date, end_date):
+    """Return the period's entries as (employee_pk, first_name, last_name, rows) per employee.
+
+    One ordered query for the entries and one for their notes; the entries
+    arrive sorted by employee, so grouping is a single pass. The period is
+    an index-friendly range on clock_in_time from local midnight on
+    start_date to local midnight after end_date.
+    """
+    start = timezone.make_aware(datetime.combine(start_date, datetime.min.time()))
+    end = timezone.make_aware(datetime.combine(end_date + timedelta(days=1), datetime.min.time()))
+
+    notes = {}
+    note_rows = Note.objects.filter(
+        time_entry__clock_in_time__gte=start, time_entry__clock_in_time__lt=end
+    ).order_by('pk').values_list('time_entry_id', 'note_text')
+    for entry_id, note_text in note_rows:
+        notes.setdefault(entry_id, []).append(note_text)
+
+    entries = TimeEntry.objects.filter(clock_in_time__gte=start, clock_in_time__lt=end).order_by(
+        'employee__last_name', 'employee__first_name', 'employee_id', 'clock_in_time', 'id'
+    ).values_list(
+        'employee_id', 'employee__first_name', 'employee__last_name',
+        'id', 'clock_in_time', 'clock_out_time', 'hours_worked',
+    )
+
+    grouped = []
+    for (employee_pk, first_name, last_name), rows in groupby(entries, key=itemgetter(0, 1, 2)):
+        grouped.append((employee_pk, first_name, last_name, [
+            (clock_in_time, clock_out_time, hours_worked, notes.get(entry_id, ()))
+            for _, _, _, entry_id, clock_in_time, clock_out_time, hours_worked in rows
+        ]))
+    return grouped
+
+
+def _employee_table(rows, total_seconds, note_style):
+    # Define fixed column widths (Removed the 'Full Day' column)
+    column_widths = [1.1 * inch, 0.8 * inch, 0.8 * inch, 1.1 * inch, 2.5 * inch]  # Adjust as needed
+
+    # Table data (removed "Full Day" column)
+    data = [['Date', 'Time In', 'Time Out', 'Hours Worked', 'Notes']]
+    for clock_in_time, clock_out_time, hours_worked, notes in rows:
+        clock_in_time = timezone.localtime(clock_in_time)
+        data.append([
+            clock_in_time.strftime('%a %m/%d'),
+            clock_in_time.strftime('%I:%M %p'),
+            timezone.localtime(clock_out_time).strftime('%I:%M %p') if clock_out_time else '',
+            # hours_worked is a Decimal, so the minutes are exact
+            convert_minutes_to_hours_and_minutes(hours_worked * 60),
+            # Only notes need wrapping; an empty cell renders the same without a Paragraph
+            Paragraph(" | ".join(notes), note_style) if notes else '',
+        ])
+
+    # Add a blank row
+    data.append(['', '', '', '', ''])
+    # Convert total_seconds to hours and minutes
+    data.append(['Total Hours:', '', '', convert_minutes_to_hours_and_minutes(total_seconds / 60), ''])  # Adjust for 4 merged cells and total hours
+
+    # Create the table with fixed column widths
+    table = Table(data, colWidths=column_widths)
+
+    # Update table styles
+    table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+        ('BACKGROUND', (0, len(data) - 2), (-1, len(data) - 2), colors.white),  # Blank row background
+        ('BACKGROUND', (0, len(data) - 1), (-1, len(data) - 1), colors.beige),  # Total hours row background
+        ('ALIGN', (0, len(data) - 1), (0, len(data) - 1), 'RIGHT'),  # Align "Total Hours:" text to the right
+        ('SPAN', (0, len(data) - 1), (2, len(data) - 1)),  # Merge the first 3 cells for "Total Hours:"
+        ('GRID', (0, 0), (-1, -1), 1, colors.black),  # Grid for all cells
+        ('GRID', (0, len(data) - 1), (-1, len(data) - 1), 1, colors.black),
+        ('LINEABOVE', (0, len(data) - 1), (-1, len(data) - 1), 1, colors.black),
+        ('VALIGN', (0, 0), (-1, -1), 'TOP'),  # Ensure vertical alignment is at the top
+    ]))
+    return table
+
+
+def payroll_pdf(output, start_date, end_date, progress=None):
+    """Render the payroll PDF for start_date..end_date (local dates) into output."""
+    employees = _payroll_entries(start_date, end_date)
+
+    # Per-employee totals come from the daily totals maintained on every entry write
+    employee_totals = dict(
+        DailyTotal.objects.filter(local_date__range=[start_date, end_date])
+        .values('employee_id')
+        .annotate(total_seconds=Sum('worked_seconds'))
+        .values_list('employee_id', 'total_seconds')
+    )
+
+    # Create a PDF document with reduced margins
+    doc = SimpleDocTemplate(
+        output, 
+        pagesize=letter, 
+        topMargin=20,
+        bottomMargin=0
+    )
+
+    doc.title = "Payroll Report"
+
+    # Create styles for the PDF
+    styles = getSampleStyleSheet()
+    styleH = styles['Heading1']
+    styleH.alignment = 1  # Center align the heading
+
+    # Create a custom style for notes that supports word wrapping
+    note_style = ParagraphStyle(name='NoteStyle', wordWrap='CJK', fontSize=10)
+
+    # Build the content for the PDF, one section per employee
+    content = []
+    for index, (employee_pk, first_name, last_name, rows) in enumerate(employees):
+        content.append(KeepTogether([
+            Paragraph(f'Employee: {first_name} {last_name}', styleH),
+            _employee_table(rows, employee_totals.get(employee_pk, 0), note_style),
+            Spacer(1, 10),
+        ]))
+        if progress:
+            progress((index + 1) / len(employees) * 0.5)
+
+    # Layout is most of the work and is reported as one step
+    doc.build(content)
+    if progress:
+        progress(1.0)
+
+
+def filter_time_entries(queryset, employee_id=None, start_date=None, end_date=None):
+    """Apply the admin time entry filters; raises ValueError for malformed dates."""
+    if employee_id:
+        queryset = queryset.filter(employee__employee_id=employee_id)
+
+    if start_date and end_date:
+        # Convert to server's timezone
+        start_datetime = timezone.make_aware(datetime.strptime(start_date, '%Y-%m-%d').replace(hour=0, minute=0, second=0))
+        end_datetime = timezone.make_aware(datetime.strptime(end_date, '%Y-%m-%d').replace(hour=23, minute=59, second=59))
+
+        queryset = queryset.filter(
+            Q(clock_in_time__range=(start_datetime, end_datetime)) |
+            Q(clock_out_time__range=(start_datetime, end_datetime))
+        )
+    return queryset
+
+
+class _Echo:
+    """File-like object whose write() hands the CSV line straight back."""
+
+    def write(self, value):
+        return value
+
+
+def time_entry_csv_lines(queryset):
+    """Yield the time entry CSV report line by line for a TimeEntry queryset.
+
+    Reads plain rows CSV_CHUNK_SIZE at a time, one keyset query per chunk;
+    each entry's first note comes from a correlated subquery in the same
+    query.
+    """
+    first_note = Note.objects.filter(time_entry=OuterRef('pk')).order_by('pk').values('note_text')[:1]
+    rows = queryset.prefetch_related(None).order_by('-clock_in_time', '-id').annotate(
+        first_note=Subquery(first_note)
+    )
+    fields = (
+        'employee__employee_id',
+        'employee__first_name',
+        'employee__last_name',
+        'clock_in_time',
+        'clock_out_time',
+        'entry_type',
+        'first_note',
+    )
+
+    writer = csv.writer(_Echo())
+    entry_types = dict(TimeEntry.ENTRY_TYPE_CHOICES)
+
+    yield writer.writerow([
+        'Employee ID',
+        'Employee Name',
+        'Clock In Time',
+        'Clock Out Time',
+        'Total Hours',
+        'Entry Type',
+        'Notes'
+    ])
+    for employee_id, first_name, last_name, clock_in_time, clock_out_time, entry_type, first_note in chain.from_iterable(
+        keyset_chunks(rows, fields, CSV_CHUNK_SIZE)
+    ):
+        total_hours = 0
+        if clock_out_time:
+            time_diff = clock_out_time - clock_in_time
+            total_hours = round(time_diff.total_seconds() / 3600, 2)
+
+        yield writer.writerow([
+            employee_id,
+            f"{first_name} {last_name}",
+            clock_in_time.strftime('%Y-%m-%d %H:%M:%S'),
+            clock_out_time.strftime('%Y-%m-%d %H:%M:%S') if clock_out_time else 'Not Clocked Out',
+            total_hours,
+            entry_types.get(entry_type, entry_type),
+            first_note or ''
+        ])
+
+
+def time_entries_csv(output, employee_id=None, start_date=None, end_date=None, progress=None):
+    """Write the time entry CSV report into output."""
+    queryset = filter_time_entries(TimeEntry.objects.all(), employee_id, start_date, end_date)
+    total = queryset.count() if progress else 0
+    for written, line in enumerate(time_entry_csv_lines(queryset)):
+        output.write(line.encode('utf-8'))
+        if progress and total and written % CSV_CHUNK_SIZE == 0:
+            progress(written / total)
+    if progress:
+        progress(1.0)
+
+
+def _payroll_pdf_job(output, params, progress):
+    payroll_pdf(
+        output,
+        datetime.strptime(params['start_date'], '%Y-%m-%d').date(),
+        datetime.strptime(params['end_date'], '%Y-%m-%d').date(),
+        progress=progress,
+    )
+
+
+def _time_entries_csv_job(output, params, progress):
+    time_entries_csv(
+        output,
+        employee_id=params.get('employee_id'),
+        start_date=params.get('start_date'),
+        end_date=params.get('end_date'),
+        progress=progress,
+    )
+
+
+# ReportJob.kind -> (renderer, file extension, content type)
+RENDERERS = {
+    'payroll_pdf': (_payroll_pdf_job, '.pdf', 'application/pdf'),
+    'time_entries_csv': (_time_entries_csv_job, '.csv', 'text/csv'),
+}
+
+
+def params_key(kind, params):
+    payload = json.dumps({'kind': kind, 'params': params}, sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def submit(kind, params, user=None):
+    """Queue a report job, or return an existing one for the same parameters.
+
+    A queued job, a running job that is not stale, or a finished job whose
+    file is still on disk and younger than RESULT_TTL is reused as is.
+    """
+    if kind not in RENDERERS:
+        raise ValueError(f'Unknown report kind {kind!r}')
+    key = params_key(kind, params)
+
+    now = timezone.now()
+    recent = ReportJob.objects.filter(params_key=key).exclude(status='failed').order_by('-created_at').first()
+    if recent is not None:
+        if recent.status == 'queued':
+            return recent
+        if recent.status == 'running' and recent.started_at and now - recent.started_at < STALE_AFTER:
+            return recent
+        if (recent.status == 'done' and now - recent.finished_at < RESULT_TTL
+                and os.path.exists(result_file(recent))):
+            return recent
+
+    return ReportJob.objects.create(kind=kind, params=params, params_key=key, created_by=user)
+
+
+def result_file(job):
+    return os.path.join(REPORT_JOB_DIR, job.result_path)
+
+
+def content_type(job):
+    return RENDERERS[job.kind][2]
+
+
+def claim_next():
+    """Claim the oldest queued job for this worker, or return None."""
+    for pk in ReportJob.objects.filter(status='queued').order_by('created_at').values_list('pk', flat=True)[:10]:
+        # Conditional update instead of a row lock; another worker may win
+        claimed = ReportJob.objects.filter(pk=pk, status='queued').update(
+            status='running', started_at=timezone.now(), progress=0
+        )
+        if claimed:
+            return ReportJob.objects.get(pk=pk)
+    return None
+
+
+def run_job(job):
+    """Render a claimed job to disk and record the outcome on the job."""
+    renderer, extension, _ = RENDERERS[job.kind]
+    os.makedirs(REPORT_JOB_DIR, exist_ok=True)
+
+    last_percent = [0]
+
+    def progress(fraction):
+        percent = min(int(fraction * 100), 99)
+        if percent > last_percent[0]:
+            last_percent[0] = percent
+            ReportJob.objects.filter(pk=job.pk).update(progress=percent)
+
+    filename = job.params_key + extension
+    temp_path = None
+    try:
+        # Render to a temporary name and move it into place, so a reader
+        # never sees a half-written file
+        with tempfile.NamedTemporaryFile(dir=REPORT_JOB_DIR, suffix=extension, delete=False) as output:
+            temp_path = output.name
+            renderer(output, job.params, progress)
+        os.replace(temp_path, os.path.join(REPORT_JOB_DIR, filename))
+    except Exception as e:
+        logger.exception('Report job %s failed', job.pk)
+        if temp_path and os.path.exists(temp_path):
+            os.remove(temp_path)
+        ReportJob.objects.filter(pk=job.pk).update(status='failed', error=str(e), finished_at=timezone.now())
+        return False
+
+    ReportJob.objects.filter(pk=job.pk).update(
+        status='done', progress=100, result_path=filename, finished_at=timezone.now()
+    )
+    return True
+
+
+def fail_stale():
+    """Mark jobs left 'running' by a worker that died as failed."""
+    return ReportJob.objects.filter(
+        status='running', started_at__lt=timezone.now() - STALE_AFTER
+    ).update(status='failed', error='Worker stopped before the report finished', finished_at=timezone.now())
+
+
+def purge_expired():
+    """Delete job rows older than PURGE_AFTER and files no recent job refers to."""
+    cutoff = timezone.now() - PURGE_AFTER
+    fail_stale()
+    ReportJob.objects.filter(created_at__lt=cutoff).exclude(status__in=['queued', 'running']).delete()
+
+    if not os.path.isdir(REPORT_JOB_DIR):
+        return
+    in_use = set(ReportJob.objects.exclude(result_path='').values_list('result_path', flat=True))
+    for name in os.listdir(REPORT_JOB_DIR):
+        path = os.path.join(REPORT_JOB_DIR, name)
+        if name not in in_use and os.path.getmtime(path) < cutoff.timestamp():
+            os.remove(path)
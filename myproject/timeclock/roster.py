@@ -0,0 +1,129 @@
+"""Process-local employee roster for kiosk status lookups.
+
+The kiosk looks an employee up on every keypress. Rather than query for the
+employee and today's entries each time, every process keeps the whole
+roster (badge number, name, clocked-in state and today's punches) in memory
+and reloads it in two queries when it goes stale.
+
+The roster is stale when:
+- an Employee or TimeEntry is saved or deleted (post_save/post_delete,
+  connected in TimeclockConfig.ready), or code that writes with
+  queryset.update() calls invalidate();
+- the shared version key in the default cache has changed, meaning another
+  process invalidated;
+- the local date has rolled over;
+- snapshot() is passed a change log id newer than the one the roster was
+  loaded at; or
+- it is older than MAX_AGE, as a backstop for writes nobody announced.
+
+Cross-process invalidation through the version key needs a shared cache
+backend; with the local memory cache other workers fall back on MAX_AGE.
+The live board does not wait for that: it polls the newest ChangeLogEntry
+id, which every process writes to, and passes it to snapshot().
+"""
+import threading
+import time
+import uuid
+from collections import namedtuple
+from datetime import datetime, timedelta
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.utils import timezone
+from .models import Employee, TimeEntry
+
+RosterEntry = namedtuple('RosterEntry', ['pk', 'employee_id', 'full_name', 'clocked_in', 'time_entries'])
+
+MAX_AGE = 60  # seconds
+VERSION_KEY = 'timeclock:roster:version'
+
+_lock = threading.Lock()
+_roster = None
+_version = None
+_day = None
+_loaded_at = 0.0
+_change_id = None
+
+
+def lookup(employee_id):
+    """Return the RosterEntry for a badge number, or None if there is no such employee."""
+    return _current().get(employee_id)
+
+
+def snapshot(change_id=None):
+    """Return the whole roster as a dict of badge number to RosterEntry.
+
+    The same dict is returned until the roster is reloaded, so callers can
+    tell whether anything changed with an identity check. change_id is the
+    newest ChangeLogEntry id; when given, a roster loaded before that change
+    was logged is reloaded.
+    """
+    return _current(change_id)
+
+
+def invalidate():
+    """Drop the roster in this process and, through the cache, in every other one."""
+    global _roster
+    with _lock:
+        _roster = None
+    cache.set(VERSION_KEY, uuid.uuid4().hex, None)
+
+
+def _invalidate_on_commit(sender, **kwargs):
+    # Reloading before the write commits would cache the old state
+    transaction.on_commit(invalidate)
+
+
+def connect_signals():
+    for model in (Employee, TimeEntry):
+        post_save.connect(_invalidate_on_commit, sender=model, dispatch_uid=f'roster_save_{model.__name__}')
+        post_delete.connect(_invalidate_on_commit, sender=model, dispatch_uid=f'roster_delete_{model.__name__}')
+
+
+def _current(change_id=None):
+    global _roster, _version, _day, _loaded_at, _change_id
+    version = cache.get(VERSION_KEY)
+    today = timezone.localdate()
+    with _lock:
+        if (_roster is not None and _version == version and _day == today
+                and time.monotonic() - _loaded_at < MAX_AGE
+                and (change_id is None or change_id == _change_id)):
+            return _roster
+
+    # The version is read before loading, so a change that lands while the
+    # roster is loading is picked up on the next lookup
+    roster = _load(today)
+    with _lock:
+        _roster, _version, _day, _loaded_at = roster, version, today, time.monotonic()
+        if change_id is not None:
+            _change_id = change_id
+    return roster
+
+
+def _load(day):
+    start = timezone.make_aware(datetime.combine(day, datetime.min.time()))
+    end = timezone.make_aware(datetime.combine(day + timedelta(days=1), datetime.min.time()))
+
+    # A range on clock_in_time can use the index; clock_in_time__date cannot
+    entries_by_employee = {}
+    entries = TimeEntry.objects.filter(
+        clock_in_time__gte=start, clock_in_time__lt=end
+    ).order_by('clock_in_time').values_list('id', 'employee_id', 'clock_in_time', 'clock_out_time')
+    for entry_id, employee_pk, clock_in_time, clock_out_time in entries:
+        entries_by_employee.setdefault(employee_pk, []).append({
+            'id': entry_id,
+            'clock_in_time': timezone.localtime(clock_in_time).strftime('%I:%M %p'),
+            'clock_out_time': timezone.localtime(clock_out_time).strftime('%I:%M %p') if clock_out_time else 'Clocked In',
+        })
+
+    roster = {}
+    employees = Employee.objects.values_list('pk', 'employee_id', 'first_name', 'last_name', 'open_entry_id')
+    for pk, employee_id, first_name, last_name, open_entry_id in employees:
+        roster[employee_id] = RosterEntry(
+            pk=pk,
+            employee_id=employee_id,
+            full_name=f"{first_name} {last_name}",
+            clocked_in=open_entry_id is not None,
+            time_entries=tuple(entries_by_employee.get(pk, ())),
+        )
+    return roster
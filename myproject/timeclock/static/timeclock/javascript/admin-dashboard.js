@@ -12,7 +12,66 @@ function handleReportButtonClick() {
             }
         });
     } else {
-        var url = pdfLink + "?start_date=" + startDate + "&end_date=" + endDate;
-        window.open(url, '_blank');
+        // Open the window now, while the click still counts as a user
+        // gesture, and point it at the report once the worker has built it
+        var reportWindow = window.open('', '_blank');
+        var button = document.getElementById('print-report');
+        var body = new FormData();
+        body.append('kind', 'payroll_pdf');
+        body.append('start_date', document.getElementById('start_date').value);
+        body.append('end_date', document.getElementById('end_date').value);
+
+        button.disabled = true;
+        fetch(reportJobsUrl, {
+            method: 'POST',
+            headers: {'X-CSRFToken': document.querySelector('[name=csrfmiddlewaretoken]').value},
+            body: body
+        })
+        .then(function(response) { return response.json(); })
+        .then(function(job) {
+            var inlineUrl = pdfLink + "?start_date=" + startDate + "&end_date=" + endDate;
+            pollReportJob(job, reportWindow, button, inlineUrl, Date.now());
+        })
+        .catch(function() { reportJobFailed(reportWindow, button, 'Could not start the report.'); });
     }
 }
+
+// If no run_report_jobs worker has claimed the job by then, build the
+// report in the request instead
+var REPORT_CLAIM_TIMEOUT = 5000;
+// Give up on a job a worker claimed but has not finished
+var REPORT_JOB_TIMEOUT = 5 * 60 * 1000;
+
+function pollReportJob(job, reportWindow, button, inlineUrl, submittedAt) {
+    var waited = Date.now() - submittedAt;
+    if (job.status === 'done') {
+        button.disabled = false;
+        button.textContent = 'Print Report';
+        reportWindow.location = job.download_url;
+    } else if (job.status === 'failed' || !job.status_url) {
+        reportJobFailed(reportWindow, button, job.error || job.message || 'The report could not be generated.');
+    } else if (job.status === 'queued' && waited > REPORT_CLAIM_TIMEOUT) {
+        button.disabled = false;
+        button.textContent = 'Print Report';
+        reportWindow.location = inlineUrl;
+    } else if (waited > REPORT_JOB_TIMEOUT) {
+        reportJobFailed(reportWindow, button, 'The report is taking too long. Try again later.');
+    } else {
+        button.textContent = 'Generating report... ' + job.progress + '%';
+        setTimeout(function() {
+            fetch(job.status_url)
+                .then(function(response) { return response.json(); })
+                .then(function(next) { pollReportJob(next, reportWindow, button, inlineUrl, submittedAt); })
+                .catch(function() { reportJobFailed(reportWindow, button, 'Lost track of the report.'); });
+        }, 1000);
+    }
+}
+
+function reportJobFailed(reportWindow, button, message) {
+    button.disabled = false;
+    button.textContent = 'Print Report';
+    if (reportWindow) {
+        reportWindow.close();
+    }
+    alert(message);
+}
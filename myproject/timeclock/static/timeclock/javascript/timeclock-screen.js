@@ -12,9 +12,17 @@ $(document).ready(function() {
 
     // Set an interval to refresh the page every 15 minutes (900000 milliseconds)
     setInterval(function() {
-        location.reload();  // Refresh the page every 15 minutes
+        // Reloading while offline would leave the kiosk on a browser error page
+        if (navigator.onLine && loadPunchBuffer().length === 0) {
+            location.reload();  // Refresh the page every 15 minutes
+        }
     }, 900000);  // 15-minute delay
 
+    // Send punches buffered while offline as soon as the network is back
+    flushPunchBuffer();
+    setInterval(flushPunchBuffer, 30000);
+    $(window).on('online', flushPunchBuffer);
+
     // Set a timer to clear the input after 10 seconds of inactivity
     function startClearInputTimer() {
         clearInputTimer = setTimeout(function() {
@@ -211,45 +219,176 @@ $(document).ready(function() {
             $('#employee_id').prop('disabled', true);
             $('#clock_button').prop('disabled', true);
 
-            $.ajax({
-                url: clockActionUrl,
-                type: 'POST',
-                data: {
-                    'employee_id': employeeId,
-                    'csrfmiddlewaretoken': csrfToken
-                },
-                success: function(data) {
-                    if (data.status === 'success') {
-                        $('#message').text($('<div>').text(data.message).html()).fadeIn();
-                        $('#employee_id').val('');  // Clear input after success
-                        
-                        // Hide clock entries and message after a short delay
-                        setTimeout(function() {
-                            $('#full_name').text('');
-                            $('#time-entries-container').hide();
-                            $('#message').fadeOut();
-                            
-                            // Re-enable input and button after message is gone
-                            $('#employee_id').prop('disabled', false);
-                            $('#clock_button').prop('disabled', false);
-                        }, 2000);
+            // One punch ID per button press; retries reuse it so the server
+            // never toggles the same employee twice
+            const punch = {
+                'punch_id': newPunchId(),
+                'employee_id': employeeId,
+                'action': 'toggle',
+                'timestamp': new Date().toISOString()
+            };
+            if (loadPunchBuffer().length > 0) {
+                // Keep punches in order behind the ones still waiting to be sent
+                bufferPunch(punch);
+            } else {
+                sendPunch(punch, 0);
+            }
+        } else {
+            alert('Please enter a valid 2 or 3-digit employee ID');
+        }
+    }
 
-                        $('#clock_button').text('Clock In / Out');
-                    } else {
-                        alert('Error processing request');
-                        $('#employee_id').prop('disabled', false);  // Re-enable on failure
+    const PUNCH_RETRY_LIMIT = 4;
+
+    function newPunchId() {
+        if (window.crypto && window.crypto.randomUUID) {
+            return window.crypto.randomUUID();
+        }
+        return Date.now().toString(36) + '-' + Math.random().toString(36).slice(2, 12);
+    }
+
+    function sendPunch(punch, attempt) {
+        $.ajax({
+            url: clockActionUrl,
+            type: 'POST',
+            timeout: 8000,
+            data: {
+                'employee_id': punch.employee_id,
+                'punch_id': punch.punch_id,
+                'csrfmiddlewaretoken': csrfToken
+            },
+            success: function(data) {
+                if (data.status === 'success') {
+                    $('#message').text($('<div>').text(data.message).html()).fadeIn();
+                    $('#employee_id').val('');  // Clear input after success
+
+                    // Hide clock entries and message after a short delay
+                    setTimeout(function() {
+                        $('#full_name').text('');
+                        $('#time-entries-container').hide();
+                        $('#message').fadeOut();
+
+                        // Re-enable input and button after message is gone
+                        $('#employee_id').prop('disabled', false);
                         $('#clock_button').prop('disabled', false);
-                    }
-                },
-                error: function(xhr, status, error) {
+                    }, 2000);
+
+                    $('#clock_button').text('Clock In / Out');
+                } else {
                     alert('Error processing request');
-                    $('#employee_id').prop('disabled', false);
+                    $('#employee_id').prop('disabled', false);  // Re-enable on failure
                     $('#clock_button').prop('disabled', false);
                 }
-            });
-        } else {
-            alert('Please enter a valid 2 or 3-digit employee ID');
+            },
+            error: function(xhr, status, error) {
+                // Timeouts, dropped connections, server errors and a punch
+                // still in progress are safe to retry with the same punch ID
+                const retryable = xhr.status === 0 || xhr.status === 409 || xhr.status >= 500;
+                if (retryable && attempt < PUNCH_RETRY_LIMIT) {
+                    $('#message').text('Retrying...').fadeIn();
+                    setTimeout(function() {
+                        sendPunch(punch, attempt + 1);
+                    }, 500 * Math.pow(2, attempt));
+                    return;
+                }
+                if (xhr.status === 0 || xhr.status >= 500) {
+                    // Server unreachable; keep the punch and send it later
+                    bufferPunch(punch);
+                    return;
+                }
+                alert('Error processing request');
+                $('#employee_id').prop('disabled', false);
+                $('#clock_button').prop('disabled', false);
+            }
+        });
+    }
+
+    const PUNCH_BUFFER_KEY = 'timeclockPunchBuffer';
+    // The server rejects punches older than this (MAX_OFFLINE_AGE), so
+    // they are dropped here rather than sent again and again
+    const PUNCH_BUFFER_MAX_AGE = 24 * 60 * 60 * 1000;
+    let flushingPunches = false;
+
+    function loadPunchBuffer() {
+        let buffer;
+        try {
+            buffer = JSON.parse(localStorage.getItem(PUNCH_BUFFER_KEY)) || [];
+        } catch (e) {
+            return [];
+        }
+        const oldest = Date.now() - PUNCH_BUFFER_MAX_AGE;
+        return buffer.filter(function(punch) {
+            if (Date.parse(punch.timestamp) >= oldest) {
+                return true;
+            }
+            console.warn('Dropping buffered punch older than 24 hours', punch);
+            return false;
+        });
+    }
+
+    function savePunchBuffer(buffer) {
+        localStorage.setItem(PUNCH_BUFFER_KEY, JSON.stringify(buffer));
+    }
+
+    function bufferPunch(punch) {
+        const buffer = loadPunchBuffer();
+        buffer.push(punch);
+        savePunchBuffer(buffer);
+
+        $('#message').text('Network unavailable. Your punch was saved and will be sent automatically.').fadeIn();
+        $('#employee_id').val('');
+        setTimeout(function() {
+            $('#full_name').text('');
+            $('#time-entries-container').hide();
+            $('#message').fadeOut();
+            $('#employee_id').prop('disabled', false);
+            $('#clock_button').prop('disabled', false);
+        }, 3000);
+        $('#clock_button').text('Clock In / Out');
+    }
+
+    function flushPunchBuffer() {
+        const buffer = loadPunchBuffer();
+        if (flushingPunches || buffer.length === 0) {
+            return;
         }
+        flushingPunches = true;
+
+        $.ajax({
+            url: clockActionBatchUrl,
+            type: 'POST',
+            timeout: 30000,
+            contentType: 'application/json',
+            headers: {'X-CSRFToken': csrfToken},
+            data: JSON.stringify({'punches': buffer}),
+            success: function(data) {
+                // Everything the server settled leaves the buffer; punches
+                // still in progress elsewhere are sent again next time
+                const pending = {};
+                data.results.forEach(function(result) {
+                    if (result.status === 'in_progress') {
+                        pending[result.punch_id] = true;
+                    }
+                });
+                const sent = {};
+                buffer.forEach(function(punch) {
+                    sent[punch.punch_id] = true;
+                });
+                // Punches buffered while this request was in flight stay too
+                savePunchBuffer(loadPunchBuffer().filter(function(punch) {
+                    return pending[punch.punch_id] || !sent[punch.punch_id];
+                }));
+            },
+            error: function(xhr) {
+                if (xhr.status === 403) {
+                    // Kept until a manager enrolls this browser at /employee-dashboard/enroll-kiosk/
+                    console.warn('This kiosk is not enrolled; buffered punches cannot be sent', buffer);
+                }
+            },
+            complete: function() {
+                flushingPunches = false;
+            }
+        });
     }
 
     function warmUpDatabase() {
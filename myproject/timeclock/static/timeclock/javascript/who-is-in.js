@@ -0,0 +1,77 @@
+document.addEventListener("DOMContentLoaded", function() {
+    var table = document.getElementById('who-is-in-table');
+    if (!table || !window.EventSource) {
+        return;
+    }
+    var tbody = table.querySelector('tbody');
+    var rows = {};  // Employee ID -> {full_name, clocked_in}
+
+    function cell(content) {
+        var td = document.createElement('td');
+        td.style.padding = '10px';
+        td.style.border = '1px solid black';
+        if (typeof content === 'string') {
+            td.textContent = content;
+        } else {
+            td.appendChild(content);
+        }
+        return td;
+    }
+
+    function statusLabel(clockedIn) {
+        var span = document.createElement('span');
+        span.style.color = clockedIn ? 'green' : 'red';
+        span.textContent = clockedIn ? 'Clocked In' : 'Clocked Out';
+        return span;
+    }
+
+    function render() {
+        // Clocked-in employees first, then by name, as the page renders them
+        var employees = Object.keys(rows).map(function(id) {
+            return rows[id];
+        }).sort(function(a, b) {
+            if (a.clocked_in !== b.clocked_in) {
+                return a.clocked_in ? -1 : 1;
+            }
+            return a.full_name.localeCompare(b.full_name);
+        });
+
+        var fragment = document.createDocumentFragment();
+        employees.forEach(function(employee) {
+            var tr = document.createElement('tr');
+            tr.setAttribute('data-employee-id', employee.employee_id);
+            tr.appendChild(cell(employee.full_name));
+            tr.appendChild(cell(statusLabel(employee.clocked_in)));
+            fragment.appendChild(tr);
+        });
+        if (employees.length === 0) {
+            var tr = document.createElement('tr');
+            var td = cell('No employees found.');
+            td.colSpan = 2;
+            tr.appendChild(td);
+            fragment.appendChild(tr);
+        }
+        tbody.replaceChildren(fragment);
+    }
+
+    var source = new EventSource(table.getAttribute('data-stream-url'));
+
+    source.addEventListener('snapshot', function(e) {
+        rows = {};
+        JSON.parse(e.data).forEach(function(employee) {
+            rows[employee.employee_id] = employee;
+        });
+        render();
+    });
+
+    source.addEventListener('update', function(e) {
+        var employee = JSON.parse(e.data);
+        rows[employee.employee_id] = employee;
+        render();
+    });
+
+    source.addEventListener('remove', function(e) {
+        delete rows[JSON.parse(e.data).employee_id];
+        render();
+    });
+});
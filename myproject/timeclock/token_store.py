@@ -0,0 +1,86 @@
+"""Maintenance of simplejwt's refresh-token tables.
+
+With ROTATE_REFRESH_TOKENS and BLACKLIST_AFTER_ROTATION every refresh adds
+an OutstandingToken row and blacklists the previous one, so both tables
+grow with every session. Rows for expired tokens no longer do anything
+(an expired token fails before the blacklist is consulted), and
+purge_expired() removes them; run it daily through the prune_tokens
+command.
+
+All work goes in bounded batches, each in its own transaction, so a large
+backlog never holds long locks or one huge DELETE. Batches walk the
+primary key: simplejwt does not index expires_at, but tokens are issued
+in id order with a fixed lifetime, so the expired rows are the oldest ids
+and each batch is found at the front of the primary key.
+"""
+from django.db import transaction
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import OutstandingToken, BlacklistedToken
+
+BATCH_SIZE = 1000
+
+
+def purge_expired(batch_size=BATCH_SIZE, now=None):
+    """Delete expired outstanding tokens and their blacklist rows; returns (outstanding, blacklisted) deleted."""
+    now = now or timezone.now()
+    outstanding = blacklisted = 0
+    while True:
+        with transaction.atomic():
+            pks = list(
+                OutstandingToken.objects.filter(expires_at__lte=now)
+                .order_by('pk').values_list('pk', flat=True)[:batch_size]
+            )
+            if not pks:
+                break
+            # The blacklist rows go with their tokens in one DELETE per table
+            _, deleted = OutstandingToken.objects.filter(pk__in=pks).delete()
+            outstanding += deleted.get(OutstandingToken._meta.label, 0)
+            blacklisted += deleted.get(BlacklistedToken._meta.label, 0)
+        if len(pks) < batch_size:
+            break
+    return outstanding, blacklisted
+
+
+def blacklist_all(batch_size=BATCH_SIZE, now=None):
+    """Blacklist every unexpired outstanding token; returns the number newly blacklisted.
+
+    Used when the signing key is rotated: processes still running with the
+    old key would otherwise keep accepting refresh tokens it signed.
+    """
+    now = now or timezone.now()
+    blacklisted = 0
+    last_pk = 0
+    while True:
+        with transaction.atomic():
+            pks = list(
+                OutstandingToken.objects.filter(pk__gt=last_pk, expires_at__gt=now, blacklistedtoken__isnull=True)
+                .order_by('pk').values_list('pk', flat=True)[:batch_size]
+            )
+            if not pks:
+                break
+            BlacklistedToken.objects.bulk_create(
+                [BlacklistedToken(token_id=pk) for pk in pks], ignore_conflicts=True
+            )
+        blacklisted += len(pks)
+        last_pk = pks[-1]
+        if len(pks) < batch_size:
+            break
+    return blacklisted
+
+
+def stats(now=None):
+    """Return row counts for the token tables, split by expired and unexpired."""
+    now = now or timezone.now()
+    outstanding = OutstandingToken.objects.count()
+    expired = OutstandingToken.objects.filter(expires_at__lte=now).count()
+    blacklisted = BlacklistedToken.objects.count()
+    blacklisted_expired = BlacklistedToken.objects.filter(token__expires_at__lte=now).count()
+    return {
+        'outstanding': outstanding,
+        'outstanding_expired': expired,
+        'outstanding_active': outstanding - expired,
+        'blacklisted': blacklisted,
+        'blacklisted_expired': blacklisted_expired,
+        'blacklisted_active': blacklisted - blacklisted_expired,
+        'oldest_expires_at': OutstandingToken.objects.order_by('pk').values_list('expires_at', flat=True).first(),
+    }
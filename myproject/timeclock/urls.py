@@ -8,12 +8,14 @@ from django.shortcuts import redirect
 
 from .views.views import generate_pdf
 from .views.employee_views import (
-    timeclock_screen, clock_in, clock_out, check_status, clock_action,
+    timeclock_screen, clock_in, clock_out, check_status, clock_action, clock_action_batch, enroll_kiosk,
 	add_note_to_time_entry, employee_login, employee_info,
 	employee_logout, force_password_change, change_background_ajax,
 	send_employee_info_email
 )
 from .views.admin_views import (admin_login, admin_dashboard, week_view, who_is_in)
+from .views.live_views import who_is_in_stream
+from .views.report_job_views import submit_report_job, report_job_status, download_report_job
 from .views.vacation_hours import (
     vacation_hours_list, reset_vacation_hours, add_vacation_entry
 )
@@ -38,6 +40,8 @@ urlpatterns = [
     path('clock-out/', clock_out, name='clock_out'),
     path('check-status/', check_status, name='check_status'),
     path('clock-action/', clock_action, name='clock_action'),
+    path('clock-action/batch/', clock_action_batch, name='clock_action_batch'),
+    path('employee-dashboard/enroll-kiosk/', enroll_kiosk, name='enroll_kiosk'),
     path('employee-dashboard/', timeclock_screen, name='timeclock_screen'),
     path('employee-dashboard/login/', employee_login, name='employee_login'),
     path('employee-dashboard/info/', employee_info, name='employee_info'),
@@ -80,9 +84,13 @@ urlpatterns = [
 
     # Additional Views
     path('generate_pdf/', generate_pdf, name='generate_pdf'),
+    path('report-jobs/', submit_report_job, name='submit_report_job'),
+    path('report-jobs/<int:job_id>/', report_job_status, name='report_job_status'),
+    path('report-jobs/<int:job_id>/download/', download_report_job, name='report_job_download'),
     path('admin-dashboard/week-view/', week_view, name='week_view'),
     path('admin-dashboard/add-holiday-entry/', add_holiday_entry, name='add_holiday_entry'),
     path('who-is-in/', who_is_in, name='who_is_in'),
+    path('who-is-in/stream/', who_is_in_stream, name='who_is_in_stream'),
     path('add-note/', add_note_to_time_entry, name='add_note_to_time_entry'),
 	
 	#rest APi Views
@@ -0,0 +1,42 @@
+from datetime import timedelta
+from django.db.models import Q
+
+def pay_week_start(day):
+    """Return the Thursday that starts the Thursday-to-Wednesday pay week containing day."""
+    weekday = day.weekday()
+    return day - timedelta(days=(weekday - 3 if weekday >= 3 else weekday + 4))
+
+def keyset_chunks(queryset, fields, chunk_size):
+    """Yield the queryset's rows as lists of values_list(*fields) tuples, chunk_size at a time.
+
+    Each chunk is a separate LIMIT query starting after the last row of the
+    chunk before it, positioned on the queryset's order_by. Unlike
+    iterator(), which mysqlclient buffers whole, no query returns more than
+    chunk_size rows. The ordering must be unique and all ascending or all
+    descending, e.g. ('clock_in_time', 'id').
+    """
+    ordering = list(queryset.query.order_by)
+    if not ordering or len({name.startswith('-') for name in ordering}) > 1:
+        raise ValueError('keyset_chunks needs an order_by that is all ascending or all descending')
+    lookup = 'lt' if ordering[0].startswith('-') else 'gt'
+    keys = [name.lstrip('-') for name in ordering]
+    rows = queryset.values_list(*fields, *keys)
+    width = len(fields)
+
+    after = None
+    while True:
+        page = rows
+        if after is not None:
+            # (a, b) after (x, y): a > x, or a = x and b > y. The bound on the
+            # first key alone lets the database range-scan its index.
+            following = Q()
+            for i, key in enumerate(keys):
+                following |= Q(**dict(zip(keys[:i], after[:i])), **{f'{key}__{lookup}': after[i]})
+            page = page.filter(**{f'{keys[0]}__{lookup}e': after[0]}).filter(following)
+        chunk = list(page[:chunk_size])
+        if not chunk:
+            return
+        yield [row[:width] for row in chunk]
+        if len(chunk) < chunk_size:
+            return
+        after = chunk[-1][width:]
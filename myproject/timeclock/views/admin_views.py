@@ -6,7 +6,8 @@ from django.contrib.auth.decorators import login_required
 from django.utils import timezone
 from datetime import datetime, timedelta
 import pytz
-from ..models import Employee, TimeEntry, Note
+from ..models import Employee, TimeEntry, Note, DailyTotal, PayWeekTotal
+from ..utils import pay_week_start
 from django.db.models import Prefetch, Case, When, Value, BooleanField
 from collections import defaultdict, OrderedDict
 from django.utils.http import url_has_allowed_host_and_scheme
@@ -51,13 +52,9 @@ def admin_dashboard(request):
     # Calculate date range
     if not start_date or not end_date:
         today = timezone.now().date()
-        current_weekday = today.weekday()
 
         # Calculate the start and end of the week
-        if current_weekday >= 3:
-            start_of_week = today - timedelta(days=current_weekday - 3)
-        else:
-            start_of_week = today - timedelta(days=current_weekday + 4)
+        start_of_week = pay_week_start(today)
         end_of_week = start_of_week + timedelta(days=6)
         start_date = datetime.combine(start_of_week, datetime.min.time())
         end_date = datetime.combine(end_of_week, datetime.max.time())
@@ -74,7 +71,7 @@ def admin_dashboard(request):
         clock_in_time__gte=start_date,
         clock_in_time__lte=end_date
     ).select_related('employee').prefetch_related(
-        Prefetch('notes', queryset=Note.objects.select_related('created_by').order_by('created_at'))
+        Prefetch('notes', queryset=Note.objects.select_related('created_by__employee').order_by('created_at'))
     ).annotate(
         is_clocked_in=Case(
             When(clock_out_time__isnull=True, then=Value(True)),
@@ -113,7 +110,7 @@ def admin_dashboard(request):
 
         # Prepare notes for display
         entry.notes_display = [
-            f"<small>{get_creator_name(note.created_by)}</small>: {note.note_text}"
+            f"<small>{note.creator_name}</small>: {note.note_text}"
             for note in entry.notes.all()
         ]
 
@@ -127,18 +124,6 @@ def admin_dashboard(request):
         'referrer': request.path,
     })
 
-def get_creator_name(user):
-    if not user:
-        return "Unknown"
-    # Check if the username is numeric, indicating that it's an employee ID
-    if user.username.isdigit():
-        # Find the employee associated with this user and return their first name
-        employee = Employee.objects.filter(user=user).first()
-        if employee:
-            return employee.first_name
-    # If not an employee or employee not found, return the username
-    return user.username
-
 @login_required
 def week_view(request):
     if not request.user.is_staff:
@@ -189,7 +174,6 @@ def week_view(request):
 
     # Group entries by work week (Thursday to Wednesday)
     work_weeks = []
-    total_hours = timedelta()  # Initialize total_hours to 0
     week_entries = defaultdict(lambda: OrderedDict())
 
     for entry in time_entries:
@@ -214,36 +198,33 @@ def week_view(request):
             entry.hours_worked_formatted = "00:00"
             entry.clock_out_time_formatted = 'Clocked In'
 
-        weekday = clock_in_time_local.weekday()
-        start_of_week = clock_in_time_local - timedelta(days=(weekday - 3 if weekday >= 3 else weekday + 4))
-        start_of_week = start_of_week.replace(hour=0, minute=0, second=0, microsecond=0)
+        start_of_week = pay_week_start(clock_in_time_local).replace(hour=0, minute=0, second=0, microsecond=0)
 
         # Store entries in the ordered dictionary by date
         week_entries[start_of_week].setdefault(clock_in_time_local.date(), []).append(entry)
 
+    # Weekly and overall totals are maintained on write; read them instead of re-adding entry durations
+    week_seconds = {}
+    total_hours = timedelta()
+    if employee_id:
+        week_seconds = PayWeekTotal.seconds_by_week(employee_id, start_date.date(), end_date.date())
+        total_hours = timedelta(seconds=DailyTotal.total_seconds(employee_id, start_date.date(), end_date.date()))
+
     # Prepare the final list of work weeks with their totals and entries
     work_weeks = []
     for start_of_week, day_entries in sorted(week_entries.items(), key=lambda x: x[0], reverse=True):
-        weekly_total = timedelta()
+        weekly_total = timedelta(seconds=week_seconds.get(start_of_week.date(), 0))
         for day, entries in day_entries.items():
-            daily_total = timedelta()
             # Sort entries by "Clocked In" (no clock_out_time) first, then by clock_in_time
             entries.sort(key=lambda x: (x.clock_out_time is not None, x.clock_in_time))
 
             for entry in entries:
                 if entry.hours_worked_formatted != "00:00":
                     hours, minutes = map(int, entry.hours_worked_formatted.split(':'))
-                    entry_duration = timedelta(hours=hours, minutes=minutes)
-                    daily_total += entry_duration
                     entry.hours_worked_display = f"{hours}h {minutes}m"
                 else:
                     entry.hours_worked_display = "0h 0m"
 
-            
-            # Add daily total to weekly total
-            weekly_total += daily_total
-            total_hours += daily_total  # Ensure total_hours includes the 15 minutes as well
-
         weekly_total_display = f"{weekly_total.days * 24 + weekly_total.seconds // 3600}h {(weekly_total.seconds // 60) % 60}m"
         work_weeks.append({
             'start_of_week': start_of_week,
@@ -266,5 +247,11 @@ def week_view(request):
 def who_is_in(request):
     if not request.user.is_staff:
         return redirect('admin_login')
-    employees = Employee.objects.order_by('-clocked_in', 'first_name', 'last_name')
+    employees = Employee.objects.annotate(
+        is_clocked_in=Case(
+            When(open_entry__isnull=False, then=Value(True)),
+            default=Value(False),
+            output_field=BooleanField()
+        )
+    ).order_by('-is_clocked_in', 'first_name', 'last_name')
     return render(request, 'who_is_in.html', {'employees': employees})
\ No newline at end of file
@@ -2,13 +2,16 @@ from django.shortcuts import render, get_object_or_404, redirect
 from django.http import JsonResponse, HttpResponseRedirect
 from django.utils import timezone
 from django.views.decorators.http import require_POST
-from ..models import Employee, TimeEntry, Note
+from ..models import Employee, TimeEntry, Note, DailyTotal, PayWeekTotal
+from ..utils import pay_week_start
 from django.contrib.auth import authenticate, login, logout, update_session_auth_hash
 from django.contrib.auth.decorators import login_required
+from django.contrib.auth.models import User
 from datetime import timedelta, datetime
 from collections import defaultdict, OrderedDict
 from decimal import Decimal
 import pytz
+import json
 from django.views.decorators.csrf import csrf_exempt
 from django.urls import reverse
 from django.contrib.auth.forms import PasswordChangeForm
@@ -24,8 +27,10 @@ from django.template.loader import render_to_string
 from django.utils.html import strip_tags
 from django.core.mail import EmailMultiAlternatives
 from django.utils.timezone import localtime
+from django.utils.dateparse import parse_datetime
 from django.db import transaction
 from .email_helpers import send_shared_mail
+from .. import punches, roster
 
 def employee_login(request):
     if request.method == 'POST':
@@ -111,20 +116,8 @@ def employee_info(request):
     start_of_month = today.replace(day=1)
     end_of_month = (start_of_month + timedelta(days=32)).replace(day=1) - timedelta(days=1)
 
-    # Determine the day of the week for the start_of_month (Monday=0, Tuesday=1, ..., Sunday=6)
-    weekday_of_start_of_month = start_of_month.weekday()
-
-    # Adjust the start_of_month to the previous Thursday if necessary
-    if weekday_of_start_of_month >= 3:
-        # If the first day of the month is Thursday (3), Friday (4), Saturday (5), or Sunday (6)
-        # Move back to the Thursday of that week
-        adjusted_days = weekday_of_start_of_month - 3
-    else:
-        # If the first day of the month is Monday (0), Tuesday (1), or Wednesday (2)
-        # Move back to the previous Thursday
-        adjusted_days = weekday_of_start_of_month + 4
-
-    adjusted_start_of_month = start_of_month - timedelta(days=adjusted_days)
+    # Widen the range back to the Thursday that starts the first pay week
+    adjusted_start_of_month = pay_week_start(start_of_month)
 
     # Set timezone
     tz = pytz.timezone('America/New_York')
@@ -143,7 +136,6 @@ def employee_info(request):
 
     # Group entries by work week (Thursday to Wednesday)
     week_entries = defaultdict(list)
-    total_hours_for_month = timedelta()
 
     for entry in time_entries:
         clock_in_time_local = localtime(entry.clock_in_time)
@@ -165,35 +157,19 @@ def employee_info(request):
             entry.clock_out_time_formatted = 'Clocked In'
 
         # Determine start of the work week (Thursday to Wednesday)
-        weekday = clock_in_time_local.weekday()
-        start_of_week = clock_in_time_local - timedelta(days=(weekday - 3 if weekday >= 3 else weekday + 4))
-        start_of_week = start_of_week.replace(hour=0, minute=0, second=0, microsecond=0)
+        start_of_week = pay_week_start(clock_in_time_local).replace(hour=0, minute=0, second=0, microsecond=0)
 
         # Store entries by week and date
         week_entries[start_of_week].append(entry)
 
+    # Weekly and monthly totals are maintained on write, so these are indexed lookups
+    week_seconds = PayWeekTotal.seconds_by_week(employee, adjusted_start_of_month, end_of_month.date())
+    total_hours_for_month = timedelta(seconds=DailyTotal.total_seconds(employee, adjusted_start_of_month, end_of_month.date()))
+
     # Prepare grouped entries and calculate total hours for each week
     grouped_weeks = []
     for start_of_week, entries in sorted(week_entries.items(), key=lambda x: x[0], reverse=True):
-        weekly_total = timedelta()
-        day_entries = defaultdict(list)
-
-        # Group entries by day
-        for entry in entries:
-            clock_in_date = localtime(entry.clock_in_time).date()
-            day_entries[clock_in_date].append(entry)
-
-        for day, day_entry_list in day_entries.items():
-            daily_total = timedelta()
-
-            # Calculate daily total for all entries on that day
-            for entry in day_entry_list:
-                hours, minutes = map(int, entry.hours_worked_formatted.split(':'))
-                entry_duration = timedelta(hours=hours, minutes=minutes)
-                daily_total += entry_duration
-
-            weekly_total += daily_total
-            total_hours_for_month += daily_total
+        weekly_total = timedelta(seconds=week_seconds.get(start_of_week.date(), 0))
 
         weekly_total_display = f"{weekly_total.days * 24 + weekly_total.seconds // 3600}h {(weekly_total.seconds // 60) % 60}m"
         grouped_weeks.append({
@@ -285,20 +261,8 @@ def send_employee_info_email(request):
         start_of_month = today.replace(day=1)
         end_of_month = (start_of_month + timedelta(days=32)).replace(day=1) - timedelta(days=1)
 
-        # Determine the day of the week for the start_of_month (Monday=0, Tuesday=1, ..., Sunday=6)
-        weekday_of_start_of_month = start_of_month.weekday()
-
-        # Adjust the start_of_month to the previous Thursday if necessary
-        if weekday_of_start_of_month >= 3:
-            # If the first day of the month is Thursday (3), Friday (4), Saturday (5), or Sunday (6)
-            # Move back to the Thursday of that week
-            adjusted_days = weekday_of_start_of_month - 3
-        else:
-            # If the first day of the month is Monday (0), Tuesday (1), or Wednesday (2)
-            # Move back to the previous Thursday
-            adjusted_days = weekday_of_start_of_month + 4
-
-        adjusted_start_of_month = start_of_month - timedelta(days=adjusted_days)
+        # Widen the range back to the Thursday that starts the first pay week
+        adjusted_start_of_month = pay_week_start(start_of_month)
 
         # Set timezone
         tz = pytz.timezone('America/New_York')
@@ -315,7 +279,6 @@ def send_employee_info_email(request):
 
         # Group entries by work week
         week_entries = defaultdict(list)
-        total_hours_for_month = timedelta()
 
         for entry in time_entries:
             clock_in_time_local = localtime(entry.clock_in_time)
@@ -336,36 +299,18 @@ def send_employee_info_email(request):
             entry.notes_list = entry.notes.all()
 
             # Determine start of the work week (Thursday to Wednesday)
-            weekday = clock_in_time_local.weekday()
-            start_of_week = clock_in_time_local - timedelta(days=(weekday - 3 if weekday >= 3 else weekday + 4))
-            start_of_week = start_of_week.replace(hour=0, minute=0, second=0, microsecond=0)
+            start_of_week = pay_week_start(clock_in_time_local).replace(hour=0, minute=0, second=0, microsecond=0)
 
             week_entries[start_of_week].append(entry)
 
+        # Weekly and monthly totals come from the rollups maintained on write
+        week_seconds = PayWeekTotal.seconds_by_week(employee, adjusted_start_of_month, end_of_month.date())
+        total_hours_for_month = timedelta(seconds=DailyTotal.total_seconds(employee, adjusted_start_of_month, end_of_month.date()))
+
         # Prepare grouped entries and calculate total hours for each week
         grouped_weeks = []
         for start_of_week, entries in sorted(week_entries.items(), key=lambda x: x[0], reverse=True):
-            weekly_total = timedelta()
-
-            day_entries = defaultdict(list)
-
-            # Group entries by day
-            for entry in entries:
-                day_key = entry.clock_in_time.date()
-                day_entries[day_key].append(entry)
-
-            for day, day_entries_list in day_entries.items():
-                daily_total = timedelta()
-
-                # Calculate daily total
-                for entry in day_entries_list:
-                    hours_worked_str = entry.hours_worked_formatted.replace('h', '').replace('m', '').strip()
-                    hours, minutes = map(int, hours_worked_str.split())
-                    entry_duration = timedelta(hours=hours, minutes=minutes)
-                    daily_total += entry_duration
-
-                weekly_total += daily_total
-                total_hours_for_month += daily_total
+            weekly_total = timedelta(seconds=week_seconds.get(start_of_week.date(), 0))
 
             weekly_total_display = f"{weekly_total.days * 24 + weekly_total.seconds // 3600}h {(weekly_total.seconds // 60) % 60}m"
             grouped_weeks.append({
@@ -412,12 +357,8 @@ def timeclock_screen(request):
 def clock_in(request):
     if request.method == 'POST':
         employee_id = request.POST.get('employee_id')
-        with transaction.atomic():
-            employee = get_object_or_404(Employee.objects.select_for_update(), employee_id=employee_id)
-            if not employee.clocked_in:
-                TimeEntry.objects.create(employee=employee, clock_in_time=timezone.now())
-                employee.clocked_in = True
-                employee.save()
+        employee = get_object_or_404(Employee, employee_id=employee_id)
+        punches.clock_in(employee)
         return JsonResponse({'status': 'success'})
     return JsonResponse({'status': 'error'}, status=400)
 
@@ -425,15 +366,8 @@ def clock_in(request):
 def clock_out(request):
     if request.method == 'POST':
         employee_id = request.POST.get('employee_id')
-        with transaction.atomic():
-            employee = get_object_or_404(Employee.objects.select_for_update(), employee_id=employee_id)
-            if employee.clocked_in:
-                time_entry = TimeEntry.objects.filter(employee=employee, clock_out_time__isnull=True).select_for_update().first()
-                if time_entry:
-                    time_entry.clock_out_time = timezone.now()
-                    time_entry.save()
-                employee.clocked_in = False
-                employee.save()
+        employee = get_object_or_404(Employee.objects.select_related('open_entry'), employee_id=employee_id)
+        punches.clock_out(employee)
         return JsonResponse({'status': 'success'})
     return JsonResponse({'status': 'error'}, status=400)
 
@@ -447,31 +381,17 @@ def check_status(request):
 
         try:
             employee_id = int(employee_id)
-            employee = Employee.objects.get(employee_id=employee_id)
-            full_name = f"{employee.first_name} {employee.last_name}"
+            # Served from the in-memory roster; no queries unless it was invalidated
+            employee = roster.lookup(employee_id)
+            if employee is None:
+                raise Employee.DoesNotExist
             button_text = 'Clock Out' if employee.clocked_in else 'Clock In'
 
-            # Get today's time entries for the employee
-            today = timezone.localdate()
-            time_entries = TimeEntry.objects.filter(employee=employee, clock_in_time__date=today)
-
-            # Format the times in local timezone and AM/PM format
-            formatted_entries = []
-            for entry in time_entries:
-                clock_in_local = timezone.localtime(entry.clock_in_time).strftime('%I:%M %p')
-                clock_out_local = timezone.localtime(entry.clock_out_time).strftime('%I:%M %p') if entry.clock_out_time else 'Clocked In'
-                
-                formatted_entries.append({
-                    'id': entry.id,
-                    'clock_in_time': clock_in_local,
-                    'clock_out_time': clock_out_local
-                })
-
             response_data = {
-                'full_name': full_name,
+                'full_name': employee.full_name,
                 'button_text': button_text,
                 'employee_id': employee.employee_id,
-                'time_entries': formatted_entries
+                'time_entries': list(employee.time_entries)
             }
         except Employee.DoesNotExist:
             response_data = {
@@ -529,21 +449,148 @@ def add_note_to_time_entry(request):
 def clock_action(request):
     if request.method == 'POST':
         employee_id = request.POST.get('employee_id')
-        try:
-            employee = Employee.objects.get(employee_id=employee_id)
+        punch_id = request.POST.get('punch_id')
+
+        def punch():
+            try:
+                employee = Employee.objects.select_related('open_entry').get(employee_id=employee_id)
+            except Employee.DoesNotExist:
+                return {'status': 'error', 'message': 'Employee not found.'}, 404
             if employee.clocked_in:
-                clock_out(request)
-                message = "You have successfully clocked out."
-                button_text = "Clock In"
+                result = punches.clock_out(employee)
             else:
-                clock_in(request)
+                result = punches.clock_in(employee)
+
+            # Report the state the punch left the employee in
+            if result.clocked_in:
                 message = "You have successfully clocked in."
                 button_text = "Clock Out"
-            return JsonResponse({'status': 'success', 'message': message, 'button_text': button_text})
-        except Employee.DoesNotExist:
-            return JsonResponse({'status': 'error', 'message': 'Employee not found.'}, status=404)
+            else:
+                message = "You have successfully clocked out."
+                button_text = "Clock In"
+            return {'status': 'success', 'message': message, 'button_text': button_text}, 200
+
+        # A retried punch replays the first response instead of toggling again
+        try:
+            data, status = punches.idempotent_punch(f'kiosk:{employee_id}', punch_id, punch)
+        except punches.InvalidPunchId:
+            return JsonResponse({'status': 'error', 'message': 'Invalid punch ID.'}, status=400)
+        except punches.PunchInProgress:
+            return JsonResponse({'status': 'error', 'message': 'Punch in progress.'}, status=409)
+        return JsonResponse(data, status=status)
     return JsonResponse({'status': 'error'}, status=400)
 
+MAX_BATCH_PUNCHES = 500
+# Allowed drift between a kiosk's clock and the server's
+BATCH_CLOCK_SKEW = timedelta(minutes=5)
+# Oldest punch a kiosk may replay; anything older needs a manager's edit.
+# Keep in step with PUNCH_BUFFER_MAX_AGE in timeclock-screen.js.
+MAX_OFFLINE_AGE = timedelta(hours=24)
+
+# Signed cookie marking a browser as a kiosk; only kiosks may replay backdated punches
+KIOSK_COOKIE = 'timeclock_kiosk'
+KIOSK_COOKIE_SALT = 'timeclock.kiosk'
+KIOSK_COOKIE_MAX_AGE = 365 * 24 * 60 * 60
+
+@login_required(login_url='admin_login')
+def enroll_kiosk(request):
+    """Mark this browser as a kiosk, allowing it to replay its offline punch buffer.
+
+    A manager signs in on the kiosk browser and opens this page once. The
+    cookie names the manager who enrolled it and stops working when that
+    account is deactivated or loses staff status.
+    """
+    if not request.user.is_staff:
+        return redirect('admin_login')
+    response = redirect('timeclock_screen')
+    response.set_signed_cookie(
+        KIOSK_COOKIE, str(request.user.pk), salt=KIOSK_COOKIE_SALT,
+        max_age=KIOSK_COOKIE_MAX_AGE, secure=request.is_secure(), httponly=True, samesite='Strict'
+    )
+    return response
+
+def is_enrolled_kiosk(request):
+    """Whether the request comes from a staff session or a browser enrolled by enroll_kiosk."""
+    if request.user.is_authenticated and request.user.is_staff:
+        return True
+    enrolled_by = request.get_signed_cookie(
+        KIOSK_COOKIE, default=None, salt=KIOSK_COOKIE_SALT, max_age=KIOSK_COOKIE_MAX_AGE
+    )
+    if not enrolled_by or not enrolled_by.isdigit():
+        return False
+    return User.objects.filter(pk=enrolled_by, is_staff=True, is_active=True).exists()
+
+@require_POST
+def clock_action_batch(request):
+    """Replay punches a kiosk buffered while it was offline.
+
+    Only enrolled kiosks and staff sessions may replay punches, since the
+    timestamps are supplied by the caller. Expects a JSON body of the form
+    {"punches": [{"punch_id": ..., "employee_id": ..., "action": ..., "timestamp": ...}]}
+    where action is clock_in, clock_out or toggle (the default) and timestamp
+    is when the punch was made, in ISO 8601. Timestamps more than
+    MAX_OFFLINE_AGE old, or in the future, are rejected. Responds with one
+    result per punch, in the order given.
+    """
+    if not is_enrolled_kiosk(request):
+        return JsonResponse({'status': 'error', 'message': 'This kiosk is not enrolled for offline punches.'}, status=403)
+    try:
+        items = json.loads(request.body).get('punches')
+    except (ValueError, AttributeError):
+        items = None
+    if not isinstance(items, list):
+        return JsonResponse({'status': 'error', 'message': 'Expected a list of punches.'}, status=400)
+    if len(items) > MAX_BATCH_PUNCHES:
+        return JsonResponse({'status': 'error', 'message': f'At most {MAX_BATCH_PUNCHES} punches per batch.'}, status=400)
+
+    now = timezone.now()
+    latest_allowed = now + BATCH_CLOCK_SKEW
+    earliest_allowed = now - MAX_OFFLINE_AGE
+    batch = []
+    results = []
+    for item in items:
+        item = item if isinstance(item, dict) else {}
+        punch_id = str(item.get('punch_id') or '')
+        action = item.get('action') or 'toggle'
+        try:
+            employee_id = int(item.get('employee_id'))
+        except (TypeError, ValueError):
+            employee_id = None
+        try:
+            when = parse_datetime(str(item.get('timestamp') or ''))
+        except ValueError:
+            when = None
+
+        error = None
+        if not punches.PUNCH_ID_RE.match(punch_id):
+            error = 'Invalid punch ID.'
+        elif employee_id is None:
+            error = 'Invalid employee ID.'
+        elif action not in punches.BATCH_ACTIONS:
+            error = 'Invalid action.'
+        elif when is None:
+            error = 'Invalid timestamp.'
+        else:
+            if timezone.is_naive(when):
+                when = timezone.make_aware(when)
+            if when > latest_allowed:
+                error = 'Timestamp is in the future.'
+            elif when < earliest_allowed:
+                error = 'Punch is too old to replay; ask a manager to add it.'
+
+        if error:
+            results.append({
+                'punch_id': punch_id, 'employee_id': employee_id, 'action': action,
+                'status': 'rejected', 'message': error, 'entry_id': None,
+            })
+        else:
+            batch.append(punches.BatchPunch(punch_id, employee_id, action, when))
+            results.append(None)
+
+    applied = iter(punches.apply_batch(batch))
+    results = [result or next(applied) for result in results]
+    return JsonResponse({'status': 'success', 'results': results})
+
 def convert_decimal_hours_to_hm(decimal_hours):
     total_minutes = int(decimal_hours * 60)
     hours = total_minutes // 60
@@ -0,0 +1,89 @@
+import asyncio
+import json
+from asgiref.sync import sync_to_async
+from django.http import HttpResponseForbidden, StreamingHttpResponse
+from .. import roster
+from ..models import ChangeLogEntry
+
+# How often a stream checks for changes. Checking reads the newest change
+# log id, which punches handled by any process advance; the roster itself
+# is reloaded at most once per change per process, however many displays
+# are connected.
+POLL_INTERVAL = 2
+# Send a comment line this often so proxies keep idle streams open
+HEARTBEAT_INTERVAL = 15
+
+
+def _row(employee):
+    return {
+        'employee_id': employee.employee_id,
+        'full_name': employee.full_name,
+        'clocked_in': employee.clocked_in,
+    }
+
+
+def _latest_snapshot():
+    change_id = ChangeLogEntry.objects.order_by('-id').values_list('id', flat=True).first()
+    return roster.snapshot(change_id or 0)
+
+
+def _event(name, data):
+    return f"event: {name}\ndata: {json.dumps(data)}\n\n"
+
+
+def _snapshot_event(current):
+    rows = sorted(current.values(), key=lambda e: (not e.clocked_in, e.full_name))
+    return _event('snapshot', [_row(employee) for employee in rows])
+
+
+def _delta_events(previous, current):
+    for employee_id, employee in current.items():
+        before = previous.get(employee_id)
+        if before is None or (before.full_name, before.clocked_in) != (employee.full_name, employee.clocked_in):
+            yield _event('update', _row(employee))
+    for employee_id in previous.keys() - current.keys():
+        yield _event('remove', {'employee_id': employee_id})
+
+
+async def _stream(current):
+    yield _snapshot_event(current)
+    idle = 0
+    while True:
+        await asyncio.sleep(POLL_INTERVAL)
+        latest = await sync_to_async(_latest_snapshot)()
+        if latest is current:
+            idle += POLL_INTERVAL
+            if idle >= HEARTBEAT_INTERVAL:
+                idle = 0
+                yield ": keep-alive\n\n"
+            continue
+        for event in _delta_events(current, latest):
+            yield event
+        current = latest
+        idle = 0
+
+
+async def who_is_in_stream(request):
+    """Server-sent events for the "who is in" board.
+
+    Sends a snapshot event with every employee, then update and remove
+    events as punches and roster edits land, whichever process handled
+    them. Needs the ASGI server (see myproject/asgi.py for running it next
+    to the kiosk server). Under WSGI the stream ends after the snapshot and
+    the browser reconnects after the retry interval, so the board degrades
+    to polling.
+    """
+    user = await request.auser()
+    if not user.is_staff:
+        return HttpResponseForbidden()
+
+    current = await sync_to_async(_latest_snapshot)()
+    if 'wsgi.version' in request.META:
+        stream = ['retry: 30000\n\n', _snapshot_event(current)]
+    else:
+        stream = _stream(current)
+
+    response = StreamingHttpResponse(stream, content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # Stop nginx from buffering the stream
+    return response
@@ -0,0 +1,73 @@
+import os
+from datetime import datetime
+from django.http import JsonResponse, FileResponse
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.views.decorators.http import require_POST, require_GET
+from ..models import ReportJob
+from .. import reports
+
+def _job_data(job):
+    data = {
+        'id': job.pk,
+        'kind': job.kind,
+        'status': job.status,
+        'progress': job.progress,
+        'status_url': reverse('report_job_status', args=[job.pk]),
+        'download_url': None,
+        'error': job.error or None,
+    }
+    if job.status == 'done':
+        data['download_url'] = reverse('report_job_download', args=[job.pk])
+    return data
+
+@require_POST
+def submit_report_job(request):
+    if not request.user.is_staff:
+        return JsonResponse({'status': 'error', 'message': 'Staff access required.'}, status=403)
+
+    kind = request.POST.get('kind', 'payroll_pdf')
+    start_date = request.POST.get('start_date')
+    end_date = request.POST.get('end_date')
+    if kind not in reports.RENDERERS:
+        return JsonResponse({'status': 'error', 'message': 'Unknown report type.'}, status=400)
+    if not start_date or not end_date:
+        return JsonResponse({'status': 'error', 'message': 'Start date and end date are required.'}, status=400)
+    try:
+        datetime.strptime(start_date, '%Y-%m-%d')
+        datetime.strptime(end_date, '%Y-%m-%d')
+    except ValueError:
+        return JsonResponse({'status': 'error', 'message': 'Invalid date format.'}, status=400)
+
+    params = {'start_date': start_date, 'end_date': end_date}
+    employee_id = request.POST.get('employee_id')
+    if kind == 'time_entries_csv' and employee_id:
+        params['employee_id'] = employee_id
+
+    job = reports.submit(kind, params, user=request.user)
+    return JsonResponse(_job_data(job), status=202)
+
+@require_GET
+def report_job_status(request, job_id):
+    if not request.user.is_staff:
+        return JsonResponse({'status': 'error', 'message': 'Staff access required.'}, status=403)
+    job = get_object_or_404(ReportJob, pk=job_id)
+    return JsonResponse(_job_data(job))
+
+@require_GET
+def download_report_job(request, job_id):
+    if not request.user.is_staff:
+        return JsonResponse({'status': 'error', 'message': 'Staff access required.'}, status=403)
+    job = get_object_or_404(ReportJob, pk=job_id, status='done')
+    path = reports.result_file(job)
+    if not os.path.exists(path):
+        return JsonResponse({'status': 'error', 'message': 'Report file has expired; submit the report again.'}, status=410)
+
+    if job.kind == 'payroll_pdf':
+        filename = f"Payroll {job.finished_at.strftime('%m-%d-%y')}.pdf"
+        as_attachment = request.COOKIES.get('pyqt_client') == 'true'
+    else:
+        filename = 'time_entries_report.csv'
+        as_attachment = True
+    return FileResponse(open(path, 'rb'), as_attachment=as_attachment, filename=filename,
+                        content_type=reports.content_type(job))
@@ -8,9 +8,9 @@ from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 import json
 
-from ..models import Employee, TimeEntry, Note  # Import necessary models
+from ..models import Employee, TimeEntry, Note, LeaveLedgerEntry  # Import necessary models
 from ..forms import ResetSickHoursForm  # Form for resetting sick hours
-from .time_entry_views import handle_notes, update_employee_clocked_in_status, parse_and_validate_time  # Import helpers
+from .time_entry_views import handle_notes, parse_and_validate_time  # Import helpers
 
 @login_required
 def add_sick_time_entry(request):
@@ -88,9 +88,10 @@ def reset_sick_hours(request, employee_id):
         form = ResetSickHoursForm(request.POST)  # Reusing the form from vacation or a specific sick form
         if form.is_valid():
             # Set the new allocated hours and reset used hours
-            employee.sick_hours_allocated = form.cleaned_data['sick_hours_allocated']
-            employee.sick_hours_used = Decimal('0.00')  # Reset the used sick hours
-            employee.save()
+            LeaveLedgerEntry.record(
+                employee, 'sick', 'reset', form.cleaned_data['sick_hours_allocated'],
+                created_by=request.user if request.user.is_authenticated else None
+            )
 
             # Return a success response with the new sick hours data
             return JsonResponse({
@@ -81,20 +81,6 @@ def handle_notes(time_entry, notes_data, request):
 
 
 
-# Helper function to update employee clocked-in status
-
-def update_employee_clocked_in_status(employee, clock_in_time, clock_out_time):
-
-    if clock_in_time.date() == timezone.localtime(timezone.now()).date():
-
-        employee.clocked_in = not bool(clock_out_time)
-
-        employee.save(update_fields=['clocked_in'])
-
-
-
-
-
 @login_required
 
 def add_holiday_entry(request):
@@ -228,8 +214,6 @@ def add_time_entry(request):
 
             handle_notes(time_entry, notes_data, request)
 
-            update_employee_clocked_in_status(employee, clock_in_time, clock_out_time)
-
 
 
             messages.success(request, 'Time entry successfully added.')
@@ -288,8 +272,6 @@ def edit_time_entry(request, entry_id):
 
             handle_notes(time_entry, notes_data, request)
 
-            update_employee_clocked_in_status(time_entry.employee, clock_in_time, clock_out_time)
-
 
 
             messages.success(request, 'Time entry successfully updated.')
@@ -360,10 +342,6 @@ def remove_time_entry(request, entry_id):
 
         try:
 
-            time_entry.employee.clocked_in = False
-
-            time_entry.employee.save(update_fields=['clocked_in'])
-
             time_entry.delete()
 
             messages.success(request, 'Time entry successfully removed.')
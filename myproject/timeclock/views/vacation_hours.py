@@ -1,5 +1,5 @@
 from ..forms import ResetVacationHoursForm  # Form for resetting vacation hours
-from ..models import Employee, TimeEntry, Note  # Models for the application
+from ..models import Employee, TimeEntry, Note, LeaveLedgerEntry  # Models for the application
 from django.shortcuts import render, get_object_or_404, redirect  # Helper methods for view logic
 from django.http import JsonResponse  # To return JSON responses
 from django.utils import timezone  # For timezone handling
@@ -9,7 +9,7 @@ from datetime import time, timedelta  # For defining time and timedelta
 import json  # To handle JSON data
 from django.contrib import messages  # To handle success/error messages
 from django.contrib.auth.decorators import login_required  # For restricting views based on authentication
-from .time_entry_views import handle_notes, update_employee_clocked_in_status, parse_and_validate_time  # Import helpers
+from .time_entry_views import handle_notes, parse_and_validate_time  # Import helpers
 
 @login_required
 def add_vacation_entry(request):
@@ -112,9 +112,10 @@ def reset_vacation_hours(request, employee_id):
         form = ResetVacationHoursForm(request.POST)
         if form.is_valid():
             # Set the new allocated hours and reset used hours
-            employee.vacation_hours_allocated = form.cleaned_data['vacation_hours_allocated']
-            employee.vacation_hours_used = Decimal('0.00')
-            employee.save()
+            LeaveLedgerEntry.record(
+                employee, 'vacation', 'reset', form.cleaned_data['vacation_hours_allocated'],
+                created_by=request.user if request.user.is_authenticated else None
+            )
             return JsonResponse({
                 'success': True,
                 'allocated': employee.vacation_hours_allocated,
@@ -0,0 +1,101 @@
+"""WebAuthn assertion checks for biometric login.
+
+BiometricCredential.public_key holds the credential's public key in one
+canonical form, base64 of its DER SubjectPublicKeyInfo, written by
+canonical_public_key() at registration. Loading a stored key is then a
+single DER parse. Loaded keys are kept in a per-process LRU cache keyed by
+the stored key itself, so repeat logins skip parsing; re-registering a
+credential stores a new key and so misses the cache.
+
+verify_assertion() accepts EC (ES256) and RSA (RS256) keys. Any other key
+type, or a stored key that does not decode, fails verification rather than
+raising.
+
+record_use() stores the authenticator's signature counter with a
+conditional UPDATE. The counter must increase, so an assertion that was
+replayed, or sent by a cloned authenticator, is turned away even when two
+logins race.
+"""
+import base64
+import hashlib
+import logging
+from functools import lru_cache
+from cryptography.exceptions import InvalidSignature, UnsupportedAlgorithm
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec, padding, rsa
+from django.utils import timezone
+from .models import BiometricCredential
+
+logger = logging.getLogger(__name__)
+
+KEY_CACHE_SIZE = 256
+# rpIdHash (32 bytes) and flags (1 byte) come before the 4-byte counter
+SIGN_COUNT_OFFSET = 33
+
+
+def canonical_public_key(public_key):
+    """Return the stored form of a public key sent at registration.
+
+    Accepts base64 of the DER key (what the browser's getPublicKey()
+    returns), PEM, or base64 of PEM. Raises ValueError for anything else.
+    """
+    if public_key.lstrip().startswith('-----BEGIN'):
+        key = serialization.load_pem_public_key(public_key.encode())
+    else:
+        raw = base64.b64decode(public_key, validate=True)
+        if raw.lstrip().startswith(b'-----BEGIN'):
+            key = serialization.load_pem_public_key(raw)
+        else:
+            key = serialization.load_der_public_key(raw)
+    der = key.public_bytes(serialization.Encoding.DER, serialization.PublicFormat.SubjectPublicKeyInfo)
+    return base64.b64encode(der).decode()
+
+
+@lru_cache(maxsize=KEY_CACHE_SIZE)
+def load_public_key(public_key):
+    """Load a stored (canonical) public key; cached per key."""
+    return serialization.load_der_public_key(base64.b64decode(public_key))
+
+
+def sign_count(authenticator_data):
+    """Return the signature counter from decoded authenticator data."""
+    if len(authenticator_data) < SIGN_COUNT_OFFSET + 4:
+        raise ValueError('Authenticator data is too short')
+    return int.from_bytes(authenticator_data[SIGN_COUNT_OFFSET:SIGN_COUNT_OFFSET + 4], 'big')
+
+
+def verify_assertion(public_key, client_data, authenticator_data, signature):
+    """Check an assertion's signature; the arguments are decoded bytes, the key as stored."""
+    try:
+        key = load_public_key(public_key)
+    except (ValueError, UnsupportedAlgorithm):
+        logger.warning('Stored biometric public key could not be loaded')
+        return False
+    message = authenticator_data + hashlib.sha256(client_data).digest()
+    try:
+        if isinstance(key, ec.EllipticCurvePublicKey):
+            key.verify(signature, message, ec.ECDSA(hashes.SHA256()))
+        elif isinstance(key, rsa.RSAPublicKey):
+            key.verify(signature, message, padding.PKCS1v15(), hashes.SHA256())
+        else:
+            return False
+    except InvalidSignature:
+        return False
+    return True
+
+
+def record_use(credential, new_sign_count):
+    """Store the counter from a verified assertion; False means it did not increase.
+
+    Authenticators without a counter always send 0, which is accepted only
+    while the stored counter is also 0.
+    """
+    rows = BiometricCredential.objects.filter(pk=credential.pk)
+    if new_sign_count:
+        rows = rows.filter(sign_count__lt=new_sign_count)
+    else:
+        rows = rows.filter(sign_count=0)
+    if not rows.update(sign_count=new_sign_count, last_used=timezone.now()):
+        return False
+    credential.sign_count = new_sign_count
+    return True